@@ -0,0 +1,247 @@
+'''
+Binary archive format for whole leaderboards, written by +export_archive+ and read
+back by +LeaderboardArchive+ or +restore_archive+.
+
+An archive is a little-endian file made of a header followed by sections aligned on
+8 bytes, so that each of them can be memory mapped and read in place:
+
+  header          magic 'LBARCH01', flags (1: has member data, 2: ascending order),
+                  member count and the offsets of the sections below
+  scores          count float64 scores, in leaderboard order
+  ranks           count int64 ranks
+  member index    count + 1 uint64 offsets of each member in the member blob
+  member blob     UTF-8 member names, back to back
+  data index      (optional) count + 1 uint64 offsets of each member data
+  data blob       (optional) member data, back to back, empty for none
+
+The leader at any position is found in O(1) from the fixed-width sections and the
+offset indexes, without reading the rest of the archive.
+'''
+
+from .result_formats import Leader
+from array import array
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+MAGIC = b'LBARCH01'
+HAS_MEMBER_DATA = 1
+ASCENDING = 2
+
+_HEADER = struct.Struct('<8sIIQQQQQQQ')
+_SCORE = struct.Struct('<d')
+_RANK = struct.Struct('<q')
+_OFFSET = struct.Struct('<Q')
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _encode(value, encoding):
+    if value is None:
+        return b''
+    if isinstance(value, bytes):
+        return value
+    return value.encode(encoding)
+
+
+class ArchiveWriter(object):
+    '''
+    Write an archive from pages of leaders in the +columnar+ result format, one page at a
+    time. Sections are spooled to temporary files and put together by +close+, which
+    renames the archive into place, so memory use does not grow with the leaderboard and
+    an interrupted export never leaves a partial archive behind.
+    '''
+
+    def __init__(self, path, with_member_data=False, encoding='utf-8'):
+        '''
+        Start writing an archive.
+
+        @param path [String] Path of the archive.
+        @param with_member_data [boolean] Whether the pages hold member data to archive.
+        @param encoding [String] Encoding of member names and member data given as text.
+        '''
+        self.path = path
+        self.with_member_data = with_member_data
+        self.encoding = encoding
+        self._count = 0
+        self._sections = [tempfile.TemporaryFile() for index in range(6 if with_member_data else 4)]
+        self._member_offset = 0
+        self._data_offset = 0
+        self._sections[2].write(_OFFSET.pack(0))
+        if with_member_data:
+            self._sections[4].write(_OFFSET.pack(0))
+
+    def add(self, columns):
+        '''
+        Add a page of leaders.
+
+        @param columns [LeaderColumns] Page of leaders in the +columnar+ result format.
+        '''
+        scores, ranks = array('d', columns.scores), array('q', columns.ranks)
+        if _BIG_ENDIAN:
+            scores.byteswap()
+            ranks.byteswap()
+        self._sections[0].write(scores.tobytes())
+        self._sections[1].write(ranks.tobytes())
+
+        self._member_offset = self._write_blob(
+            self._sections[2], self._sections[3], columns.members, self._member_offset)
+        if self.with_member_data:
+            self._data_offset = self._write_blob(
+                self._sections[4], self._sections[5], columns.member_data, self._data_offset)
+        self._count += len(columns)
+
+    def close(self, order='desc'):
+        '''
+        Write the archive.
+
+        @param order [String] Order of the leaderboard, 'desc' or 'asc'.
+        @return the number of members archived.
+        '''
+        flags = (HAS_MEMBER_DATA if self.with_member_data else 0) | (ASCENDING if order == 'asc' else 0)
+        offsets = []
+        offset = _HEADER.size
+        for section in self._sections:
+            offsets.append(offset)
+            offset += _aligned(section.tell())
+        offsets.extend([0] * (6 - len(offsets)))
+
+        temporary_path = '%s.tmp' % self.path
+        try:
+            with open(temporary_path, 'wb') as archive:
+                archive.write(_HEADER.pack(MAGIC, 1, flags, self._count, *offsets))
+                for section in self._sections:
+                    size = section.tell()
+                    section.seek(0)
+                    shutil.copyfileobj(section, archive)
+                    archive.write(b'\0' * (_aligned(size) - size))
+            os.rename(temporary_path, self.path)
+        finally:
+            self.discard()
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+        return self._count
+
+    def discard(self):
+        '''
+        Drop the sections written so far without writing the archive.
+        '''
+        for section in self._sections:
+            section.close()
+
+    def _write_blob(self, index, blob, values, offset):
+        chunk = [_encode(value, self.encoding) for value in values]
+        offsets = array('Q')
+        for value in chunk:
+            offset += len(value)
+            offsets.append(offset)
+        if _BIG_ENDIAN:
+            offsets.byteswap()
+        index.write(offsets.tobytes())
+        blob.write(b''.join(chunk))
+        return offset
+
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+
+class LeaderboardArchive(object):
+    '''
+    Read-only view of an archive, memory mapped so that only the leaders read are paged
+    in. Positions start at 1 for the first leader, as with +member_at+.
+    '''
+
+    def __init__(self, path, encoding='utf-8'):
+        '''
+        Open an archive.
+
+        @param path [String] Path of the archive.
+        @param encoding [String] Encoding used to decode member names and member data, or
+          +None+ to return them as bytes.
+        '''
+        self.path = path
+        self.encoding = encoding
+        with open(path, 'rb') as archive:
+            self._map = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = _HEADER.unpack_from(self._map, 0)
+        if header[0] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a leaderboard archive' % path)
+
+        flags = header[2]
+        self.has_member_data = bool(flags & HAS_MEMBER_DATA)
+        self.order = 'asc' if flags & ASCENDING else 'desc'
+        self._count = header[3]
+        (self._scores, self._ranks, self._member_index, self._member_blob,
+         self._data_index, self._data_blob) = header[4:]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(1, self._count + 1):
+            yield self.member_at(position)
+
+    def close(self):
+        '''
+        Unmap the archive.
+        '''
+        self._map.close()
+
+    def member_at(self, position):
+        '''
+        Leader at a position of the archive, in O(1).
+
+        @param position [int] Position in the archive, from 1.
+        @return a +Leader+ record, or +None+ if the position is out of range.
+        '''
+        if not 0 < position <= self._count:
+            return None
+
+        index = position - 1
+        return Leader(
+            self._member(index),
+            _RANK.unpack_from(self._map, self._ranks + index * _RANK.size)[0],
+            _SCORE.unpack_from(self._map, self._scores + index * _SCORE.size)[0],
+            self._member_data(index))
+
+    def iter_members(self, with_member_data=True):
+        '''
+        Iterate over the members of the archive in order, as (member, score, member_data)
+        tuples accepted by +rank_members_in+.
+
+        @param with_member_data [boolean] Whether to include the member data.
+        @return a generator of tuples.
+        '''
+        for index in range(self._count):
+            yield (
+                self._member(index),
+                _SCORE.unpack_from(self._map, self._scores + index * _SCORE.size)[0],
+                self._member_data(index) if with_member_data else None)
+
+    def _member(self, index):
+        return self._decode(self._blob(self._member_index, self._member_blob, index))
+
+    def _member_data(self, index):
+        if not self.has_member_data:
+            return None
+        member_data = self._blob(self._data_index, self._data_blob, index)
+        return self._decode(member_data) if member_data else None
+
+    def _blob(self, index_offset, blob_offset, index):
+        start, end = struct.unpack_from('<QQ', self._map, index_offset + index * _OFFSET.size)
+        return self._map[blob_offset + start:blob_offset + end]
+
+    def _decode(self, value):
+        return value if self.encoding is None else value.decode(self.encoding)
@@ -0,0 +1,1062 @@
+from .leaderboard import Leaderboard, chunked_members
+from .tie_ranking_leaderboard import TieRankingLeaderboard
+from .competition_ranking_leaderboard import CompetitionRankingLeaderboard
+from .page_cache import PageCache
+from . import result_formats
+from . import scripts
+from . import snapshot
+from . import archive
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import math
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    try:
+        import aioredis
+    # aioredis 2 fails to import on Python 3.11 and later
+    except (ImportError, TypeError):
+        aioredis = None
+
+
+class AsyncAutoPipelineMixin(object):
+    '''
+    Send the commands issued by tasks on an asyncio redis client during the same
+    iteration of the event loop, or within +auto_pipeline_delay+ seconds if set, as a
+    single pipeline of up to +auto_pipeline_max_commands+ commands. Each task gets back
+    the response, or raises the error, of its own command.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self.auto_pipeline_delay = kwargs.pop('auto_pipeline_delay', 0)
+        self.auto_pipeline_max_commands = kwargs.pop('auto_pipeline_max_commands', 1000)
+        super(AsyncAutoPipelineMixin, self).__init__(*args, **kwargs)
+        self._queue = []
+        self._sender = None
+
+    async def execute_command(self, *args, **options):
+        response = asyncio.get_running_loop().create_future()
+        self._queue.append((args, options, response))
+        if self._sender is None:
+            self._sender = asyncio.ensure_future(self._send_queued())
+
+        return await response
+
+    async def _send_queued(self):
+        '''
+        Send the queued commands in pipelines until the queue is empty.
+        '''
+        batch = []
+        try:
+            await asyncio.sleep(self.auto_pipeline_delay)
+            while self._queue:
+                batch = self._queue[:self.auto_pipeline_max_commands]
+                del self._queue[:self.auto_pipeline_max_commands]
+
+                try:
+                    pipeline = self.pipeline(transaction=False)
+                    for args, options, response in batch:
+                        pipeline.execute_command(*args, **options)
+                    responses = await pipeline.execute(raise_on_error=False)
+                except Exception as error:
+                    responses = [error] * len(batch)
+
+                for (args, options, response), result in zip(batch, responses):
+                    if response.done():
+                        continue
+                    if isinstance(result, Exception):
+                        response.set_exception(result)
+                    else:
+                        response.set_result(result)
+        finally:
+            self._sender = None
+            for args, options, response in batch + self._queue:
+                if not response.done():
+                    response.cancel()
+            del self._queue[:]
+
+
+if aioredis is not None:
+    class AsyncAutoPipelineRedis(AsyncAutoPipelineMixin, aioredis.Redis):
+        '''
+        asyncio redis client sending the commands issued by concurrent tasks as a
+        single pipeline. See +AsyncAutoPipelineMixin+.
+        '''
+
+
+class AsyncSingleFlight(object):
+    '''
+    Collapse identical reads made concurrently by several tasks into one. The first task
+    to make a read starts it; tasks making the same read before it returns await it and
+    get a copy of its result, or raise its error, instead of reading again.
+    '''
+
+    def __init__(self):
+        self._flights = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    async def do(self, key, fetch, copy=None):
+        '''
+        Run a read unless the same read is already in flight.
+
+        @param key Hashable description of the read.
+        @param fetch [function] Function returning a coroutine making the read.
+        @param copy [function] Optional function copying the result for each task.
+        @return the result of the read.
+        '''
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(fetch())
+            flight.add_done_callback(lambda done: self._flights.pop(key, None))
+
+        # a task cancelled while waiting leaves the read running for the others
+        result = await asyncio.shield(flight)
+        return result if copy is None else copy(result)
+
+
+class AsyncPageCache(PageCache):
+    '''
+    +PageCache+ for asyncio applications, reading pages and versions with coroutines.
+    '''
+
+    async def get(self, leaderboard_name, key, fetch, version):
+        '''
+        Retrieve a page of the named leaderboard, reading it on a miss, as for +PageCache.get+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param key Hashable description of the page within the leaderboard.
+        @param fetch [function] Function returning a coroutine reading the page from redis.
+        @param version [function] Function returning a coroutine reading the current version of the leaderboard from redis.
+        @return the page.
+        '''
+        cache_key = (leaderboard_name, key)
+        generation, entry = self._lookup(leaderboard_name, cache_key)
+        if entry is not None and self.clock() - entry[1] < self.ttl:
+            return entry[3]
+
+        current_version = await version()
+        checked_at = self.clock()
+        if self._checked(cache_key, generation, entry, current_version, checked_at):
+            return entry[3]
+
+        page = await fetch()
+        self._store(leaderboard_name, cache_key, generation, current_version, checked_at, page)
+        return page
+
+
+class AsyncLeaderboard(Leaderboard):
+    '''
+    Leaderboard for asyncio applications, backed by the asyncio client of redis-py
+    (+redis.asyncio+, redis-py 4.2 or later) or by aioredis 2. Methods that talk to
+    redis are coroutines with the same arguments and results as their +Leaderboard+
+    counterparts, and keep the same pipelines and server-side scripts, so each call
+    costs the same number of round trips.
+
+    Methods that only compute their arguments and delegate, such as +leaders_in+ or
+    +members_from_score_range_in+, return the awaitable of the method they delegate to.
+
+    The +page_cache+ option keeps an +AsyncPageCache+, and writes move the version of
+    their leaderboard on as they do for +Leaderboard+. The +write_behind+ option, which
+    relies on a thread, and the +memory+ backend are not supported.
+    '''
+
+    def __init__(self, leaderboard_name, **options):
+        '''
+        Initialize a connection to a specific leaderboard.
+
+        The options are the same as for +Leaderboard+, except that +redis_connection+,
+        +connection+, +connection_pool+ and +read_replicas+ handles must be asyncio clients
+        and pools, and that +pools+ is ignored.
+        '''
+        if aioredis is None:
+            raise ImportError(
+                'AsyncLeaderboard needs redis-py 4.2 or later, or aioredis 2')
+        if options.get('write_behind'):
+            raise ValueError('write_behind is not supported by async leaderboards')
+        if options.get('backend') == Leaderboard.MEMORY:
+            raise ValueError('the memory backend is not supported by async leaderboards')
+
+        self._primary_reads = contextvars.ContextVar('primary_reads', default=0)
+
+        super(AsyncLeaderboard, self).__init__(leaderboard_name, **options)
+        if self._single_flight is not None:
+            self._single_flight = AsyncSingleFlight()
+        if self._page_cache is not None:
+            self._page_cache = AsyncPageCache(self._page_cache.max_entries, self._page_cache.ttl)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        '''
+        Close the connections of the leaderboard.
+        '''
+        for connection in [self.redis_connection] + self.read_connections:
+            await connection.connection_pool.disconnect()
+
+    @contextmanager
+    def read_your_writes(self):
+        '''
+        Send the reads made by the current task inside the block to the primary rather
+        than to a read replica, so they see the writes made before them.
+        '''
+        token = self._primary_reads.set(self._primary_reads.get() + 1)
+        try:
+            yield self
+        finally:
+            self._primary_reads.reset(token)
+
+    async def delete_leaderboard_named(self, leaderboard_name):
+        '''
+        Delete the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        keys = self._stored_keys_for(leaderboard_name)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.delete(key)
+        self._drop_version_in(leaderboard_name, pipeline)
+        await pipeline.execute()
+
+    async def rank_member_in(
+            self, leaderboard_name, member, score, member_data=None):
+        '''
+        Rank a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        await self._write_members_in(
+            leaderboard_name, [('rank', member, score, member_data)])
+
+    async def rank_member_across(
+            self, leaderboards, member, score, member_data=None):
+        '''
+        Rank a member across multiple leaderboards in a single round trip.
+
+        @param leaderboards [Array] Leaderboard names.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        pipeline = self._pipeline_for(self._keys_for(leaderboards))
+        for leaderboard_name in leaderboards:
+            await self._write_members_in(
+                leaderboard_name, [('rank', member, score, member_data)], client=pipeline)
+        await pipeline.execute()
+
+    async def rank_member_if_in(
+            self,
+            leaderboard_name,
+            rank_conditional,
+            member,
+            score,
+            member_data=None):
+        '''
+        Rank a member in the named leaderboard based on execution of the +rank_conditional+,
+        a conditional mode or a function, as for +Leaderboard.rank_member_if_in+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param rank_conditional [String, function] Conditional mode, or function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member_data.
+        @return +True+ if the member was ranked, +False+ otherwise.
+        '''
+        if rank_conditional in self.CONDITIONAL_MODES:
+            if self._write_script_in(leaderboard_name) is not None:
+                return await self._write_members_in(
+                    leaderboard_name, [(rank_conditional, member, score, member_data)]) is not None
+
+            return await self._write_in(
+                leaderboard_name,
+                lambda client: self._script(scripts.RANK_MEMBER_IF)(
+                    keys=[leaderboard_name, self._member_data_key(leaderboard_name)],
+                    args=[rank_conditional, member, score, member_data or ''],
+                    client=client)) == 1
+
+        current_score = await self.redis_connection.zscore(leaderboard_name, member)
+        if current_score is not None:
+            current_score = float(current_score)
+
+        if rank_conditional(self, member, current_score, score, member_data, {'reverse': self.order}):
+            await self.rank_member_in(leaderboard_name, member, score, member_data)
+            return True
+
+        return False
+
+    async def rank_members_in(self, leaderboard_name, members_and_scores,
+                              chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, progress=None):
+        '''
+        Rank an array of members in the named leaderboard, in chunks of one round trip each.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members_and_scores [Array] Variable list of members and scores, or an iterable of
+          (member, score) or (member, score, member_data) tuples.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members ranked so far after each chunk.
+        @return the number of members ranked.
+        '''
+        total = 0
+        for chunk in chunked_members(members_and_scores, chunk_size):
+            pipeline = self.redis_connection.pipeline()
+            await self._write_members_in(
+                leaderboard_name,
+                [('rank', member, score, member_data) for member, score, member_data in chunk],
+                client=pipeline)
+            await pipeline.execute()
+
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+
+        return total
+
+    async def update_member_data_in(self, leaderboard_name, member, member_data):
+        '''
+        Update the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param member_data [String] Optional member data.
+        '''
+        await self._write_in(
+            leaderboard_name,
+            lambda client: client.hset(
+                self._member_data_key(leaderboard_name), member, member_data))
+
+    async def remove_member_data_in(self, leaderboard_name, member):
+        '''
+        Remove the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        await self._write_in(
+            leaderboard_name,
+            lambda client: client.hdel(self._member_data_key(leaderboard_name), member))
+
+    async def remove_member_from(self, leaderboard_name, member):
+        '''
+        Remove a member and its optional member data from the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        await self._write_members_in(
+            leaderboard_name, [('remove', member, 0, None)])
+
+    async def change_score_for_member_in(self, leaderboard_name, member, delta, member_data=None):
+        '''
+        Change the score for a member in the named leaderboard by a delta which can be positive or negative.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param delta [float] Score change.
+        @param member_data [String] Optional member data.
+        '''
+        await self._write_members_in(
+            leaderboard_name, [('change', member, delta, member_data)])
+
+    async def remove_members_in_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Remove members from the named leaderboard in a given score range.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        '''
+        if self.track_aggregates:
+            await self._remove_range_in(leaderboard_name, 'score', min_score, max_score)
+        else:
+            await self._write_in(
+                leaderboard_name,
+                lambda client: client.zremrangebyscore(leaderboard_name, min_score, max_score))
+
+    async def remove_members_outside_rank_in(self, leaderboard_name, rank):
+        '''
+        Remove members from the named leaderboard in a given rank range.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param rank [int] the rank (inclusive) which we should keep.
+        @return the total member count which was removed.
+        '''
+        if self.track_aggregates:
+            return await self._remove_range_in(leaderboard_name, 'rank', rank, -1)
+
+        if self.order == self.DESC:
+            start, stop = 0, -(rank) - 1
+        else:
+            start, stop = rank, -1
+
+        return await self._write_in(
+            leaderboard_name,
+            lambda client: client.zremrangebyrank(leaderboard_name, start, stop))
+
+    async def expire_leaderboard_for(self, leaderboard_name, seconds):
+        '''
+        Expire the given leaderboard in a set number of seconds.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param seconds [int] Number of seconds after which the leaderboard will be expired.
+        '''
+        keys = self._stored_keys_for(leaderboard_name)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expire(key, seconds)
+        self._bump_version_in(leaderboard_name, pipeline, seconds=seconds)
+        await pipeline.execute()
+
+    async def expire_leaderboard_at_for(self, leaderboard_name, timestamp):
+        '''
+        Expire the given leaderboard at a specific UNIX timestamp.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param timestamp [int] UNIX timestamp at which the leaderboard will be expired.
+        '''
+        keys = self._stored_keys_for(leaderboard_name)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expireat(key, timestamp)
+        self._bump_version_in(leaderboard_name, pipeline, timestamp=timestamp)
+        await pipeline.execute()
+
+    async def total_pages_in(self, leaderboard_name, page_size=None):
+        '''
+        Retrieve the total number of pages in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param page_size [int, nil] Page size to be used when calculating the total number of pages.
+        @return the total number of pages in the named leaderboard.
+        '''
+        if page_size is None:
+            page_size = self.page_size
+
+        return int(math.ceil(
+            await self.total_members_in(leaderboard_name) / float(page_size)))
+
+    async def total_scores_in(self, leaderboard_name):
+        '''
+        Sum of scores for all members in the named leaderboard.
+
+        @param leaderboard_name Name of the leaderboard.
+        @return Sum of scores for all members in the named leaderboard.
+        '''
+        return (await self.aggregates_in(leaderboard_name))['sum']
+
+    async def aggregates_in(self, leaderboard_name):
+        '''
+        Aggregate statistics of the scores of all members in the named leaderboard, as for
+        +Leaderboard.aggregates_in+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        if self.track_aggregates:
+            pipeline = self._reader().pipeline(transaction=False)
+            pipeline.hmget(
+                self._aggregates_key(leaderboard_name), 'count', 'sum', 'squares', 'shift')
+            pipeline.zrange(leaderboard_name, 0, 0, withscores=True)
+            pipeline.zrange(leaderboard_name, -1, -1, withscores=True)
+            aggregates = self._tracked_aggregates(await pipeline.execute())
+            if aggregates is not None:
+                return aggregates
+
+        return await self._aggregates_in_range(leaderboard_name, 'rank', 0, -1)
+
+    async def rebuild_aggregates_in(self, leaderboard_name):
+        '''
+        Recompute the tracked aggregates of the named leaderboard from its scores.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        await self._script(scripts.AGGREGATES)(
+            keys=[leaderboard_name, self._aggregates_key(leaderboard_name)],
+            args=[self.order, 'rank', 0, -1])
+
+    async def check_member_in(self, leaderboard_name, member):
+        '''
+        Check to see if a member exists in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return +true+ if the member exists in the named leaderboard, +false+ otherwise.
+        '''
+        return await self._reader().zscore(leaderboard_name, member) is not None
+
+    async def rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the rank for a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return the rank for a member in the leaderboard.
+        '''
+        return (await self.ranked_in_list_in(leaderboard_name, [member]))[0][self.RANK_KEY]
+
+    async def score_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score for a member in the named leaderboard.
+
+        @param leaderboard_name Name of the leaderboard.
+        @param member [String] Member name.
+        @return the score for a member in the leaderboard or +None+ if the member is not in the leaderboard.
+        '''
+        score = await self._reader().zscore(leaderboard_name, member)
+        if score is not None:
+            score = float(score)
+
+        return score
+
+    async def score_and_rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score and rank for a member in the named leaderboard in a single round trip.
+
+        @param leaderboard_name [String]Name of the leaderboard.
+        @param member [String] Member name.
+        @return the score and rank for a member in the named leaderboard as a Hash.
+        '''
+        return (await self.ranked_in_list_in(leaderboard_name, [member]))[0]
+
+    async def page_for_in(self, leaderboard_name, member,
+                          page_size=Leaderboard.DEFAULT_PAGE_SIZE):
+        '''
+        Determine the page where a member falls in the named leaderboard.
+
+        @param leaderboard [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param page_size [int] Page size to be used in determining page location.
+        @return the page where a member falls in the leaderboard.
+        '''
+        if self.order == self.ASC:
+            rank_for_member = await self._reader().zrank(leaderboard_name, member)
+        else:
+            rank_for_member = await self._reader().zrevrank(leaderboard_name, member)
+
+        if rank_for_member is None:
+            rank_for_member = 0
+        else:
+            rank_for_member += 1
+
+        return int(math.ceil(float(rank_for_member) / float(page_size)))
+
+    async def percentile_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the percentile for a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return the percentile for a member in the named leaderboard.
+        '''
+        pipeline = self._reader().pipeline()
+        pipeline.zcard(leaderboard_name)
+        pipeline.zrevrank(leaderboard_name, member)
+        total_members, rank = await pipeline.execute()
+        if rank is None:
+            return None
+
+        percentile = math.ceil(
+            float(total_members - rank - 1) / float(total_members) * 100)
+
+        if self.order == self.ASC:
+            return 100 - percentile
+        else:
+            return percentile
+
+    async def score_for_percentile_in(self, leaderboard_name, percentile):
+        '''
+        Calculate the score for a given percentile value in the leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param percentile [float] Percentile value (0.0 to 100.0 inclusive).
+        @return the score corresponding to the percentile argument. Return +None+ for arguments outside 0-100 inclusive and for leaderboards with no members.
+        '''
+        if not 0 <= percentile <= 100:
+            return None
+
+        total_members = await self.total_members_in(leaderboard_name)
+        if total_members < 1:
+            return None
+
+        if self.order == self.ASC:
+            percentile = 100 - percentile
+
+        index = (total_members - 1) * (percentile / 100.0)
+
+        scores = [
+            pair[1] for pair in await self._reader().zrange(
+                leaderboard_name,
+                int(math.floor(index)),
+                int(math.ceil(index)),
+                withscores=True)]
+
+        if index == math.floor(index):
+            return scores[0]
+        else:
+            interpolate_fraction = index - math.floor(index)
+            return scores[0] + interpolate_fraction * (scores[1] - scores[0])
+
+    async def all_leaders_from(self, leaderboard_name, **options):
+        '''
+        Retrieves all leaders from the named leaderboard in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return the named leaderboard.
+        '''
+        return await self._members_from_page_in(
+            leaderboard_name, 'rank', 0, -1, **options)
+
+    async def iter_leaders_from(self, leaderboard_name,
+                                chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, **options):
+        '''
+        Iterate asynchronously over all leaders of the named leaderboard, fetching them in
+        windows of +chunk_size+ ranks, one round trip per window.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return an asynchronous generator of the leaders from the named leaderboard.
+        '''
+        async for leaders in self._iter_pages_from(leaderboard_name, chunk_size, **options):
+            for leader in leaders:
+                yield leader
+
+    async def snapshot_arrays_in(self, leaderboard_name, chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE):
+        '''
+        Copy the whole named leaderboard into NumPy arrays for analytics, fetching it in
+        windows of +chunk_size+ ranks, one round trip per window. Requires numpy.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @return a +LeaderboardSnapshot+ of the named leaderboard.
+        '''
+        builder = snapshot.SnapshotBuilder()
+        async for columns in self._iter_pages_from(
+                leaderboard_name, chunk_size, result_format=self.COLUMNAR):
+            builder.add(columns)
+
+        return builder.build(self.order, self.DENSE_RANKS)
+
+    async def export_archive_from(self, leaderboard_name, path,
+                                  chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, with_member_data=False):
+        '''
+        Write the whole named leaderboard to a binary archive file, fetching it in windows
+        of +chunk_size+ ranks, one round trip per window.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param with_member_data [boolean] Whether to archive the member data.
+        @return the number of members archived.
+        '''
+        writer = archive.ArchiveWriter(path, with_member_data)
+        try:
+            async for columns in self._iter_pages_from(
+                    leaderboard_name, chunk_size, result_format=self.COLUMNAR,
+                    with_member_data=with_member_data):
+                writer.add(columns)
+        except:
+            writer.discard()
+            raise
+
+        return writer.close(self.order)
+
+    async def restore_archive_in(self, leaderboard_name, path,
+                                 chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, progress=None):
+        '''
+        Rank the members of a binary archive file in the named leaderboard, in chunks of one
+        round trip each.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members restored so far after each chunk.
+        @return the number of members restored.
+        '''
+        with archive.LeaderboardArchive(path, encoding=None) as leaders:
+            return await self.rank_members_in(
+                leaderboard_name, leaders.iter_members(), chunk_size, progress)
+
+    async def _iter_pages_from(self, leaderboard_name, chunk_size, **options):
+        '''
+        Iterate asynchronously over all leaders of the named leaderboard, one window of
+        +chunk_size+ ranks at a time.
+
+        @return an asynchronous generator of pages of leaders.
+        '''
+        offset = 0
+        while True:
+            leaders = await self._members_from_page_in(
+                leaderboard_name, 'rank', offset, offset + chunk_size - 1, **options)
+            if len(leaders):
+                yield leaders
+            if len(leaders) < chunk_size:
+                return
+            offset += chunk_size
+
+    async def member_at_in(self, leaderboard_name, position, **options):
+        '''
+        Retrieve a member at the specified index from the leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param position [int] Position in named leaderboard.
+        @param options [Hash] Options to be used when retrieving the member from the named leaderboard.
+        @return a page of leaders from the named leaderboard.
+        '''
+        if position < 1:
+            return None
+
+        leaders = await self._members_from_page_in(
+            leaderboard_name, 'rank', position - 1, position - 1, **options)
+        if leaders:
+            return leaders[0]
+
+    async def ranked_in_list_in(self, leaderboard_name, members, **options):
+        '''
+        Retrieve a page of leaders from the named leaderboard for a given list of members,
+        with their member data if requested, in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members [Array] Member names.
+        @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
+        @return a page of leaders from the named leaderboard for a given list of members.
+        '''
+        if not members:
+            return []
+
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
+        rank_key = self._slice_rank_key(leaderboard_name)
+
+        if rank_key is None:
+            pipeline = self._reader().pipeline()
+            for member in members:
+                pipeline.zscore(leaderboard_name, member)
+            for member in members:
+                if self.order == self.ASC:
+                    pipeline.zrank(leaderboard_name, member)
+                else:
+                    pipeline.zrevrank(leaderboard_name, member)
+            if with_member_data:
+                pipeline.hmget(self._member_data_key(leaderboard_name), members)
+            responses = await pipeline.execute()
+            scores = responses[:len(members)]
+            ranks = [
+                rank + 1 if rank is not None else None
+                for rank in responses[len(members):2 * len(members)]]
+        else:
+            responses = await self._script(scripts.RANKED_IN_LIST)(
+                keys=[
+                    leaderboard_name,
+                    rank_key,
+                    self._member_data_key(leaderboard_name)],
+                args=[self.order, int(with_member_data)] + list(members),
+                client=self._reader())
+            scores, ranks = responses[0], responses[1]
+
+        ranks_for_members = []
+        for index, member in enumerate(members):
+            if ranks[index] is None and not options.get('include_missing', True):
+                continue
+
+            data = {}
+            data[self.MEMBER_KEY] = member
+            data[self.RANK_KEY] = ranks[index]
+            data[self.SCORE_KEY] = float(scores[index]) if scores[index] is not None else None
+            if with_member_data:
+                data[self.MEMBER_DATA_KEY] = responses[-1][index]
+
+            ranks_for_members.append(data)
+
+        if 'sort_by' in options:
+            ranks_for_members = self._sort_members(
+                ranks_for_members, options['sort_by'])
+
+        return ranks_for_members
+
+    async def merge_leaderboards(self, destination, keys, aggregate='SUM'):
+        '''
+        Merge leaderboards given by keys with this leaderboard into a named destination leaderboard.
+
+        @param destination [String] Destination leaderboard name.
+        @param keys [Array] Leaderboards to be merged with the current leaderboard.
+        @param aggregate [String] 'SUM', 'MIN' or 'MAX'.
+        '''
+        keys = [self.leaderboard_name] + list(keys)
+        if not self._same_slot([destination] + keys):
+            raise ValueError('async leaderboards can only merge keys in the same cluster slot')
+
+        pipeline = self._pipeline_for([destination] + keys)
+        pipeline.zunionstore(destination, keys, aggregate)
+        self._bump_version_in(destination, pipeline)
+        await pipeline.execute()
+        if self.track_aggregates:
+            await self.rebuild_aggregates_in(destination)
+
+    async def intersect_leaderboards(self, destination, keys, aggregate='SUM'):
+        '''
+        Intersect leaderboards given by keys with this leaderboard into a named destination leaderboard.
+
+        @param destination [String] Destination leaderboard name.
+        @param keys [Array] Leaderboards to be intersected with the current leaderboard.
+        @param aggregate [String] 'SUM', 'MIN' or 'MAX'.
+        '''
+        keys = [self.leaderboard_name] + list(keys)
+        if not self._same_slot([destination] + keys):
+            raise ValueError('async leaderboards can only intersect keys in the same cluster slot')
+
+        pipeline = self._pipeline_for([destination] + keys)
+        pipeline.zinterstore(destination, keys, aggregate)
+        self._bump_version_in(destination, pipeline)
+        await pipeline.execute()
+        if self.track_aggregates:
+            await self.rebuild_aggregates_in(destination)
+
+    async def _write_members_in(self, leaderboard_name, writes, client=None):
+        '''
+        Rank, change the score of or remove members in the named leaderboard. Uses the
+        script given by +_write_script_in+ if there is one, and plain commands otherwise.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param writes [Array] (operation, member, value, member_data) tuples applied in order. The
+          operation is one of 'rank', 'change' or 'remove', or a conditional mode if there is a script.
+        @param client Pipeline to queue the writes on, or +None+ to send them immediately.
+        @return the new score for the last member written if written by a script sent immediately.
+        '''
+        script = self._write_script_in(leaderboard_name)
+        if script is not None:
+            source, keys = script
+            args = []
+            for operation, member, value, member_data in writes:
+                args.extend([operation, member, value, member_data or ''])
+            return await self._write_in(
+                leaderboard_name,
+                lambda client: self._script(source)(keys=keys, args=args, client=client),
+                client)
+
+        pipeline = self.redis_connection.pipeline() if client is None else client
+        for operation, member, value, member_data in writes:
+            if operation == 'remove':
+                pipeline.zrem(leaderboard_name, member)
+                pipeline.hdel(self._member_data_key(leaderboard_name), member)
+                continue
+
+            if operation == 'change':
+                pipeline.execute_command('ZINCRBY', leaderboard_name, value, member)
+            else:
+                pipeline.execute_command('ZADD', leaderboard_name, value, member)
+            if member_data:
+                pipeline.hset(self._member_data_key(leaderboard_name), member, member_data)
+        self._bump_version_in(leaderboard_name, pipeline)
+
+        if client is None:
+            await pipeline.execute()
+
+    async def _write_in(self, leaderboard_name, write, client=None):
+        '''
+        Run a write to the named leaderboard, bumping its version for the page cache in
+        the same round trip if the page cache is enabled, as for +Leaderboard._write_in+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param write [function] Function returning the awaitable of the write sent or queued on the redis connection or pipeline it is given.
+        @param client Pipeline to queue the write on, or +None+ to send it immediately.
+        @return the result of the write.
+        '''
+        if self._page_cache is None:
+            return await write(self.redis_connection if client is None else client)
+
+        pipeline = self.redis_connection.pipeline() if client is None else client
+        result = await write(pipeline)
+        self._bump_version_in(leaderboard_name, pipeline)
+        if client is None:
+            return (await pipeline.execute())[0]
+
+        return result
+
+    def _write_script_in(self, leaderboard_name):
+        '''
+        Script applying writes to the named leaderboard, and its keys.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a (script source, keys) tuple, or +None+ to write with plain commands.
+        '''
+        if not self.track_aggregates:
+            return None
+
+        return scripts.TRACKED_WRITE, [
+            leaderboard_name,
+            self._aggregates_key(leaderboard_name),
+            self._member_data_key(leaderboard_name)]
+
+    async def _remove_range_in(self, leaderboard_name, mode, first, second, client=None):
+        return await self._write_in(
+            leaderboard_name,
+            lambda client: self._script(scripts.REMOVE_RANGE)(
+                keys=[leaderboard_name, self._aggregates_key(leaderboard_name)],
+                args=[self.order, mode, first, second],
+                client=client),
+            client)
+
+    async def _aggregates_in_range(self, leaderboard_name, mode, first, second):
+        totals = None
+        while True:
+            response = await self._script(scripts.AGGREGATES)(
+                keys=[leaderboard_name],
+                args=[self.order, mode, first, second,
+                      totals[0] if totals else 0, self.DEFAULT_CHUNK_SIZE],
+                client=self._reader())
+            totals = self._add_aggregates_chunk(totals, response)
+            if response[0] < self.DEFAULT_CHUNK_SIZE:
+                return self._aggregates_of(totals)
+
+    async def _cached_page_in(self, leaderboard_name, mode, first, second, **options):
+        if self._page_cache is None:
+            return await self._shared_page_in(
+                leaderboard_name, mode, first, second, **options)
+
+        page = await self._page_cache.get(
+            leaderboard_name,
+            (mode, first, second, self.order, tuple(sorted(options.items()))),
+            lambda: self._shared_page_in(
+                leaderboard_name, mode, first, second, **options),
+            lambda: self._page_version_in(leaderboard_name))
+
+        return result_formats.copy_page(page)
+
+    async def _page_version_in(self, leaderboard_name):
+        pipeline = self._reader().pipeline(transaction=False)
+        pipeline.get(self._version_key(leaderboard_name))
+        pipeline.zcard(leaderboard_name)
+        return tuple(await pipeline.execute())
+
+    async def _shared_page_in(self, leaderboard_name, mode, first, second, **options):
+        if self._single_flight is None:
+            return await self._members_from_page_in(
+                leaderboard_name, mode, first, second, **options)
+
+        return await self._single_flight.do(
+            (leaderboard_name, mode, first, second, tuple(sorted(options.items()))),
+            lambda: self._members_from_page_in(
+                leaderboard_name, mode, first, second, **options),
+            result_formats.copy_page)
+
+    async def _members_from_page_in(
+            self, leaderboard_name, mode, first, second, members_only=False, **options):
+        '''
+        Retrieve a contiguous page of members from the named leaderboard in a single
+        round trip, as for +Leaderboard._members_from_page_in+.
+        '''
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
+
+        keys = [leaderboard_name, self._member_data_key(leaderboard_name)]
+        rank_key = self._slice_rank_key(leaderboard_name)
+        if rank_key is not None:
+            keys.append(rank_key)
+
+        response = await self._script(scripts.PAGE)(
+            keys=keys,
+            args=[self.order, int(with_member_data), mode, first, second],
+            client=self._reader())
+        if not response:
+            return self._parse_raw_members(
+                leaderboard_name, [], members_only, starting_offset=0, **options)
+
+        raw_leader_data = response[2]
+        return self._parse_raw_members(
+            leaderboard_name,
+            list(zip(raw_leader_data[0::2], raw_leader_data[1::2])),
+            members_only,
+            starting_offset=response[0],
+            members_ahead=response[1],
+            member_data=response[3] if with_member_data else None,
+            **options)
+
+    def _connection(self, options):
+        connection = options.pop('connection', None)
+        if connection is not None:
+            return connection
+
+        options.pop('pools', None)
+        return self._client(
+            host=options.pop('host', self.DEFAULT_REDIS_HOST),
+            port=options.pop('port', self.DEFAULT_REDIS_PORT),
+            db=options.pop('db', self.DEFAULT_REDIS_DB),
+            **options)
+
+    def _client(self, **options):
+        if self.auto_pipeline:
+            options.update(self._auto_pipeline_options)
+            return AsyncAutoPipelineRedis(**options)
+
+        return aioredis.Redis(**options)
+
+    def _replica_connection(self, replica, connection_options):
+        if not isinstance(replica, dict):
+            return replica
+
+        options = dict(
+            (key, value) for key, value in connection_options.items()
+            if key not in ['redis_connection', 'connection', 'connection_pool'])
+        options.update(replica)
+        return self._connection(options)
+
+    def _reader(self):
+        if self._primary_reads.get():
+            return self.redis_connection
+
+        return super(AsyncLeaderboard, self)._reader()
+
+
+class AsyncTieRankingLeaderboard(AsyncLeaderboard, TieRankingLeaderboard):
+    '''
+    +TieRankingLeaderboard+ for asyncio applications. Writes update the leaderboard
+    and the ties leaderboard atomically with a single script call, as they do for
+    +TieRankingLeaderboard+.
+    '''
+
+    async def remove_members_in_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Remove members from the named leaderboard and the ties leaderboard in a given score range.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        '''
+        pipeline = self._pipeline_for(self._stored_keys_for(leaderboard_name))
+        if self.track_aggregates:
+            await self._remove_range_in(
+                leaderboard_name, 'score', min_score, max_score, client=pipeline)
+        else:
+            pipeline.zremrangebyscore(leaderboard_name, min_score, max_score)
+            self._bump_version_in(leaderboard_name, pipeline)
+        pipeline.zremrangebyscore(
+            self._ties_leaderboard_key(leaderboard_name), min_score, max_score)
+        await pipeline.execute()
+
+    def _write_script_in(self, leaderboard_name):
+        keys = [
+            leaderboard_name,
+            self._ties_leaderboard_key(leaderboard_name),
+            self._member_data_key(leaderboard_name)]
+        if self.track_aggregates:
+            keys.append(self._aggregates_key(leaderboard_name))
+
+        return scripts.TIE_WRITE, keys
+
+
+class AsyncCompetitionRankingLeaderboard(AsyncLeaderboard, CompetitionRankingLeaderboard):
+    '''
+    +CompetitionRankingLeaderboard+ for asyncio applications.
+    '''
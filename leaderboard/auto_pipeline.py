@@ -0,0 +1,101 @@
+from redis import Redis
+import threading
+import time
+
+
+class _QueuedCommand(object):
+    '''
+    A command waiting to be sent in the next pipeline, and its response once sent.
+    '''
+
+    __slots__ = ['args', 'options', 'ready', 'leads', 'response']
+
+    def __init__(self, args, options):
+        self.args = args
+        self.options = options
+        self.ready = threading.Event()
+        self.leads = False
+        self.response = None
+
+
+class AutoPipelineMixin(object):
+    '''
+    Send the commands issued concurrently by several threads on a redis client as a
+    single pipeline. The first thread to issue a command while no pipeline is being
+    sent sends it straight away, after waiting +auto_pipeline_delay+ seconds if set;
+    commands issued by other threads in the meantime queue up and are sent together,
+    up to +auto_pipeline_max_commands+ at a time, by one of the queued threads as
+    soon as the pipeline before them returns. Each thread gets back the response, or
+    raises the error, of its own command.
+
+    Commands issued by a single thread wait for each other as before, so there is no
+    batching without concurrency and no added latency unless a delay is set. Pipelines
+    and transactions created from the client are sent as they are.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self.auto_pipeline_delay = kwargs.pop('auto_pipeline_delay', 0)
+        self.auto_pipeline_max_commands = kwargs.pop('auto_pipeline_max_commands', 1000)
+        super(AutoPipelineMixin, self).__init__(*args, **kwargs)
+        self._queue = []
+        self._sending = False
+        self._queue_lock = threading.Lock()
+
+    def execute_command(self, *args, **options):
+        command = _QueuedCommand(args, options)
+        with self._queue_lock:
+            self._queue.append(command)
+            if not self._sending:
+                self._sending = True
+                command.leads = True
+
+        if not command.leads:
+            command.ready.wait()
+        # a queued command may be picked to send the next pipeline instead of getting a response
+        if command.leads:
+            self._send_queued()
+
+        if isinstance(command.response, Exception):
+            raise command.response
+        return command.response
+
+    def _send_queued(self):
+        '''
+        Send the commands at the head of the queue in a single pipeline, then hand the
+        queue over to the first command left in it, if any.
+        '''
+        if self.auto_pipeline_delay:
+            time.sleep(self.auto_pipeline_delay)
+
+        with self._queue_lock:
+            batch = self._queue[:self.auto_pipeline_max_commands]
+            del self._queue[:self.auto_pipeline_max_commands]
+
+        try:
+            pipeline = self.pipeline(transaction=False)
+            for command in batch:
+                pipeline.execute_command(*command.args, **command.options)
+            responses = pipeline.execute(raise_on_error=False)
+        except Exception as error:
+            responses = [error] * len(batch)
+        finally:
+            with self._queue_lock:
+                following = self._queue[0] if self._queue else None
+                if following is None:
+                    self._sending = False
+                else:
+                    following.leads = True
+
+        for command, response in zip(batch, responses):
+            command.leads = False
+            command.response = response
+            command.ready.set()
+        if following is not None:
+            following.ready.set()
+
+
+class AutoPipelineRedis(AutoPipelineMixin, Redis):
+    '''
+    +Redis+ client sending commands issued concurrently by several threads as a
+    single pipeline. See +AutoPipelineMixin+.
+    '''
@@ -0,0 +1,339 @@
+'''
+Benchmark of the leaderboard API against a redis server, run with:
+
+  python -m leaderboard.benchmark --sizes 1000,100000 --output results.json
+
+Each operation is called repeatedly on leaderboards of each type and size, filled with
+members whose scores share values so that tie and competition ranks are exercised. The
+results are written as JSON, one record per leaderboard type, size and operation with
+the calls per second, the median and 99th percentile latencies and the number of round
+trips per call, so that runs of different commits can be compared with +compare+ or
++--baseline+.
+'''
+
+from __future__ import division, print_function
+
+from .leaderboard import Leaderboard
+from .tie_ranking_leaderboard import TieRankingLeaderboard
+from .competition_ranking_leaderboard import CompetitionRankingLeaderboard
+from .memory import MemoryConnection
+from .importer import BulkImporter
+from redis import ConnectionPool
+from timeit import default_timer
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+LEADERBOARD_TYPES = (Leaderboard, TieRankingLeaderboard, CompetitionRankingLeaderboard)
+OPERATIONS = (
+    'rank_member_in', 'rank_members_in', 'leaders_in', 'around_me_in',
+    'ranked_in_list_in', 'percentile_for_in', 'score_for_percentile_in')
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000, 10000000)
+
+
+class _RoundTripCounter(object):
+    '''
+    Connection mixin counting the requests sent, a pipeline or script call being a
+    single request.
+    '''
+
+    round_trips = 0
+
+    def send_packed_command(self, command, *args, **kwargs):
+        type(self).round_trips += 1
+        return super(_RoundTripCounter, self).send_packed_command(command, *args, **kwargs)
+
+
+def _percentile(ordered, percentile):
+    '''
+    Nearest-rank percentile of sorted values.
+    '''
+    return ordered[max(int(math.ceil(percentile / 100 * len(ordered))) - 1, 0)]
+
+
+class Benchmark(object):
+    '''
+    Run the operations of +OPERATIONS+ on leaderboards of the types and sizes given.
+    Leaderboards are filled with +BulkImporter+ and deleted once measured; no other key
+    of the database is touched.
+    '''
+
+    LEADERBOARD_NAME = 'leaderboard-benchmark'
+
+    def __init__(self, sizes=DEFAULT_SIZES, leaderboard_types=LEADERBOARD_TYPES, operations=OPERATIONS,
+                 duration=1.0, max_calls=10000, warmup=10, batch_size=100, seed=0,
+                 host='localhost', port=6379, db=0, backend=Leaderboard.DEFAULT_BACKEND, progress=None):
+        '''
+        Create a benchmark.
+
+        @param sizes [Array] Numbers of members of the leaderboards measured.
+        @param leaderboard_types [Array] Leaderboard classes measured.
+        @param operations [Array] Names of the leaderboard methods measured.
+        @param duration [float] Seconds spent calling each operation, at most.
+        @param max_calls [int] Calls of each operation, at most.
+        @param warmup [int] Calls of each operation made before measuring.
+        @param batch_size [int] Members given to +rank_members_in+ and +ranked_in_list_in+ in each call.
+        @param seed [int] Seed of the random members, scores and pages.
+        @param host [String] Host of the redis server.
+        @param port [int] Port of the redis server.
+        @param db [int] Redis database to use.
+        @param backend [String] 'redis', or 'memory' to measure the in-process backend.
+        @param progress [function] Optional function called with a message before each leaderboard is filled.
+        '''
+        unknown = [operation for operation in operations if operation not in OPERATIONS]
+        if unknown:
+            raise ValueError('%s is not one of [%s]' % (unknown[0], ', '.join(OPERATIONS)))
+
+        self.sizes = sizes
+        self.leaderboard_types = leaderboard_types
+        self.operations = operations
+        self.duration = duration
+        self.max_calls = max_calls
+        self.warmup = warmup
+        self.batch_size = batch_size
+        self.seed = seed
+        self.host = host
+        self.port = port
+        self.db = db
+        self.backend = backend
+        self.progress = progress
+
+    def run(self):
+        '''
+        Run the benchmark.
+
+        @return a dictionary of the +meta+ data of the run and its +results+.
+        '''
+        results = []
+        redis_version = None
+        for leaderboard_type in self.leaderboard_types:
+            leaderboard, counter = self._leaderboard(leaderboard_type)
+            redis_version = redis_version or leaderboard.redis_connection.info().get('redis_version')
+            for size in self.sizes:
+                if self.progress is not None:
+                    self.progress('%s: ranking %s members' % (leaderboard_type.__name__, size))
+                generator = random.Random(self.seed)
+                self._fill(leaderboard, size, generator)
+                try:
+                    for operation in self.operations:
+                        record = self._measure(
+                            getattr(self, '_%s' % operation)(leaderboard, size, generator), counter)
+                        record.update(leaderboard=leaderboard_type.__name__, size=size, operation=operation)
+                        results.append(record)
+                finally:
+                    leaderboard.delete_leaderboard_named(self.LEADERBOARD_NAME)
+
+        return {
+            'meta': {
+                'version': Leaderboard.VERSION,
+                'commit': _commit(),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'redis_version': redis_version,
+                'backend': self.backend,
+                'duration': self.duration,
+                'max_calls': self.max_calls,
+                'batch_size': self.batch_size,
+                'seed': self.seed},
+            'results': results}
+
+    def _leaderboard(self, leaderboard_type):
+        '''
+        Leaderboard of the given type with a connection pool of its own, whose connection
+        class counts round trips.
+
+        @return the leaderboard and its connection class.
+        '''
+        options = {'connection_class': MemoryConnection} if self.backend == Leaderboard.MEMORY else {}
+        pool = ConnectionPool(host=self.host, port=self.port, db=self.db, **options)
+        pool.connection_class = type(
+            'Counting%s' % pool.connection_class.__name__, (_RoundTripCounter, pool.connection_class), {})
+
+        return leaderboard_type(self.LEADERBOARD_NAME, connection_pool=pool), pool.connection_class
+
+    def _fill(self, leaderboard, size, generator):
+        '''
+        Rank +size+ members with scores drawn so that four members share each score on average.
+        '''
+        leaderboard.delete_leaderboard_named(self.LEADERBOARD_NAME)
+        highest = max(size // 4, 1)
+        BulkImporter(leaderboard, chunk_size=5000).import_rows(
+            ('member_%s' % index, generator.randint(0, highest)) for index in range(size))
+
+    def _measure(self, calls, counter):
+        '''
+        Call an operation, warming up first, until the duration or the maximum number of
+        calls is reached.
+
+        @param calls Generator making one call each time it is advanced.
+        @param counter Connection class counting round trips.
+        @return a record of the measures.
+        '''
+        for index in range(self.warmup):
+            next(calls)
+
+        latencies = []
+        counter.round_trips = 0
+        started = default_timer()
+        while len(latencies) < self.max_calls and default_timer() - started < self.duration:
+            latencies.append(next(calls))
+
+        round_trips = counter.round_trips
+        latencies.sort()
+        total = sum(latencies)
+        return {
+            'calls': len(latencies),
+            'ops_per_sec': len(latencies) / total if total else None,
+            'p50_ms': _percentile(latencies, 50) * 1000,
+            'p99_ms': _percentile(latencies, 99) * 1000,
+            'round_trips_per_call': round_trips / len(latencies)}
+
+    def _timed(self, call, arguments):
+        '''
+        Generator timing +call+ with the arguments returned by +arguments+, which are built
+        outside the measured time.
+        '''
+        while True:
+            args = arguments()
+            started = default_timer()
+            call(self.LEADERBOARD_NAME, *args)
+            yield default_timer() - started
+
+    def _member(self, size, generator):
+        return 'member_%s' % generator.randrange(size)
+
+    def _rank_member_in(self, leaderboard, size, generator):
+        highest = max(size // 4, 1)
+        return self._timed(leaderboard.rank_member_in, lambda: (
+            self._member(size, generator), generator.randint(0, highest)))
+
+    def _rank_members_in(self, leaderboard, size, generator):
+        highest = max(size // 4, 1)
+        return self._timed(leaderboard.rank_members_in, lambda: ([
+            (self._member(size, generator), generator.randint(0, highest))
+            for index in range(self.batch_size)],))
+
+    def _leaders_in(self, leaderboard, size, generator):
+        pages = leaderboard.total_pages_in(self.LEADERBOARD_NAME)
+        return self._timed(leaderboard.leaders_in, lambda: (generator.randint(1, pages),))
+
+    def _around_me_in(self, leaderboard, size, generator):
+        return self._timed(leaderboard.around_me_in, lambda: (self._member(size, generator),))
+
+    def _ranked_in_list_in(self, leaderboard, size, generator):
+        return self._timed(leaderboard.ranked_in_list_in, lambda: (
+            [self._member(size, generator) for index in range(self.batch_size)],))
+
+    def _percentile_for_in(self, leaderboard, size, generator):
+        return self._timed(leaderboard.percentile_for_in, lambda: (self._member(size, generator),))
+
+    def _score_for_percentile_in(self, leaderboard, size, generator):
+        return self._timed(leaderboard.score_for_percentile_in, lambda: (generator.uniform(0, 100),))
+
+
+def _commit():
+    '''
+    Git commit of the working tree the benchmark runs from, if any.
+    '''
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def compare(baseline, results):
+    '''
+    Compare two runs of the benchmark.
+
+    @param baseline [Hash] Results of the earlier run, as returned by +Benchmark.run+.
+    @param results [Hash] Results of the later run.
+    @return a list of records of the leaderboard type, size and operation measured in both runs,
+      with the ratio of their calls per second, p99 latencies and round trips per call.
+    '''
+    def key(record):
+        return (record['leaderboard'], record['size'], record['operation'])
+
+    def ratio(later, earlier):
+        return later / earlier if later is not None and earlier else None
+
+    earlier = dict((key(record), record) for record in baseline['results'])
+    comparison = []
+    for record in results['results']:
+        if key(record) not in earlier:
+            continue
+        previous = earlier[key(record)]
+        comparison.append({
+            'leaderboard': record['leaderboard'],
+            'size': record['size'],
+            'operation': record['operation'],
+            'ops_per_sec_ratio': ratio(record['ops_per_sec'], previous['ops_per_sec']),
+            'p99_ratio': ratio(record['p99_ms'], previous['p99_ms']),
+            'round_trips_change': record['round_trips_per_call'] - previous['round_trips_per_call']})
+
+    return comparison
+
+
+def main(argv=None):
+    types = dict((leaderboard_type.__name__, leaderboard_type) for leaderboard_type in LEADERBOARD_TYPES)
+    parser = argparse.ArgumentParser(description='Benchmark the leaderboard API against a redis server.')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma separated leaderboard sizes (default: %(default)s)')
+    parser.add_argument('--types', default=','.join(types), help='comma separated leaderboard classes')
+    parser.add_argument('--operations', default=','.join(OPERATIONS), help='comma separated operations')
+    parser.add_argument('--duration', type=float, default=1.0, help='seconds per operation (default: %(default)s)')
+    parser.add_argument('--max-calls', type=int, default=10000, help='calls per operation (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=100, help='members per batch call (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--db', type=int, default=0)
+    parser.add_argument('--backend', default=Leaderboard.DEFAULT_BACKEND, choices=Leaderboard.BACKENDS)
+    parser.add_argument('--output', help='file to write the results to (default: standard output)')
+    parser.add_argument('--baseline', help='results of an earlier run to compare with, written to standard error')
+    arguments = parser.parse_args(argv)
+
+    def progress(message):
+        print(message, file=sys.stderr)
+
+    try:
+        leaderboard_types = [types[name] for name in arguments.types.split(',')]
+    except KeyError as error:
+        parser.error('unknown leaderboard type %s' % error)
+
+    results = Benchmark(
+        sizes=[int(size) for size in arguments.sizes.split(',')],
+        leaderboard_types=leaderboard_types,
+        operations=arguments.operations.split(','),
+        duration=arguments.duration,
+        max_calls=arguments.max_calls,
+        batch_size=arguments.batch_size,
+        seed=arguments.seed,
+        host=arguments.host,
+        port=arguments.port,
+        db=arguments.db,
+        backend=arguments.backend,
+        progress=progress).run()
+
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline:
+            for record in compare(json.load(baseline), results):
+                print(json.dumps(record, sort_keys=True), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,13 +16,13 @@ class CompetitionRankingLeaderboard(Leaderboard):
         member_score = str(float(self.score_for_in(leaderboard_name, member)))
         if self.order == self.ASC:
             try:
-                return self.redis_connection.zcount(
+                return self._reader().zcount(
                     leaderboard_name, '-inf', '(%s' % member_score) + 1
             except:
                 return None
         else:
             try:
-                return self.redis_connection.zcount(
+                return self._reader().zcount(
                     leaderboard_name, '(%s' % member_score, '+inf') + 1
             except:
                 return None
@@ -35,7 +35,8 @@ class CompetitionRankingLeaderboard(Leaderboard):
         @param member [String] Member name.
         @return the score and rank for a member in the named leaderboard as a Hash.
         '''
-        pipeline = self.redis_connection.pipeline()
+        connection = self._reader()
+        pipeline = connection.pipeline()
         pipeline.zscore(leaderboard_name, member)
         if self.order == self.ASC:
             pipeline.zrank(leaderboard_name, member)
@@ -48,13 +49,13 @@ class CompetitionRankingLeaderboard(Leaderboard):
 
         if self.order == self.ASC:
             try:
-                responses[1] = self.redis_connection.zcount(
+                responses[1] = connection.zcount(
                     leaderboard_name, '-inf', "(%s" % str(float(responses[0]))) + 1
             except:
                 responses[1] = None
         else:
             try:
-                responses[1] = self.redis_connection.zcount(
+                responses[1] = connection.zcount(
                     leaderboard_name, "(%s" % str(float(responses[0])), '+inf') + 1
             except:
                 responses[1] = None
@@ -77,7 +78,7 @@ class CompetitionRankingLeaderboard(Leaderboard):
         ranks_for_members = []
         scores = []
 
-        pipeline = self.redis_connection.pipeline()
+        pipeline = self._reader().pipeline()
 
         for member in members:
             if self.order == self.ASC:
@@ -126,6 +127,36 @@ class CompetitionRankingLeaderboard(Leaderboard):
 
         return ranks_for_members
 
+    def _slice_rank_key(self, leaderboard_name):
+        '''
+        Key of the sorted set used to count the members ranked ahead of a page.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return the leaderboard key.
+        '''
+        return leaderboard_name
+
+    def _ranks_for_slice(self, offset, ahead, scores):
+        '''
+        Ranks for a contiguous slice of the leaderboard. Members with the same score
+        share a rank and a gap is left before the next distinct score.
+
+        @param offset [int] Zero-based position of the first member of the slice.
+        @param ahead [int] Members with a better score than the first member.
+        @param scores [Array] Scores of the members in the slice, in leaderboard order.
+        @return a list of ranks.
+        '''
+        ranks = []
+        for index, score in enumerate(scores):
+            if index == 0:
+                ranks.append(ahead + 1)
+            elif score == scores[index - 1]:
+                ranks.append(ranks[index - 1])
+            else:
+                ranks.append(offset + index + 1)
+
+        return ranks
+
     def __up_rank(self, rank):
         if rank is not None:
             return rank + 1
@@ -133,7 +164,7 @@ class CompetitionRankingLeaderboard(Leaderboard):
             return None
 
     def __rankings_for_members_having_scores_in(self, leaderboard_name, members, scores):
-        pipeline = self.redis_connection.pipeline()
+        pipeline = self._reader().pipeline()
 
         for index, member in enumerate(members):
             if self.order == self.ASC:
@@ -0,0 +1,313 @@
+'''
+Bulk import of members, scores and member data into a leaderboard from CSV or JSON
+Lines files, or from any iterable of (member, score, member_data) rows.
+'''
+
+from .leaderboard import Leaderboard, chunked_members
+from .sharded_leaderboard import ShardedLeaderboard
+from redis import Redis, StrictRedis
+from redis.exceptions import ResponseError
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+import csv
+import io
+import json
+import os
+
+
+@contextmanager
+def _opened(source, newline=None):
+    if hasattr(source, 'read'):
+        yield source
+    else:
+        with io.open(source, 'r', encoding='utf-8', newline=newline) as opened:
+            yield opened
+
+
+def read_csv(source, member='member', score='score', member_data='member_data', **reader_options):
+    '''
+    Read rows from a CSV file whose first line names its columns.
+
+    @param source Path of the file, or a file object.
+    @param member [String] Column holding the member names.
+    @param score [String] Column holding the scores.
+    @param member_data [String] Column holding the optional member data, if there is one.
+    @param reader_options [Hash] Options of +csv.reader+, such as +delimiter+.
+    @return a generator of (member, score, member_data) tuples.
+    '''
+    with _opened(source, newline='') as opened:
+        rows = csv.reader(opened, **reader_options)
+        header = next(rows, None)
+        if header is None:
+            return
+        member_column, score_column = header.index(member), header.index(score)
+        data_column = header.index(member_data) if member_data in header else None
+
+        for row in rows:
+            if not row:
+                continue
+            data = row[data_column] if data_column is not None else None
+            yield (row[member_column], float(row[score_column]), data or None)
+
+
+def read_jsonl(source, member='member', score='score', member_data='member_data'):
+    '''
+    Read rows from a JSON Lines file, one JSON object per line. Member data other than
+    strings is stored as JSON.
+
+    @param source Path of the file, or a file object.
+    @param member [String] Key of the member names.
+    @param score [String] Key of the scores.
+    @param member_data [String] Key of the optional member data.
+    @return a generator of (member, score, member_data) tuples.
+    '''
+    with _opened(source) as opened:
+        for line in opened:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            data = row.get(member_data)
+            if isinstance(data, (dict, list)):
+                data = json.dumps(data)
+            yield (row[member], float(row[score]), data)
+
+
+class _QueuedCommands(object):
+    '''
+    Redis client queueing the commands it is given instead of sending them, so that the
+    writes for a chunk can be sent on a lane without waiting for their replies.
+    '''
+
+    def __init__(self, connection_pool):
+        super(_QueuedCommands, self).__init__(connection_pool=connection_pool)
+        self.commands = []
+
+    def execute_command(self, *args, **options):
+        self.commands.append((args, options))
+
+
+class _StrictQueue(_QueuedCommands, StrictRedis):
+    pass
+
+
+class _Queue(_QueuedCommands, Redis):
+    pass
+
+
+class _Lane(object):
+    '''
+    Dedicated connection of a leaderboard, with the chunks sent on it that are waiting
+    for their replies, oldest first.
+    '''
+
+    def __init__(self, leaderboard):
+        self.leaderboard = leaderboard
+        self.pool = leaderboard.redis_connection.connection_pool
+        self.connection = self.pool.get_connection('IMPORT')
+        self.in_flight = deque()
+        self.loaded = set()
+
+    def send(self, leaderboard_name, chunk):
+        '''
+        Send the writes for a chunk of members without waiting for their replies, once
+        the score changes buffered for those members by the +write_behind+ option are
+        written.
+        '''
+        self.leaderboard._settle_pending_in(
+            leaderboard_name, [member for member, score, member_data in chunk])
+        if isinstance(self.leaderboard.redis_connection, Redis):
+            queue = _Queue(self.pool)
+        else:
+            queue = _StrictQueue(self.pool)
+        self.leaderboard._rank_chunk_in(queue, leaderboard_name, chunk)
+        self._load_scripts(queue.commands)
+
+        self.connection.send_packed_command(
+            self.connection.pack_commands([args for args, options in queue.commands]))
+        self.in_flight.append(queue)
+
+    def receive(self):
+        '''
+        Read the replies to the oldest chunk sent, raising the first error among them.
+        '''
+        queue = self.in_flight.popleft()
+        error = None
+        for args, options in queue.commands:
+            try:
+                queue.parse_response(self.connection, args[0], **options)
+            except ResponseError as response_error:
+                error = error or response_error
+        if error is not None:
+            raise error
+
+    def _load_scripts(self, commands):
+        '''
+        Load the scripts called by queued commands that were not loaded on this lane yet,
+        as the commands call them by their SHA.
+        '''
+        sources = None
+        for args, options in commands:
+            if args[0] == 'EVALSHA' and args[1] not in self.loaded:
+                if sources is None:
+                    sources = dict(
+                        (script.sha, script.script) for script in self.leaderboard._scripts.values())
+                self.leaderboard.redis_connection.script_load(sources[args[1]])
+                self.loaded.add(args[1])
+
+    def close(self, failed=False):
+        if failed:
+            self.connection.disconnect()
+        self.pool.release(self.connection)
+
+
+class BulkImporter(object):
+    '''
+    Stream rows of members, scores and optional member data into a leaderboard. Rows are
+    read lazily and written in chunks of +chunk_size+, each chunk as the multi-member
+    writes of +rank_members_in+ (a single script call for tie ranking leaderboards), sent
+    on a dedicated connection without waiting for the replies to the chunks before it.
+    At most +window+ chunks are in flight: once the window is full, the importer waits for
+    the oldest chunk before reading more rows, so memory use stays bounded whatever the
+    size of the input. Score changes buffered by the +write_behind+ option for the members
+    of a chunk are written before the chunk.
+
+    With a +checkpoint+ file, the number of rows acknowledged by Redis is saved every
+    +checkpoint_every+ chunks, and an import started again with the same checkpoint skips
+    those rows. Rows in flight when an import stops are written again on resume, which is
+    safe as ranking a member twice with the same score leaves the leaderboard unchanged.
+    The checkpoint is removed once the import completes.
+    '''
+
+    DEFAULT_WINDOW = 8
+    DEFAULT_CHECKPOINT_EVERY = 10
+
+    def __init__(self, leaderboard, chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE,
+                 window=DEFAULT_WINDOW, checkpoint=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
+        '''
+        Create an importer.
+
+        @param leaderboard [Leaderboard] Leaderboard to import into, of any synchronous type.
+        @param chunk_size [int] Number of rows written in each chunk.
+        @param window [int] Maximum number of chunks sent and not yet acknowledged.
+        @param checkpoint [String] Optional path of a file recording the progress of the import.
+        @param checkpoint_every [int] Number of chunks acknowledged between checkpoints.
+        '''
+        if hasattr(leaderboard, '__aenter__'):
+            raise ValueError('async leaderboards are not supported, use rank_members_in')
+        if window < 1:
+            raise ValueError('window must be at least 1')
+
+        self.leaderboard = leaderboard
+        self.chunk_size = chunk_size
+        self.window = window
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+
+    def import_csv(self, source, leaderboard_name=None, progress=None, **columns):
+        '''
+        Import the rows of a CSV file, see +read_csv+ for the column options.
+
+        @return the number of rows imported by this call.
+        '''
+        return self.import_rows(read_csv(source, **columns), leaderboard_name, progress)
+
+    def import_jsonl(self, source, leaderboard_name=None, progress=None, **keys):
+        '''
+        Import the rows of a JSON Lines file, see +read_jsonl+ for the key options.
+
+        @return the number of rows imported by this call.
+        '''
+        return self.import_rows(read_jsonl(source, **keys), leaderboard_name, progress)
+
+    def import_rows(self, rows, leaderboard_name=None, progress=None):
+        '''
+        Import rows into the named leaderboard.
+
+        @param rows [Iterable] (member, score) or (member, score, member_data) tuples.
+        @param leaderboard_name [String] Name of the leaderboard, that of the importer's leaderboard by default.
+        @param progress [function] Optional function called with the number of rows acknowledged
+          so far, including those of a resumed import, after each chunk.
+        @return the number of rows imported by this call.
+        '''
+        if leaderboard_name is None:
+            leaderboard_name = self.leaderboard.leaderboard_name
+
+        resumed = self._read_checkpoint(leaderboard_name)
+        acknowledged = resumed
+        chunks = deque()
+        lanes = {}
+        failed = True
+        try:
+            for chunk in chunked_members(islice(rows, resumed, None), self.chunk_size):
+                if len(chunks) >= self.window:
+                    acknowledged = self._receive(chunks, leaderboard_name, acknowledged, progress)
+
+                targets = []
+                for key, leaderboard, entries in self._targets(chunk):
+                    if key not in lanes:
+                        lanes[key] = _Lane(leaderboard)
+                    lanes[key].send(leaderboard_name, entries)
+                    targets.append(lanes[key])
+                chunks.append((len(chunk), targets))
+
+            while chunks:
+                acknowledged = self._receive(chunks, leaderboard_name, acknowledged, progress)
+            failed = False
+        finally:
+            for lane in lanes.values():
+                lane.close(failed)
+            if failed and self.checkpoint is not None:
+                self._write_checkpoint(leaderboard_name, acknowledged)
+
+        if self.checkpoint is not None and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        return acknowledged - resumed
+
+    def _targets(self, chunk):
+        '''
+        Leaderboards to write the rows of a chunk to: the shard of each member for a
+        sharded leaderboard, the leaderboard itself otherwise.
+
+        @return a list of (lane key, leaderboard, rows) tuples.
+        '''
+        if isinstance(self.leaderboard, ShardedLeaderboard):
+            return [
+                (index, self.leaderboard.shards[index], entries)
+                for index, entries in sorted(self.leaderboard._group_by_shard(
+                    chunk, lambda entry: entry[0]).items())]
+
+        return [(None, self.leaderboard, chunk)]
+
+    def _receive(self, chunks, leaderboard_name, acknowledged, progress):
+        '''
+        Wait for the oldest chunk in flight and record its rows as acknowledged.
+
+        @return the number of rows acknowledged.
+        '''
+        rows, targets = chunks.popleft()
+        for lane in targets:
+            lane.receive()
+
+        acknowledged += rows
+        if progress is not None:
+            progress(acknowledged)
+        if self.checkpoint is not None and (acknowledged // self.chunk_size) % self.checkpoint_every == 0:
+            self._write_checkpoint(leaderboard_name, acknowledged)
+        return acknowledged
+
+    def _read_checkpoint(self, leaderboard_name):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return 0
+
+        with io.open(self.checkpoint, 'r', encoding='utf-8') as checkpoint:
+            state = json.load(checkpoint)
+        if state['leaderboard'] != leaderboard_name:
+            raise ValueError('%s is a checkpoint for leaderboard %s' % (self.checkpoint, state['leaderboard']))
+        return state['rows']
+
+    def _write_checkpoint(self, leaderboard_name, rows):
+        temporary_path = '%s.tmp' % self.checkpoint
+        with io.open(temporary_path, 'w', encoding='utf-8') as checkpoint:
+            checkpoint.write(u'%s' % json.dumps({'leaderboard': leaderboard_name, 'rows': rows}))
+        os.rename(temporary_path, self.checkpoint)
@@ -1,8 +1,21 @@
 from __future__ import division
 
 from redis import StrictRedis, Redis, ConnectionPool
+from . import scripts
+from .write_behind import WriteBehindBuffer
+from .page_cache import PageCache
+from .auto_pipeline import AutoPipelineRedis
+from .single_flight import SingleFlight
+from .memory import MemoryConnection
+from . import result_formats
+from . import snapshot
+from . import archive
+from contextlib import contextmanager
 import math
+import random
 import sys
+import threading
+from itertools import chain, count
 if sys.version_info.major == 3:
     from itertools import zip_longest
 else:
@@ -15,14 +28,116 @@ def grouper(n, iterable, fillvalue=None):
     return zip_longest(fillvalue=fillvalue, *args)
 
 
+def chunked_members(members_and_scores, chunk_size):
+    '''
+    Lazily split members and scores into lists of (member, score, member_data) tuples
+    holding at most +chunk_size+ entries each.
+
+    @param members_and_scores [Iterable] Either a flat sequence of alternating members and scores,
+      or (member, score) or (member, score, member_data) tuples.
+    @param chunk_size [int] Maximum number of members in each chunk.
+    @return a generator of chunks.
+    '''
+    iterator = iter(members_and_scores)
+    for first in iterator:
+        if isinstance(first, (tuple, list)):
+            entries = chain([first], iterator)
+        else:
+            entries = grouper(2, chain([first], iterator))
+        break
+    else:
+        return
+
+    chunk = []
+    for entry in entries:
+        member, score = entry[0], entry[1]
+        member_data = entry[2] if len(entry) > 2 else None
+        chunk.append((member, score, member_data))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xffff
+            else:
+                crc = (crc << 1) & 0xffff
+        table.append(crc)
+    return table
+
+_CRC16_TABLE = _crc16_table()
+
+
+def hash_tag(key):
+    '''
+    Hash tag of a key: the text between the first '{' and the next '}', if not empty.
+
+    @param key [String] Redis key.
+    @return the hash tag, or +None+ if the key has none.
+    '''
+    opening, closing = (b'{', b'}') if isinstance(key, bytes) else (u'{', u'}')
+    start = key.find(opening)
+    if start > -1:
+        end = key.find(closing, start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+
+    return None
+
+
+def key_slot(key):
+    '''
+    Redis Cluster hash slot of a key: CRC16 of the key, or of its hash tag if it has
+    one, modulo 16384.
+
+    @param key [String] Redis key.
+    @return the slot number.
+    '''
+    tag = hash_tag(key)
+    if tag is not None:
+        key = tag
+    if not isinstance(key, bytes):
+        key = (u'%s' % key).encode('utf-8')
+
+    crc = 0
+    for byte in bytearray(key):
+        crc = ((crc << 8) & 0xffff) ^ _CRC16_TABLE[((crc >> 8) ^ byte) & 0xff]
+
+    return crc % 16384
+
+
 class Leaderboard(object):
     VERSION = '3.7.3'
     DEFAULT_PAGE_SIZE = 25
+    DEFAULT_CHUNK_SIZE = 1000
     DEFAULT_REDIS_HOST = 'localhost'
     DEFAULT_REDIS_PORT = 6379
     DEFAULT_REDIS_DB = 0
     DEFAULT_MEMBER_DATA_NAMESPACE = 'member_data'
     DEFAULT_GLOBAL_MEMBER_DATA = False
+    DEFAULT_CLUSTER = False
+    DEFAULT_TRACK_AGGREGATES = False
+    DEFAULT_READ_STRATEGY = 'round_robin'
+    DEFAULT_WRITE_BEHIND = False
+    DEFAULT_WRITE_BEHIND_MAX_PENDING = 1000
+    DEFAULT_WRITE_BEHIND_MAX_DELAY = 0.1
+    DEFAULT_PAGE_CACHE = False
+    DEFAULT_PAGE_CACHE_SIZE = 1000
+    DEFAULT_PAGE_CACHE_TTL = 1.0
+    DEFAULT_SINGLE_FLIGHT = False
+    DEFAULT_RESULT_FORMAT = result_formats.DICT
+    DEFAULT_AUTO_PIPELINE = False
+    DEFAULT_AUTO_PIPELINE_DELAY = 0
+    DEFAULT_AUTO_PIPELINE_MAX_COMMANDS = 1000
+    DEFAULT_BACKEND = 'redis'
     DEFAULT_POOLS = {}
     ASC = 'asc'
     DESC = 'desc'
@@ -30,6 +145,26 @@ class Leaderboard(object):
     MEMBER_DATA_KEY = 'member_data'
     SCORE_KEY = 'score'
     RANK_KEY = 'rank'
+    KEEP_HIGHEST = 'keep_highest'
+    KEEP_LOWEST = 'keep_lowest'
+    ONLY_IF_NEW = 'only_if_new'
+    ONLY_IF_EXISTS = 'only_if_exists'
+    CONDITIONAL_MODES = [KEEP_HIGHEST, KEEP_LOWEST, ONLY_IF_NEW, ONLY_IF_EXISTS]
+    ROUND_ROBIN = 'round_robin'
+    DICT = result_formats.DICT
+    RECORD = result_formats.RECORD
+    TUPLE = result_formats.TUPLE
+    COLUMNAR = result_formats.COLUMNAR
+    LEAST_OUTSTANDING = 'least_outstanding'
+    DENSE_RANKS = False
+    REDIS = 'redis'
+    MEMORY = 'memory'
+    BACKENDS = [REDIS, MEMORY]
+    NATIVE_CONDITIONAL_MODES = {
+        KEEP_HIGHEST: ('GT', (6, 2, 0)),
+        KEEP_LOWEST: ('LT', (6, 2, 0)),
+        ONLY_IF_NEW: ('NX', (3, 0, 2)),
+    }
 
     @classmethod
     def pool(self, host, port, db, pools={}, **options):
@@ -38,6 +173,8 @@ class Leaderboard(object):
         and port. Will create a new one if there isn't one already.
         '''
         key = (host, port, db)
+        if 'connection_class' in options:
+            key += (options['connection_class'],)
         rval = pools.get(key)
         if not isinstance(rval, ConnectionPool):
             rval = ConnectionPool(host=host, port=port, db=db, **options)
@@ -58,6 +195,25 @@ class Leaderboard(object):
         page_size : the default number of items to return in each page (25)
         connection : an existing redis handle if re-using for this leaderboard
         connection_pool : redis connection pool to use if creating a new handle
+        write_behind : buffer score changes in process and write them in batches (False)
+        write_behind_max_pending : members with buffered score changes that trigger a write (1000)
+        write_behind_max_delay : seconds after which buffered score changes are written (0.1)
+        page_cache : cache the pages returned by +leaders+, +top+ and +around_me+ in process (False)
+        page_cache_size : number of pages kept in the page cache (1000)
+        page_cache_ttl : seconds a cached page is served before checking whether the leaderboard changed (1.0)
+        result_format : format of the pages of leaders returned, 'dict', 'record', 'tuple' or 'columnar' ('dict')
+        single_flight : share the result of a page read with the identical page reads made while it is in flight (False)
+        auto_pipeline : send the commands issued concurrently by several threads as a single pipeline (False)
+        auto_pipeline_delay : seconds to wait for more commands before sending a pipeline (0)
+        auto_pipeline_max_commands : maximum number of commands sent in each pipeline (1000)
+        backend : where the leaderboard is stored, 'redis' or 'memory' for an in-process store
+          with the same behaviour, see +leaderboard.memory+ ('redis')
+        read_replicas : connection options (e.g. {'host': 'replica-1'}) or redis handles of replicas to send reads to ([])
+        read_strategy : how a replica is picked for a read, 'round_robin' or 'least_outstanding' ('round_robin')
+        cluster : hash tag derived keys so they share the cluster slot of the leaderboard, and split
+          multi-key commands whose keys span slots (False)
+        track_aggregates : keep the count, sum and sum of squares of the scores up to date on every
+          write, so +aggregates+ does not have to read the whole leaderboard (False)
         '''
         self.leaderboard_name = leaderboard_name
         self.options = options
@@ -72,36 +228,131 @@ class Leaderboard(object):
         self.global_member_data = self.options.pop(
             'global_member_data',
             self.DEFAULT_GLOBAL_MEMBER_DATA)
+        self.cluster = self.options.pop('cluster', self.DEFAULT_CLUSTER)
+        self.track_aggregates = self.options.pop(
+            'track_aggregates',
+            self.DEFAULT_TRACK_AGGREGATES)
 
         self.order = self.options.pop('order', self.DESC).lower()
         if not self.order in [self.ASC, self.DESC]:
             raise ValueError(
                 "%s is not one of [%s]" % (self.order, ",".join([self.ASC, self.DESC])))
 
+        self._write_behind = None
+        write_behind_max_pending = self.options.pop(
+            'write_behind_max_pending',
+            self.DEFAULT_WRITE_BEHIND_MAX_PENDING)
+        write_behind_max_delay = self.options.pop(
+            'write_behind_max_delay',
+            self.DEFAULT_WRITE_BEHIND_MAX_DELAY)
+        if self.options.pop('write_behind', self.DEFAULT_WRITE_BEHIND):
+            self._write_behind = WriteBehindBuffer(
+                self, write_behind_max_pending, write_behind_max_delay)
+
+        self._page_cache = None
+        page_cache_size = self.options.pop(
+            'page_cache_size',
+            self.DEFAULT_PAGE_CACHE_SIZE)
+        page_cache_ttl = self.options.pop(
+            'page_cache_ttl',
+            self.DEFAULT_PAGE_CACHE_TTL)
+        if self.options.pop('page_cache', self.DEFAULT_PAGE_CACHE):
+            self._page_cache = PageCache(page_cache_size, page_cache_ttl)
+
+        self.result_format = self.options.pop('result_format', self.DEFAULT_RESULT_FORMAT)
+        if not self.result_format in result_formats.RESULT_FORMATS:
+            raise ValueError(
+                "%s is not one of [%s]" % (self.result_format, ",".join(result_formats.RESULT_FORMATS)))
+
+        self._single_flight = None
+        if self.options.pop('single_flight', self.DEFAULT_SINGLE_FLIGHT):
+            self._single_flight = SingleFlight()
+
+        self.auto_pipeline = self.options.pop('auto_pipeline', self.DEFAULT_AUTO_PIPELINE)
+        self._auto_pipeline_options = {
+            'auto_pipeline_delay': self.options.pop(
+                'auto_pipeline_delay',
+                self.DEFAULT_AUTO_PIPELINE_DELAY),
+            'auto_pipeline_max_commands': self.options.pop(
+                'auto_pipeline_max_commands',
+                self.DEFAULT_AUTO_PIPELINE_MAX_COMMANDS),
+        }
+
+        self.backend = self.options.pop('backend', self.DEFAULT_BACKEND)
+        if not self.backend in self.BACKENDS:
+            raise ValueError(
+                "%s is not one of [%s]" % (self.backend, ",".join(self.BACKENDS)))
+
+        read_replicas = self.options.pop('read_replicas', None) or []
+        self.read_strategy = self.options.pop(
+            'read_strategy', self.DEFAULT_READ_STRATEGY)
+        if not self.read_strategy in [self.ROUND_ROBIN, self.LEAST_OUTSTANDING]:
+            raise ValueError(
+                "%s is not one of [%s]" % (self.read_strategy, ",".join([self.ROUND_ROBIN, self.LEAST_OUTSTANDING])))
+        connection_options = dict(self.options)
+
         redis_connection = self.options.pop('redis_connection', None)
         if redis_connection:
             # allow the developer to pass a raw redis connection and
             # we will use it directly instead of creating a new one
             self.redis_connection = redis_connection
         else:
-            connection = self.options.pop('connection', None)
-            if isinstance(connection, (StrictRedis, Redis)):
-                self.options['connection_pool'] = connection.connection_pool
-            if 'connection_pool' not in self.options:
-                self.options['connection_pool'] = self.pool(
-                    self.options.pop('host', self.DEFAULT_REDIS_HOST),
-                    self.options.pop('port', self.DEFAULT_REDIS_PORT),
-                    self.options.pop('db', self.DEFAULT_REDIS_DB),
-                    self.options.pop('pools', self.DEFAULT_POOLS),
-                    **self.options
-                )
-            self.redis_connection = Redis(**self.options)
+            self.redis_connection = self._connection(self.options)
+
+        self.read_connections = [
+            self._replica_connection(replica, connection_options) for replica in read_replicas]
+        self._reads = count()
+        self._local = threading.local()
+        self._scripts = {}
+        self._server_version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def flush(self):
+        '''
+        Write any score changes buffered by the +write_behind+ option.
+
+        @return the number of members whose buffered score changes were written.
+        '''
+        if self._write_behind is None:
+            return 0
+
+        return self._write_behind.flush()
+
+    def _settle_pending_in(self, leaderboard_name, members=None, drop=False):
+        '''
+        Write the score changes buffered by the +write_behind+ option for members of the
+        named leaderboard, or drop them, before a direct write to those members, so the
+        buffered changes are not applied on top of it.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members [Array] Member names, or +None+ for every member of the leaderboard.
+        @param drop [bool] Drop the buffered changes rather than writing them, for removals.
+        '''
+        if self._write_behind is not None:
+            self._write_behind.settle(leaderboard_name, members, drop)
+
+    @contextmanager
+    def read_your_writes(self):
+        '''
+        Send the reads made by the current thread inside the block to the primary
+        rather than to a read replica, so they see the writes made before them.
+        '''
+        self._local.primary_reads = getattr(self._local, 'primary_reads', 0) + 1
+        try:
+            yield self
+        finally:
+            self._local.primary_reads -= 1
 
     def delete_leaderboard(self):
         '''
         Delete the current leaderboard.
         '''
-        self.delete_leaderboard_named(self.leaderboard_name)
+        return self.delete_leaderboard_named(self.leaderboard_name)
 
     def delete_leaderboard_named(self, leaderboard_name):
         '''
@@ -109,9 +360,12 @@ class Leaderboard(object):
 
         @param leaderboard_name [String] Name of the leaderboard.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.delete(leaderboard_name)
-        pipeline.delete(self._member_data_key(leaderboard_name))
+        self._settle_pending_in(leaderboard_name, drop=True)
+        keys = self._stored_keys_for(leaderboard_name)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.delete(key)
+        self._drop_version_in(leaderboard_name, pipeline)
         pipeline.execute()
 
     def rank_member(self, member, score, member_data=None):
@@ -122,7 +376,7 @@ class Leaderboard(object):
         @param score [float] Member score.
         @param member_data [String] Optional member data.
         '''
-        self.rank_member_in(self.leaderboard_name, member, score, member_data)
+        return self.rank_member_in(self.leaderboard_name, member, score, member_data)
 
     def rank_member_in(
             self, leaderboard_name, member, score, member_data=None):
@@ -134,6 +388,12 @@ class Leaderboard(object):
         @param score [float] Member score.
         @param member_data [String] Optional member data.
         '''
+        self._settle_pending_in(leaderboard_name, [member])
+        if self.track_aggregates:
+            self._write_members_in(
+                leaderboard_name, [('rank', member, score, member_data)])
+            return
+
         pipeline = self.redis_connection.pipeline()
         if isinstance(self.redis_connection, Redis):
             pipeline.zadd(leaderboard_name, member, score)
@@ -144,6 +404,7 @@ class Leaderboard(object):
                 self._member_data_key(leaderboard_name),
                 member,
                 member_data)
+        self._bump_version_in(leaderboard_name, pipeline)
         pipeline.execute()
 
     def rank_member_across(
@@ -156,8 +417,14 @@ class Leaderboard(object):
         @param score [float] Member score.
         @param member_data [String] Optional member data.
         '''
-        pipeline = self.redis_connection.pipeline()
         for leaderboard_name in leaderboards:
+            self._settle_pending_in(leaderboard_name, [member])
+        pipeline = self._pipeline_for(self._keys_for(leaderboards))
+        for leaderboard_name in leaderboards:
+            if self.track_aggregates:
+                self._write_members_in(
+                    leaderboard_name, [('rank', member, score, member_data)], client=pipeline)
+                continue
             if isinstance(self.redis_connection, Redis):
                 pipeline.zadd(leaderboard_name, member, score)
             else:
@@ -167,6 +434,7 @@ class Leaderboard(object):
                     self._member_data_key(leaderboard_name),
                     member,
                     member_data)
+            self._bump_version_in(leaderboard_name, pipeline)
         pipeline.execute()
 
     def rank_member_if(
@@ -174,19 +442,21 @@ class Leaderboard(object):
         '''
         Rank a member in the leaderboard based on execution of the +rank_conditional+.
 
-        The +rank_conditional+ is passed the following parameters:
+        The +rank_conditional+ is either one of the conditional modes, +KEEP_HIGHEST+, +KEEP_LOWEST+,
+        +ONLY_IF_NEW+ or +ONLY_IF_EXISTS+, or a function which is passed the following parameters:
           member: Member name.
           current_score: Current score for the member in the leaderboard.
           score: Member score.
           member_data: Optional member data.
           leaderboard_options: Leaderboard options, e.g. 'reverse': Value of reverse option
 
-        @param rank_conditional [function] Function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
+        @param rank_conditional [String, function] Conditional mode, or function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
         @param member [String] Member name.
         @param score [float] Member score.
         @param member_data [String] Optional member_data.
+        @return +True+ if the member was ranked, +False+ otherwise.
         '''
-        self.rank_member_if_in(
+        return self.rank_member_if_in(
             self.leaderboard_name,
             rank_conditional,
             member,
@@ -203,48 +473,75 @@ class Leaderboard(object):
         '''
         Rank a member in the named leaderboard based on execution of the +rank_conditional+.
 
-        The +rank_conditional+ is passed the following parameters:
+        The +rank_conditional+ is either one of the conditional modes, +KEEP_HIGHEST+, +KEEP_LOWEST+,
+        +ONLY_IF_NEW+ or +ONLY_IF_EXISTS+, or a function which is passed the following parameters:
           member: Member name.
           current_score: Current score for the member in the leaderboard.
           score: Member score.
           member_data: Optional member data.
           leaderboard_options: Leaderboard options, e.g. 'reverse': Value of reverse option
 
+        Conditional modes are checked and applied atomically in a single round trip. Functions
+        are called with the current score read beforehand, and the member is ranked afterwards.
+
         @param leaderboard_name [String] Name of the leaderboard.
-        @param rank_conditional [function] Function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
+        @param rank_conditional [String, function] Conditional mode, or function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
         @param member [String] Member name.
         @param score [float] Member score.
         @param member_data [String] Optional member_data.
+        @return +True+ if the member was ranked, +False+ otherwise.
         '''
+        self._settle_pending_in(leaderboard_name, [member])
+        if rank_conditional in self.CONDITIONAL_MODES:
+            return self._rank_member_if_mode_in(
+                leaderboard_name, rank_conditional, member, score, member_data)
+
         current_score = self.redis_connection.zscore(leaderboard_name, member)
         if current_score is not None:
             current_score = float(current_score)
 
         if rank_conditional(self, member, current_score, score, member_data, {'reverse': self.order}):
             self.rank_member_in(leaderboard_name, member, score, member_data)
+            return True
 
-    def rank_members(self, members_and_scores):
+        return False
+
+    def rank_members(self, members_and_scores, **options):
         '''
         Rank an array of members in the leaderboard.
 
         @param members_and_scores [Array] Variable list of members and scores.
+        @param options [Hash] Options passed on to +rank_members_in+.
+        @return the number of members ranked.
         '''
-        self.rank_members_in(self.leaderboard_name, members_and_scores)
+        return self.rank_members_in(self.leaderboard_name, members_and_scores, **options)
 
-    def rank_members_in(self, leaderboard_name, members_and_scores):
+    def rank_members_in(self, leaderboard_name, members_and_scores,
+                        chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
         '''
-        Rank an array of members in the named leaderboard.
+        Rank an array of members in the named leaderboard. The input is consumed lazily and
+        written in chunks, each chunk costing one round trip with a single multi-member ZADD
+        and a single HMSET for any member data.
 
         @param leaderboard_name [String] Name of the leaderboard.
-        @param members_and_scores [Array] Variable list of members and scores.
+        @param members_and_scores [Array] Variable list of members and scores, or an iterable of
+          (member, score) or (member, score, member_data) tuples.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members ranked so far after each chunk.
+        @return the number of members ranked.
         '''
-        pipeline = self.redis_connection.pipeline()
-        for member, score in grouper(2, members_and_scores):
-            if isinstance(self.redis_connection, Redis):
-                pipeline.zadd(leaderboard_name, member, score)
-            else:
-                pipeline.zadd(leaderboard_name, score, member)
-        pipeline.execute()
+        total = 0
+        for chunk in chunked_members(members_and_scores, chunk_size):
+            self._settle_pending_in(leaderboard_name, [member for member, score, member_data in chunk])
+            pipeline = self.redis_connection.pipeline()
+            self._rank_chunk_in(pipeline, leaderboard_name, chunk)
+            pipeline.execute()
+
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+
+        return total
 
     def member_data_for(self, member):
         '''
@@ -263,7 +560,7 @@ class Leaderboard(object):
         @param member [String] Member name.
         @return String of optional member data.
         '''
-        return self.redis_connection.hget(
+        return self._reader().hget(
             self._member_data_key(leaderboard_name), member)
 
     def members_data_for(self, members):
@@ -283,7 +580,7 @@ class Leaderboard(object):
         @param members [Array] Member names.
         @return Array of strings of optional member data.
         '''
-        return self.redis_connection.hmget(
+        return self._reader().hmget(
             self._member_data_key(leaderboard_name), members)
 
     def update_member_data(self, member, member_data):
@@ -293,7 +590,7 @@ class Leaderboard(object):
         @param member [String] Member name.
         @param member_data [String] Optional member data.
         '''
-        self.update_member_data_in(self.leaderboard_name, member, member_data)
+        return self.update_member_data_in(self.leaderboard_name, member, member_data)
 
     def update_member_data_in(self, leaderboard_name, member, member_data):
         '''
@@ -303,10 +600,12 @@ class Leaderboard(object):
         @param member [String] Member name.
         @param member_data [String] Optional member data.
         '''
-        self.redis_connection.hset(
-            self._member_data_key(leaderboard_name),
-            member,
-            member_data)
+        self._write_in(
+            leaderboard_name,
+            lambda client: client.hset(
+                self._member_data_key(leaderboard_name),
+                member,
+                member_data))
 
     def remove_member_data(self, member):
         '''
@@ -314,7 +613,7 @@ class Leaderboard(object):
 
         @param member [String] Member name.
         '''
-        self.remove_member_data_in(self.leaderboard_name, member)
+        return self.remove_member_data_in(self.leaderboard_name, member)
 
     def remove_member_data_in(self, leaderboard_name, member):
         '''
@@ -323,9 +622,11 @@ class Leaderboard(object):
         @param leaderboard_name [String] Name of the leaderboard.
         @param member [String] Member name.
         '''
-        self.redis_connection.hdel(
-            self._member_data_key(leaderboard_name),
-            member)
+        self._write_in(
+            leaderboard_name,
+            lambda client: client.hdel(
+                self._member_data_key(leaderboard_name),
+                member))
 
     def total_members(self):
         '''
@@ -342,7 +643,7 @@ class Leaderboard(object):
         @param leaderboard_name [String] Name of the leaderboard.
         @return the total number of members in the named leaderboard.
         '''
-        return self.redis_connection.zcard(leaderboard_name)
+        return self._reader().zcard(leaderboard_name)
 
     def remove_member(self, member):
         '''
@@ -350,7 +651,7 @@ class Leaderboard(object):
 
         @param member [String] Member name.
         '''
-        self.remove_member_from(self.leaderboard_name, member)
+        return self.remove_member_from(self.leaderboard_name, member)
 
     def remove_member_from(self, leaderboard_name, member):
         '''
@@ -359,9 +660,16 @@ class Leaderboard(object):
         @param leaderboard_name [String] Name of the leaderboard.
         @param member [String] Member name.
         '''
+        self._settle_pending_in(leaderboard_name, [member], drop=True)
+        if self.track_aggregates:
+            self._write_members_in(
+                leaderboard_name, [('remove', member, 0, None)])
+            return
+
         pipeline = self.redis_connection.pipeline()
         pipeline.zrem(leaderboard_name, member)
         pipeline.hdel(self._member_data_key(leaderboard_name), member)
+        self._bump_version_in(leaderboard_name, pipeline)
         pipeline.execute()
 
     def total_pages(self, page_size=None):
@@ -410,7 +718,7 @@ class Leaderboard(object):
         @param max_score [float] Maximum score.
         @return the total members in a given score range from the named leaderboard.
         '''
-        return self.redis_connection.zcount(
+        return self._reader().zcount(
             leaderboard_name, min_score, max_score)
 
     def total_scores(self):
@@ -428,7 +736,106 @@ class Leaderboard(object):
         @param leaderboard_name Name of the leaderboard.
         @return Sum of scores for all members in the named leaderboard.
         '''
-        return sum([leader[self.SCORE_KEY] for leader in self.all_leaders_from(self.leaderboard_name)])
+        return self.aggregates_in(leaderboard_name)['sum']
+
+    def aggregates(self):
+        '''
+        Aggregate statistics of the scores of all members in the leaderboard.
+
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self.aggregates_in(self.leaderboard_name)
+
+    def aggregates_in(self, leaderboard_name):
+        '''
+        Aggregate statistics of the scores of all members in the named leaderboard. With the
+        +track_aggregates+ option they are read from the tracked totals along with the lowest
+        and highest scores; otherwise they are computed by a server-side script, without
+        sending the members to the client, in chunks of +DEFAULT_CHUNK_SIZE+ members.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+          Mean, min, max and variance are +None+ for an empty leaderboard.
+        '''
+        if self.track_aggregates:
+            aggregates = self._tracked_aggregates(
+                self._reader().pipeline(transaction=False).hmget(
+                    self._aggregates_key(leaderboard_name), 'count', 'sum', 'squares', 'shift').zrange(
+                    leaderboard_name, 0, 0, withscores=True).zrange(
+                    leaderboard_name, -1, -1, withscores=True).execute())
+            if aggregates is not None:
+                return aggregates
+
+        return self._aggregates_in_range(leaderboard_name, 'rank', 0, -1)
+
+    def aggregates_for_score_range(self, min_score, max_score):
+        '''
+        Aggregate statistics of the scores of the members in a given score range of the leaderboard.
+
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self.aggregates_for_score_range_in(
+            self.leaderboard_name, min_score, max_score)
+
+    def aggregates_for_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Aggregate statistics of the scores of the members in a given score range of the named
+        leaderboard, computed by a server-side script in chunks of +DEFAULT_CHUNK_SIZE+ members.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self._aggregates_in_range(
+            leaderboard_name, 'score', min_score, max_score)
+
+    def aggregates_for_rank_range(self, starting_rank, ending_rank):
+        '''
+        Aggregate statistics of the scores of the members in a given rank range of the leaderboard.
+
+        @param starting_rank [int] Starting rank (inclusive).
+        @param ending_rank [int] Ending rank (inclusive).
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self.aggregates_for_rank_range_in(
+            self.leaderboard_name, starting_rank, ending_rank)
+
+    def aggregates_for_rank_range_in(
+            self, leaderboard_name, starting_rank, ending_rank):
+        '''
+        Aggregate statistics of the scores of the members in a given rank range of the named
+        leaderboard, computed by a server-side script in chunks of +DEFAULT_CHUNK_SIZE+ members.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param starting_rank [int] Starting rank (inclusive).
+        @param ending_rank [int] Ending rank (inclusive).
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self._aggregates_in_range(
+            leaderboard_name, 'rank', max(starting_rank - 1, 0), ending_rank - 1)
+
+    def rebuild_aggregates(self):
+        '''
+        Recompute the tracked aggregates of the leaderboard from its scores.
+        '''
+        return self.rebuild_aggregates_in(self.leaderboard_name)
+
+    def rebuild_aggregates_in(self, leaderboard_name):
+        '''
+        Recompute the tracked aggregates of the named leaderboard from its scores. Needed once
+        when the +track_aggregates+ option is turned on for an existing leaderboard, or after
+        the leaderboard was written without it. The scores are read by a single script call,
+        which blocks the server for as long as it takes to read them all.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        self._script(scripts.AGGREGATES)(
+            keys=[leaderboard_name, self._aggregates_key(leaderboard_name)],
+            args=[self.order, 'rank', 0, -1])
 
     def check_member(self, member):
         '''
@@ -447,7 +854,7 @@ class Leaderboard(object):
         @param member [String] Member name.
         @return +true+ if the member exists in the named leaderboard, +false+ otherwise.
         '''
-        return self.redis_connection.zscore(
+        return self._reader().zscore(
             leaderboard_name, member) is not None
 
     def rank_for(self, member):
@@ -469,13 +876,13 @@ class Leaderboard(object):
         '''
         if self.order == self.ASC:
             try:
-                return self.redis_connection.zrank(
+                return self._reader().zrank(
                     leaderboard_name, member) + 1
             except:
                 return None
         else:
             try:
-                return self.redis_connection.zrevrank(
+                return self._reader().zrevrank(
                     leaderboard_name, member) + 1
             except:
                 return None
@@ -497,7 +904,7 @@ class Leaderboard(object):
         @param member [String] Member name.
         @return the score for a member in the leaderboard or +None+ if the member is not in the leaderboard.
         '''
-        score = self.redis_connection.zscore(leaderboard_name, member)
+        score = self._reader().zscore(leaderboard_name, member)
         if score is not None:
             score = float(score)
 
@@ -534,7 +941,7 @@ class Leaderboard(object):
         @param delta [float] Score change.
         @param member_data [String] Optional member data.
         '''
-        self.change_score_for_member_in(self.leaderboard_name, member, delta, member_data)
+        return self.change_score_for_member_in(self.leaderboard_name, member, delta, member_data)
 
     def change_score_for_member_in(self, leaderboard_name, member, delta, member_data=None):
         '''
@@ -545,14 +952,12 @@ class Leaderboard(object):
         @param delta [float] Score change.
         @param member_data [String] Optional member data.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.zincrby(leaderboard_name, member, delta)
-        if member_data:
-            pipeline.hset(
-                self._member_data_key(leaderboard_name),
-                member,
-                member_data)
-        pipeline.execute()
+        if self._write_behind is not None:
+            self._write_behind.change_score_for_member_in(
+                leaderboard_name, member, delta, member_data)
+        else:
+            self._change_scores_in(
+                leaderboard_name, [(member, delta, member_data)])
 
     def remove_members_in_score_range(self, min_score, max_score):
         '''
@@ -561,7 +966,7 @@ class Leaderboard(object):
         @param min_score [float] Minimum score.
         @param max_score [float] Maximum score.
         '''
-        self.remove_members_in_score_range_in(
+        return self.remove_members_in_score_range_in(
             self.leaderboard_name,
             min_score,
             max_score)
@@ -575,10 +980,17 @@ class Leaderboard(object):
         @param min_score [float] Minimum score.
         @param max_score [float] Maximum score.
         '''
-        self.redis_connection.zremrangebyscore(
+        self._settle_pending_in(leaderboard_name)
+        if self.track_aggregates:
+            self._remove_range_in(leaderboard_name, 'score', min_score, max_score)
+            return
+
+        self._write_in(
             leaderboard_name,
-            min_score,
-            max_score)
+            lambda client: client.zremrangebyscore(
+                leaderboard_name,
+                min_score,
+                max_score))
 
     def remove_members_outside_rank(self, rank):
         '''
@@ -597,13 +1009,18 @@ class Leaderboard(object):
         @param rank [int] the rank (inclusive) which we should keep.
         @return the total member count which was removed.
         '''
+        self._settle_pending_in(leaderboard_name)
+        if self.track_aggregates:
+            return self._remove_range_in(leaderboard_name, 'rank', rank, -1)
+
         if self.order == self.DESC:
-            rank = -(rank) - 1
-            return self.redis_connection.zremrangebyrank(
-                leaderboard_name, 0, rank)
+            start, stop = 0, -(rank) - 1
         else:
-            return self.redis_connection.zremrangebyrank(
-                leaderboard_name, rank, -1)
+            start, stop = rank, -1
+
+        return self._write_in(
+            leaderboard_name,
+            lambda client: client.zremrangebyrank(leaderboard_name, start, stop))
 
     def page_for(self, member, page_size=DEFAULT_PAGE_SIZE):
         '''
@@ -627,11 +1044,11 @@ class Leaderboard(object):
         '''
         rank_for_member = None
         if self.order == self.ASC:
-            rank_for_member = self.redis_connection.zrank(
+            rank_for_member = self._reader().zrank(
                 leaderboard_name,
                 member)
         else:
-            rank_for_member = self.redis_connection.zrevrank(
+            rank_for_member = self._reader().zrevrank(
                 leaderboard_name,
                 member)
 
@@ -659,11 +1076,10 @@ class Leaderboard(object):
         @param member [String] Member name.
         @return the percentile for a member in the named leaderboard.
         '''
-        if not self.check_member_in(leaderboard_name, member):
-            return None
-
-        responses = self.redis_connection.pipeline().zcard(
+        responses = self._reader().pipeline().zcard(
             leaderboard_name).zrevrank(leaderboard_name, member).execute()
+        if responses[1] is None:
+            return None
 
         percentile = math.ceil(
             (float(
@@ -709,7 +1125,7 @@ class Leaderboard(object):
         index = (total_members - 1) * (percentile / 100.0)
 
         scores = [
-            pair[1] for pair in self.redis_connection.zrange(
+            pair[1] for pair in self._reader().zrange(
                 leaderboard_name, int(
                     math.floor(index)), int(
                     math.ceil(index)), withscores=True)]
@@ -722,50 +1138,58 @@ class Leaderboard(object):
 
     def expire_leaderboard(self, seconds):
         '''
-        Expire the current leaderboard in a set number of seconds. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the current leaderboard in a set number of seconds, along with its member
+        data, its tracked aggregates with the +track_aggregates+ option and its version
+        with the page cache. With the +global_member_data+ option the shared member data
+        expires too.
 
         @param seconds [int] Number of seconds after which the leaderboard will be expired.
         '''
-        self.expire_leaderboard_for(self.leaderboard_name, seconds)
+        return self.expire_leaderboard_for(self.leaderboard_name, seconds)
 
     def expire_leaderboard_for(self, leaderboard_name, seconds):
         '''
-        Expire the given leaderboard in a set number of seconds. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the given leaderboard in a set number of seconds, along with its member
+        data, its tracked aggregates with the +track_aggregates+ option and its version
+        with the page cache. With the +global_member_data+ option the shared member data
+        expires too.
 
         @param leaderboard_name [String] Name of the leaderboard.
         @param seconds [int] Number of seconds after which the leaderboard will be expired.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.expire(leaderboard_name, seconds)
-        pipeline.expire(self._member_data_key(leaderboard_name), seconds)
+        keys = self._keys_for([leaderboard_name])
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expire(key, seconds)
+        self._bump_version_in(leaderboard_name, pipeline, seconds=seconds)
         pipeline.execute()
 
     def expire_leaderboard_at(self, timestamp):
         '''
-        Expire the current leaderboard at a specific UNIX timestamp. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the current leaderboard at a specific UNIX timestamp, along with its
+        member data, its tracked aggregates with the +track_aggregates+ option and its
+        version with the page cache. With the +global_member_data+ option the shared
+        member data expires too.
 
         @param timestamp [int] UNIX timestamp at which the leaderboard will be expired.
         '''
-        self.expire_leaderboard_at_for(self.leaderboard_name, timestamp)
+        return self.expire_leaderboard_at_for(self.leaderboard_name, timestamp)
 
     def expire_leaderboard_at_for(self, leaderboard_name, timestamp):
         '''
-        Expire the given leaderboard at a specific UNIX timestamp. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the given leaderboard at a specific UNIX timestamp, along with its member
+        data, its tracked aggregates with the +track_aggregates+ option and its version
+        with the page cache. With the +global_member_data+ option the shared member data
+        expires too.
 
         @param leaderboard_name [String] Name of the leaderboard.
         @param timestamp [int] UNIX timestamp at which the leaderboard will be expired.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.expireat(leaderboard_name, timestamp)
-        pipeline.expireat(self._member_data_key(leaderboard_name), timestamp)
+        keys = self._keys_for([leaderboard_name])
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expireat(key, timestamp)
+        self._bump_version_in(leaderboard_name, pipeline, timestamp=timestamp)
         pipeline.execute()
 
     def leaders(self, current_page, **options):
@@ -800,14 +1224,12 @@ class Leaderboard(object):
 
         ending_offset = (starting_offset + page_size) - 1
 
-        raw_leader_data = self._range_method(
-            self.redis_connection,
+        return self._cached_page_in(
             leaderboard_name,
+            'rank',
             int(starting_offset),
             int(ending_offset),
-            withscores=False)
-        return self._parse_raw_members(
-            leaderboard_name, raw_leader_data, **options)
+            **options)
 
     def all_leaders(self, **options):
         '''
@@ -827,9 +1249,130 @@ class Leaderboard(object):
         @return the named leaderboard.
         '''
         raw_leader_data = self._range_method(
-            self.redis_connection, leaderboard_name, 0, -1, withscores=False)
+            self._reader(), leaderboard_name, 0, -1, withscores=True)
         return self._parse_raw_members(
-            leaderboard_name, raw_leader_data, **options)
+            leaderboard_name, raw_leader_data, starting_offset=0, **options)
+
+    def iter_leaders(self, **options):
+        '''
+        Iterate over all leaders of the leaderboard.
+
+        @param options [Hash] Options to be used when retrieving the leaders from the leaderboard.
+        @return a generator of the leaders from the leaderboard.
+        '''
+        return self.iter_leaders_from(self.leaderboard_name, **options)
+
+    def iter_leaders_from(self, leaderboard_name,
+                          chunk_size=DEFAULT_CHUNK_SIZE, **options):
+        '''
+        Iterate over all leaders of the named leaderboard. Leaders are fetched lazily in
+        windows of +chunk_size+ ranks, each window with its scores, ranks and member data
+        in a single round trip, so memory use does not grow with the size of the leaderboard.
+        Members moving between windows while iterating may be skipped or seen twice.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return a generator of the leaders from the named leaderboard.
+        '''
+        for leaders in self._iter_pages_from(leaderboard_name, chunk_size, **options):
+            for leader in leaders:
+                yield leader
+
+    def snapshot_arrays(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        '''
+        Copy the whole leaderboard into NumPy arrays for analytics. Requires numpy.
+
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @return a +LeaderboardSnapshot+ of the leaderboard.
+        '''
+        return self.snapshot_arrays_in(self.leaderboard_name, chunk_size)
+
+    def snapshot_arrays_in(self, leaderboard_name, chunk_size=DEFAULT_CHUNK_SIZE):
+        '''
+        Copy the whole named leaderboard into NumPy arrays for analytics: member names,
+        scores and ranks in leaderboard order, with helpers for percentile tables, score
+        histograms and rank lookups. The leaderboard is read in windows of +chunk_size+ ranks
+        as +iter_leaders_from+ does, each window going straight into arrays without building
+        a dictionary per leader. Requires numpy.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @return a +LeaderboardSnapshot+ of the named leaderboard.
+        '''
+        builder = snapshot.SnapshotBuilder()
+        for columns in self._iter_pages_from(
+                leaderboard_name, chunk_size, result_format=self.COLUMNAR):
+            builder.add(columns)
+
+        return builder.build(self.order, self.DENSE_RANKS)
+
+    def export_archive(self, path, chunk_size=DEFAULT_CHUNK_SIZE, with_member_data=False):
+        '''
+        Write the whole leaderboard to a binary archive file.
+
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param with_member_data [boolean] Whether to archive the member data.
+        @return the number of members archived.
+        '''
+        return self.export_archive_from(
+            self.leaderboard_name, path, chunk_size, with_member_data)
+
+    def export_archive_from(self, leaderboard_name, path,
+                            chunk_size=DEFAULT_CHUNK_SIZE, with_member_data=False):
+        '''
+        Write the whole named leaderboard to a binary archive file, see +leaderboard.archive+.
+        The leaderboard is read in windows of +chunk_size+ ranks as +iter_leaders_from+ does,
+        and the archive is only put in place once complete.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param with_member_data [boolean] Whether to archive the member data.
+        @return the number of members archived.
+        '''
+        writer = archive.ArchiveWriter(path, with_member_data)
+        try:
+            for columns in self._iter_pages_from(
+                    leaderboard_name, chunk_size, result_format=self.COLUMNAR,
+                    with_member_data=with_member_data):
+                writer.add(columns)
+        except:
+            writer.discard()
+            raise
+
+        return writer.close(self.order)
+
+    def restore_archive(self, path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        '''
+        Rank the members of a binary archive file in the leaderboard.
+
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members restored so far after each chunk.
+        @return the number of members restored.
+        '''
+        return self.restore_archive_in(
+            self.leaderboard_name, path, chunk_size, progress)
+
+    def restore_archive_in(self, leaderboard_name, path,
+                           chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        '''
+        Rank the members of a binary archive file in the named leaderboard, with their member
+        data if archived. Members are read from the memory mapped archive and written with
+        +rank_members_in+, one multi-member write per chunk of +chunk_size+ members. Members
+        already in the leaderboard and not in the archive are kept.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param path [String] Path of the archive.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members restored so far after each chunk.
+        @return the number of members restored.
+        '''
+        with archive.LeaderboardArchive(path, encoding=None) as leaders:
+            return self.rank_members_in(
+                leaderboard_name, leaders.iter_members(), chunk_size, progress)
 
     def members_from_score_range(
             self, minimum_score, maximum_score, **options):
@@ -855,19 +1398,12 @@ class Leaderboard(object):
         @param options [Hash] Options to be used when retrieving the data from the leaderboard.
         @return members from the leaderboard that fall within the given score range.
         '''
-        raw_leader_data = []
-        if self.order == self.DESC:
-            raw_leader_data = self.redis_connection.zrevrangebyscore(
-                leaderboard_name,
-                maximum_score,
-                minimum_score)
-        else:
-            raw_leader_data = self.redis_connection.zrangebyscore(
-                leaderboard_name,
-                minimum_score,
-                maximum_score)
-        return self._parse_raw_members(
-            leaderboard_name, raw_leader_data, **options)
+        return self._shared_page_in(
+            leaderboard_name,
+            'score',
+            minimum_score,
+            maximum_score,
+            **options)
 
     def members_from_rank_range(self, starting_rank, ending_rank, **options):
         '''
@@ -897,25 +1433,13 @@ class Leaderboard(object):
             starting_rank = 0
 
         ending_rank -= 1
-        if ending_rank > self.total_members_in(leaderboard_name):
-            ending_rank = self.total_members_in(leaderboard_name) - 1
 
-        raw_leader_data = []
-        if self.order == self.DESC:
-            raw_leader_data = self.redis_connection.zrevrange(
-                leaderboard_name,
-                starting_rank,
-                ending_rank,
-                withscores=False)
-        else:
-            raw_leader_data = self.redis_connection.zrange(
-                leaderboard_name,
-                starting_rank,
-                ending_rank,
-                withscores=False)
-
-        return self._parse_raw_members(
-            leaderboard_name, raw_leader_data, **options)
+        return self._shared_page_in(
+            leaderboard_name,
+            'rank',
+            starting_rank,
+            ending_rank,
+            **options)
 
     def top(self, number, **options):
         '''
@@ -939,7 +1463,8 @@ class Leaderboard(object):
 
         @return members from the leaderboard that fall within the given rank range.
         '''
-        return self.members_from_rank_range_in(leaderboard_name, 1, number, **options)
+        return self._cached_page_in(
+            leaderboard_name, 'rank', 0, number - 1, **options)
 
     def member_at(self, position, **options):
         '''
@@ -991,35 +1516,14 @@ class Leaderboard(object):
         @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
         @return a page of leaders from the named leaderboard around a given member. Returns an empty array for a non-existent member.
         '''
-        reverse_rank_for_member = None
-        if self.order == self.DESC:
-            reverse_rank_for_member = self.redis_connection.zrevrank(
-                leaderboard_name,
-                member)
-        else:
-            reverse_rank_for_member = self.redis_connection.zrank(
-                leaderboard_name,
-                member)
-
-        if reverse_rank_for_member is None:
-            return []
-
         page_size = options.get('page_size', self.page_size)
 
-        starting_offset = reverse_rank_for_member - (page_size // 2)
-        if starting_offset < 0:
-            starting_offset = 0
-
-        ending_offset = (starting_offset + page_size) - 1
-
-        raw_leader_data = self._range_method(
-            self.redis_connection,
+        return self._cached_page_in(
             leaderboard_name,
-            int(starting_offset),
-            int(ending_offset),
-            withscores=False)
-        return self._parse_raw_members(
-            leaderboard_name, raw_leader_data, **options)
+            'member',
+            member,
+            int(page_size),
+            **options)
 
     def ranked_in_list(self, members, **options):
         '''
@@ -1043,7 +1547,7 @@ class Leaderboard(object):
         '''
         ranks_for_members = []
 
-        pipeline = self.redis_connection.pipeline()
+        pipeline = self._reader().pipeline()
 
         for member in members:
             if self.order == self.ASC:
@@ -1080,17 +1584,8 @@ class Leaderboard(object):
                     pass
 
         if 'sort_by' in options:
-            sort_value_if_none = float('-inf') if self.order == self.ASC else float('+inf')
-            if self.RANK_KEY == options['sort_by']:
-                ranks_for_members = sorted(
-                    ranks_for_members,
-                    key=lambda member: member.get(self.RANK_KEY) if member.get(self.RANK_KEY) is not None else sort_value_if_none
-                )
-            elif self.SCORE_KEY == options['sort_by']:
-                ranks_for_members = sorted(
-                    ranks_for_members,
-                    key=lambda member: member.get(self.SCORE_KEY) if member.get(self.SCORE_KEY) is not None else sort_value_if_none
-                )
+            ranks_for_members = self._sort_members(
+                ranks_for_members, options['sort_by'])
 
         return ranks_for_members
 
@@ -1103,7 +1598,13 @@ class Leaderboard(object):
         @param options [Hash] Options for merging the leaderboards.
         '''
         keys.insert(0, self.leaderboard_name)
-        self.redis_connection.zunionstore(destination, keys, aggregate)
+        if self._same_slot([destination] + keys):
+            self.redis_connection.zunionstore(destination, keys, aggregate)
+        else:
+            self._store_combined(destination, keys, aggregate, False)
+        if self.track_aggregates:
+            self.rebuild_aggregates_in(destination)
+        self._bump_version_in(destination)
 
     def intersect_leaderboards(self, destination, keys, aggregate='SUM'):
         '''
@@ -1114,7 +1615,373 @@ class Leaderboard(object):
         @param options [Hash] Options for intersecting the leaderboards.
         '''
         keys.insert(0, self.leaderboard_name)
-        self.redis_connection.zinterstore(destination, keys, aggregate)
+        if self._same_slot([destination] + keys):
+            self.redis_connection.zinterstore(destination, keys, aggregate)
+        else:
+            self._store_combined(destination, keys, aggregate, True)
+        if self.track_aggregates:
+            self.rebuild_aggregates_in(destination)
+        self._bump_version_in(destination)
+
+    def _change_scores_in(self, leaderboard_name, changes, pipeline=None):
+        '''
+        Change the scores of members in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param changes [Array] (member, delta, member_data) tuples.
+        @param pipeline Pipeline to queue the changes on. If +None+, the changes are written immediately.
+        '''
+        if self.track_aggregates:
+            self._write_members_in(
+                leaderboard_name,
+                [('change', member, delta, member_data) for member, delta, member_data in changes],
+                client=pipeline)
+            return
+
+        execute = pipeline is None
+        if execute:
+            pipeline = self.redis_connection.pipeline()
+
+        member_data = {}
+        for member, delta, data in changes:
+            pipeline.zincrby(leaderboard_name, member, delta)
+            if data:
+                member_data[member] = data
+        if member_data:
+            pipeline.hmset(self._member_data_key(leaderboard_name), member_data)
+        self._bump_version_in(leaderboard_name, pipeline)
+
+        if execute:
+            pipeline.execute()
+
+    def _rank_member_if_mode_in(
+            self, leaderboard_name, mode, member, score, member_data=None, client=None):
+        '''
+        Rank a member in the named leaderboard if the conditional mode allows it. Uses ZADD
+        with the GT, LT or NX flag when there is no member data and the server supports it,
+        and a server-side script otherwise.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] Conditional mode.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        @param client Pipeline to queue the write on, or +None+ to send it immediately. The
+          queued write replies 1, or the new score with tracked aggregates, if the member was ranked.
+        @return +True+ if the member was ranked, +False+ otherwise, for a write sent immediately.
+        '''
+        if self.track_aggregates:
+            return self._write_members_in(
+                leaderboard_name, [(mode, member, score, member_data)], client) is not None
+
+        if not member_data and mode in self.NATIVE_CONDITIONAL_MODES:
+            flag, minimum_version = self.NATIVE_CONDITIONAL_MODES[mode]
+            if self._redis_version() >= minimum_version:
+                return self._write_in(
+                    leaderboard_name,
+                    lambda client: client.execute_command(
+                        'ZADD', leaderboard_name, flag, 'CH', score, member),
+                    client) == 1
+
+        return self._write_in(
+            leaderboard_name,
+            lambda client: self._script(scripts.RANK_MEMBER_IF)(
+                keys=[leaderboard_name, self._member_data_key(leaderboard_name)],
+                args=[mode, member, score, member_data or ''],
+                client=client),
+            client) == 1
+
+    def _write_members_in(self, leaderboard_name, writes, client=None):
+        '''
+        Rank, change the score of or remove members in the named leaderboard, keeping its
+        tracked aggregates in step, atomically in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param writes [Array] (operation, member, value, member_data) tuples applied in order. The
+          operation is one of 'rank', 'change', 'remove' or a conditional mode, and the value is
+          the member score, or the score change for 'change'.
+        @param client Redis connection or pipeline to run the script on.
+        @return the new score for the last member written.
+        '''
+        args = []
+        for operation, member, value, member_data in writes:
+            args.extend([operation, member, value, member_data or ''])
+
+        return self._write_in(
+            leaderboard_name,
+            lambda client: self._script(scripts.TRACKED_WRITE)(
+                keys=[
+                    leaderboard_name,
+                    self._aggregates_key(leaderboard_name),
+                    self._member_data_key(leaderboard_name)],
+                args=args,
+                client=client),
+            client)
+
+    def _remove_range_in(self, leaderboard_name, mode, first, second, client=None):
+        '''
+        Remove a range of members from the named leaderboard, keeping its tracked aggregates
+        in step, atomically in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] 'rank' for zero-based positions in leaderboard order, where a negative
+          ending position is the last member, or 'score' for a score range.
+        @param first Starting position or minimum score (inclusive).
+        @param second Ending position or maximum score (inclusive).
+        @param client Redis connection or pipeline to run the script on.
+        @return the number of members removed.
+        '''
+        return self._write_in(
+            leaderboard_name,
+            lambda client: self._script(scripts.REMOVE_RANGE)(
+                keys=[leaderboard_name, self._aggregates_key(leaderboard_name)],
+                args=[self.order, mode, first, second],
+                client=client),
+            client)
+
+    def _write_in(self, leaderboard_name, write, client=None):
+        '''
+        Run a write to the named leaderboard, bumping its version for the page cache in
+        the same round trip if the page cache is enabled.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param write [function] Function sending or queuing the write on the redis connection or pipeline it is given.
+        @param client Pipeline to queue the write on, or +None+ to send it immediately.
+        @return the result of the write.
+        '''
+        if self._page_cache is None:
+            return write(self.redis_connection if client is None else client)
+
+        pipeline = self.redis_connection.pipeline() if client is None else client
+        result = write(pipeline)
+        self._bump_version_in(leaderboard_name, pipeline)
+        if client is None:
+            return pipeline.execute()[0]
+
+        return result
+
+    def _bump_version_in(self, leaderboard_name, pipeline=None, seconds=None, timestamp=None):
+        '''
+        Invalidate the cached pages of the named leaderboard and move its version on, if
+        the page cache is enabled. The version moves by a random step, so that a leaderboard
+        created again after its version expired does not repeat a version cached before.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param pipeline Pipeline to queue the bump on. If +None+, it is sent immediately.
+        @param seconds [int] Number of seconds after which the version expires, for writes expiring the leaderboard.
+        @param timestamp [int] UNIX timestamp at which the version expires, for writes expiring the leaderboard.
+        '''
+        if self._page_cache is None:
+            return
+
+        self._page_cache.invalidate(leaderboard_name)
+        client = self.redis_connection if pipeline is None else pipeline
+        version_key = self._version_key(leaderboard_name)
+        client.incrby(version_key, random.randint(1, 2 ** 31))
+        if seconds is not None:
+            client.expire(version_key, seconds)
+        if timestamp is not None:
+            client.expireat(version_key, timestamp)
+
+    def _drop_version_in(self, leaderboard_name, pipeline):
+        '''
+        Invalidate the cached pages of the named leaderboard and delete its version along
+        with it, if the page cache is enabled.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param pipeline Pipeline to queue the delete on.
+        '''
+        if self._page_cache is None:
+            return
+
+        self._page_cache.invalidate(leaderboard_name)
+        pipeline.delete(self._version_key(leaderboard_name))
+
+    def _cached_page_in(self, leaderboard_name, mode, first, second, **options):
+        '''
+        Retrieve a contiguous page of members from the named leaderboard through the page
+        cache, if it is enabled. Takes the same arguments as +_members_from_page_in+.
+
+        @return a page of leaders from the named leaderboard.
+        '''
+        if self._page_cache is None:
+            return self._shared_page_in(
+                leaderboard_name, mode, first, second, **options)
+
+        page = self._page_cache.get(
+            leaderboard_name,
+            (mode, first, second, self.order, tuple(sorted(options.items()))),
+            lambda: self._shared_page_in(
+                leaderboard_name, mode, first, second, **options),
+            lambda: self._page_version_in(leaderboard_name))
+
+        return result_formats.copy_page(page)
+
+    def _shared_page_in(self, leaderboard_name, mode, first, second, **options):
+        '''
+        Retrieve a contiguous page of members from the named leaderboard, sharing the
+        read with identical reads in flight if the +single_flight+ option is set. Takes
+        the same arguments as +_members_from_page_in+.
+
+        @return a page of leaders from the named leaderboard.
+        '''
+        if self._single_flight is None:
+            return self._members_from_page_in(
+                leaderboard_name, mode, first, second, **options)
+
+        return self._single_flight.do(
+            (leaderboard_name, mode, first, second, tuple(sorted(options.items()))),
+            lambda: self._members_from_page_in(
+                leaderboard_name, mode, first, second, **options),
+            result_formats.copy_page)
+
+    def _page_version_in(self, leaderboard_name):
+        '''
+        Current version of the named leaderboard, moved on by every write while the page
+        cache is enabled, along with its number of members, which also changes with writes
+        that do not move the version on.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a (version, number of members) tuple.
+        '''
+        return tuple(self._reader().pipeline(transaction=False).get(
+            self._version_key(leaderboard_name)).zcard(leaderboard_name).execute())
+
+    def _aggregates_in_range(self, leaderboard_name, mode, first, second):
+        '''
+        Aggregate statistics of a range of the named leaderboard, computed server-side by a
+        script call per chunk of +DEFAULT_CHUNK_SIZE+ members, so that large ranges do not
+        block the server. Writes made between two chunks may be seen by some chunks only.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] 'rank' or 'score', see +_remove_range_in+.
+        @param first Starting position or minimum score (inclusive).
+        @param second Ending position or maximum score (inclusive).
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        totals = None
+        while True:
+            response = self._script(scripts.AGGREGATES)(
+                keys=[leaderboard_name],
+                args=[self.order, mode, first, second,
+                      totals[0] if totals else 0, self.DEFAULT_CHUNK_SIZE],
+                client=self._reader())
+            totals = self._add_aggregates_chunk(totals, response)
+            if response[0] < self.DEFAULT_CHUNK_SIZE:
+                return self._aggregates_of(totals)
+
+    def _add_aggregates_chunk(self, totals, response):
+        '''
+        Add the statistics of a chunk of a range, as returned by +scripts.AGGREGATES+, to those
+        of the chunks before it, pooling the squared differences from their means.
+
+        @param totals [Array] Count, sum, mean, sum of squared differences from the mean, minimum
+          and maximum of the chunks before, or +None+ for the first chunk.
+        @param response [Array] Response of the script for the chunk.
+        @return the totals including the chunk.
+        '''
+        if response[0] == 0:
+            return totals
+        if totals is None:
+            return (response[0], float(response[1]), float(response[4]), float(response[5]),
+                    float(response[2]), float(response[3]))
+
+        total_count, total, mean, m2, minimum, maximum = totals
+        count = response[0] + total_count
+        delta = float(response[4]) - mean
+        return (
+            count,
+            total + float(response[1]),
+            mean + delta * response[0] / count,
+            m2 + float(response[5]) + delta * delta * total_count * response[0] / count,
+            minimum,
+            float(response[3]))
+
+    def _aggregates_of(self, totals):
+        if totals is None:
+            return self._aggregates(0, 0.0)
+
+        total_count, total, mean, m2, minimum, maximum = totals
+        return self._aggregates(total_count, total, minimum, maximum, m2 / total_count)
+
+    def _tracked_aggregates(self, responses):
+        '''
+        Aggregate statistics from the tracked aggregates of a leaderboard. The variance is
+        computed from the sum of squares of the scores less the shift, see +scripts.TRACK+.
+
+        @param responses [Array] The count, sum, squares and shift fields of the tracked aggregates,
+          and the lowest and highest members with their scores.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores, or
+          +None+ if there are no tracked aggregates.
+        '''
+        total_count, total, squares, shift = responses[0]
+        if total_count is None:
+            return None
+
+        total_count = int(total_count)
+        if total_count == 0 or not responses[1]:
+            return self._aggregates(0, 0.0)
+
+        offset = float(total) / total_count - float(shift or 0)
+        return self._aggregates(
+            total_count,
+            float(total),
+            responses[1][0][1],
+            responses[2][0][1],
+            float(squares) / total_count - offset * offset)
+
+    def _aggregates(self, total_count, total, minimum=None, maximum=None, variance=None):
+        return {
+            'count': total_count,
+            'sum': total,
+            'mean': total / total_count if total_count else None,
+            'min': minimum,
+            'max': maximum,
+            'variance': variance
+        }
+
+    def _redis_version(self):
+        '''
+        Version of the redis server, fetched once.
+
+        @return the version as a tuple of integers.
+        '''
+        if self._server_version is None:
+            version = self.redis_connection.info('server')['redis_version']
+            self._server_version = tuple(
+                int(part) for part in str(version).split('.')[:3])
+
+        return self._server_version
+
+    def _rank_chunk_in(self, pipeline, leaderboard_name, chunk):
+        '''
+        Queue the writes for a chunk of members on a pipeline.
+
+        @param pipeline Redis pipeline.
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk [Array] (member, score, member_data) tuples.
+        '''
+        if self.track_aggregates:
+            self._write_members_in(
+                leaderboard_name,
+                [('rank', member, score, member_data) for member, score, member_data in chunk],
+                client=pipeline)
+            return
+
+        pairs = []
+        member_data = {}
+        for member, score, data in chunk:
+            if isinstance(self.redis_connection, Redis):
+                pairs.extend([member, score])
+            else:
+                pairs.extend([score, member])
+            if data:
+                member_data[member] = data
+
+        pipeline.zadd(leaderboard_name, *pairs)
+        if member_data:
+            pipeline.hmset(self._member_data_key(leaderboard_name), member_data)
+        self._bump_version_in(leaderboard_name, pipeline)
 
     def _range_method(self, connection, *args, **kwargs):
         if self.order == self.DESC:
@@ -1127,29 +1994,453 @@ class Leaderboard(object):
         Key for retrieving optional member data.
 
         @param leaderboard_name [String] Name of the leaderboard.
-        @return a key in the form of +leaderboard_name:member_data+
+        @return a key in the form of +leaderboard_name:member_data+, or +{leaderboard_name}:member_data+ in cluster mode.
         '''
         if self.global_member_data is False:
-            return '%s:%s' % (leaderboard_name, self.member_data_namespace)
+            return '%s:%s' % (self._hash_tagged(leaderboard_name), self.member_data_namespace)
         else:
             return self.member_data_namespace
 
+    def _connection(self, options):
+        '''
+        Connection to the primary, built from the connection options left once the
+        leaderboard options have been taken out. A connection pool is added to the options.
+
+        @param options [Hash] Connection options.
+        @return a redis connection.
+        '''
+        connection = options.pop('connection', None)
+        if isinstance(connection, (StrictRedis, Redis)):
+            options['connection_pool'] = connection.connection_pool
+        if 'connection_pool' not in options:
+            options['connection_pool'] = self.pool(
+                options.pop('host', self.DEFAULT_REDIS_HOST),
+                options.pop('port', self.DEFAULT_REDIS_PORT),
+                options.pop('db', self.DEFAULT_REDIS_DB),
+                options.pop('pools', self.DEFAULT_POOLS),
+                **self._pool_options(options)
+            )
+
+        return self._client(**options)
+
+    def _replica_connection(self, replica, connection_options):
+        '''
+        Connection to a read replica.
+
+        @param replica Redis handle, or a Hash of options overriding the primary's connection options.
+        @param connection_options [Hash] Connection options given for the primary.
+        @return a redis connection.
+        '''
+        if isinstance(replica, (StrictRedis, Redis)):
+            return replica
+
+        options = dict(
+            (key, value) for key, value in connection_options.items()
+            if key not in ['redis_connection', 'connection', 'connection_pool'])
+        options.update(replica)
+        return self._client(connection_pool=self.pool(
+            options.pop('host', self.DEFAULT_REDIS_HOST),
+            options.pop('port', self.DEFAULT_REDIS_PORT),
+            options.pop('db', self.DEFAULT_REDIS_DB),
+            options.pop('pools', self.DEFAULT_POOLS),
+            **self._pool_options(options)))
+
+    def _pool_options(self, options):
+        '''
+        Options of a new connection pool, using in-process connections for the
+        +memory+ backend.
+
+        @param options [Hash] Connection options.
+        @return the pool options.
+        '''
+        if self.backend == self.MEMORY:
+            return dict(options, connection_class=MemoryConnection)
+
+        return options
+
+    def _client(self, **options):
+        '''
+        Redis client for the given options, sending concurrent commands as a single
+        pipeline if the +auto_pipeline+ option is set.
+
+        @param options [Hash] Options of the redis client.
+        @return a redis connection.
+        '''
+        if self.auto_pipeline:
+            options.update(self._auto_pipeline_options)
+            return AutoPipelineRedis(**options)
+
+        return Redis(**options)
+
+    def _reader(self):
+        '''
+        Connection to send a read to: the primary if there are no read replicas or inside
+        +read_your_writes+, otherwise a replica picked by the read strategy. The least
+        outstanding strategy picks the replica with the fewest connections in use,
+        starting from the next replica in turn to spread ties.
+
+        @return a redis connection.
+        '''
+        if not self.read_connections or getattr(self._local, 'primary_reads', 0):
+            return self.redis_connection
+
+        start = next(self._reads) % len(self.read_connections)
+        if self.read_strategy == self.ROUND_ROBIN:
+            return self.read_connections[start]
+
+        candidates = self.read_connections[start:] + self.read_connections[:start]
+        return min(
+            candidates,
+            key=lambda connection: len(
+                getattr(connection.connection_pool, '_in_use_connections', ())))
+
+    def _version_key(self, leaderboard_name):
+        '''
+        Key for the version counter of a leaderboard used by the page cache.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a key in the form of +leaderboard_name:version+, or +{leaderboard_name}:version+ in cluster mode.
+        '''
+        return '%s:version' % self._hash_tagged(leaderboard_name)
+
+    def _aggregates_key(self, leaderboard_name):
+        '''
+        Key for the tracked aggregates of a leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a key in the form of +leaderboard_name:aggregates+, or +{leaderboard_name}:aggregates+ in cluster mode.
+        '''
+        return '%s:aggregates' % self._hash_tagged(leaderboard_name)
+
+    def _hash_tagged(self, leaderboard_name):
+        '''
+        Leaderboard name to derive other keys from. In cluster mode the name is wrapped in a
+        hash tag, unless it already has one, so derived keys share the slot of the leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return the leaderboard name, or +{leaderboard_name}+ in cluster mode.
+        '''
+        if not self.cluster or hash_tag(leaderboard_name) is not None:
+            return leaderboard_name
+
+        return '{%s}' % leaderboard_name
+
+    def _same_slot(self, keys):
+        '''
+        Check whether multi-key commands may be sent for the given keys: always outside
+        cluster mode, and in cluster mode only if all keys hash to the same slot.
+
+        @param keys [Array] Redis keys.
+        @return +True+ if the keys may be used together in a single command.
+        '''
+        return not self.cluster or len(set(key_slot(key) for key in keys)) == 1
+
+    def _keys_for(self, leaderboard_names):
+        '''
+        Leaderboard, member data and tracked aggregates keys of the named leaderboards.
+
+        @param leaderboard_names [Array] Leaderboard names.
+        @return a list of keys.
+        '''
+        keys = []
+        for leaderboard_name in leaderboard_names:
+            keys.extend([leaderboard_name, self._member_data_key(leaderboard_name)])
+            if self.track_aggregates:
+                keys.append(self._aggregates_key(leaderboard_name))
+
+        return keys
+
+    def _stored_keys_for(self, leaderboard_name):
+        '''
+        All keys stored for a leaderboard: the keys of +_keys_for+ and any other keys a
+        subclass keeps in step with the leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a list of keys.
+        '''
+        return self._keys_for([leaderboard_name])
+
+    def _pipeline_for(self, keys):
+        '''
+        Pipeline for commands on the given keys, wrapped in a transaction unless the keys
+        span cluster slots.
+
+        @param keys [Array] Redis keys.
+        @return a redis pipeline.
+        '''
+        return self.redis_connection.pipeline(transaction=self._same_slot(keys))
+
+    def _store_combined(self, destination, keys, aggregate, intersect):
+        '''
+        Merge or intersect leaderboards on the client, for keys that span cluster slots. The
+        leaderboards are read in windows of +DEFAULT_CHUNK_SIZE+ ranks, but every combined
+        member is held on the client until the destination is written, so memory and
+        transfer grow with the total number of members.
+
+        The member data of a member is taken from the first leaderboard that has some. The
+        destination is replaced in a single transaction, along with its member data and
+        any keys kept in step with it, such as a ties leaderboard or tracked aggregates.
+
+        @param destination [String] Destination leaderboard name.
+        @param keys [Array] Leaderboards to combine.
+        @param aggregate [String] 'SUM', 'MIN' or 'MAX'.
+        @param intersect [bool] Keep only members found in every leaderboard.
+        '''
+        combine = {'SUM': lambda a, b: a + b, 'MIN': min, 'MAX': max}[aggregate.upper()]
+
+        combined = None
+        for key in keys:
+            entries = {}
+            for columns in self._iter_pages_from(
+                    key, self.DEFAULT_CHUNK_SIZE, result_format=self.COLUMNAR, with_member_data=True):
+                entries.update(zip(columns.members, zip(columns.scores, columns.member_data)))
+
+            if combined is None:
+                combined = entries
+            elif intersect:
+                combined = dict(
+                    (member, (combine(score, entries[member][0]), member_data or entries[member][1]))
+                    for member, (score, member_data) in combined.items() if member in entries)
+            else:
+                for member, (score, member_data) in entries.items():
+                    if member in combined:
+                        current_score, current_member_data = combined[member]
+                        score = combine(current_score, score)
+                        member_data = current_member_data or member_data
+                    combined[member] = (score, member_data)
+
+        self._settle_pending_in(destination, drop=True)
+        pipeline = self.redis_connection.pipeline()
+        for key in self._stored_keys_for(destination):
+            pipeline.delete(key)
+        for chunk in chunked_members(
+                ((member, score, member_data) for member, (score, member_data) in combined.items()),
+                self.DEFAULT_CHUNK_SIZE):
+            self._rank_chunk_in(pipeline, destination, chunk)
+        pipeline.execute()
+
+    def _script(self, source):
+        '''
+        Script object for the given Lua source, registered against the redis
+        connection the first time it is needed.
+
+        @param source [String] Lua source from +leaderboard.scripts+.
+        @return a callable script.
+        '''
+        script = self._scripts.get(source)
+        if script is None:
+            script = self.redis_connection.register_script(source)
+            self._scripts[source] = script
+
+        return script
+
+    def _iter_pages_from(self, leaderboard_name, chunk_size, **options):
+        '''
+        Iterate over all leaders of the named leaderboard, one window of +chunk_size+
+        ranks at a time.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return a generator of pages of leaders.
+        '''
+        offset = 0
+        while True:
+            leaders = self._members_from_page_in(
+                leaderboard_name, 'rank', offset, offset + chunk_size - 1, **options)
+            if len(leaders):
+                yield leaders
+
+            if len(leaders) < chunk_size:
+                return
+            offset += chunk_size
+
+    def _members_from_page_in(
+            self, leaderboard_name, mode, first, second, members_only=False, **options):
+        '''
+        Retrieve a contiguous page of members from the named leaderboard in a single
+        round trip. Scores and member data are fetched alongside the members and ranks
+        are derived from the offset of the page rather than looked up per member.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] One of 'rank', 'score' or 'member'.
+        @param first Starting offset, minimum score or member name depending on +mode+.
+        @param second Ending offset, maximum score or page size depending on +mode+.
+        @param members_only [bool] Set True to return the members as is, Default is False.
+        @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
+        @return a list of members.
+        '''
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
+
+        keys = [leaderboard_name, self._member_data_key(leaderboard_name)]
+        rank_key = self._slice_rank_key(leaderboard_name)
+        if rank_key is not None:
+            keys.append(rank_key)
+
+        response = self._script(scripts.PAGE)(
+            keys=keys,
+            args=[self.order, int(with_member_data), mode, first, second],
+            client=self._reader())
+        if not response:
+            return self._parse_raw_members(
+                leaderboard_name, [], members_only, starting_offset=0, **options)
+
+        raw_leader_data = response[2]
+        return self._parse_raw_members(
+            leaderboard_name,
+            list(zip(raw_leader_data[0::2], raw_leader_data[1::2])),
+            members_only,
+            starting_offset=response[0],
+            members_ahead=response[1],
+            member_data=response[3] if with_member_data else None,
+            **options)
+
+    def _slice_rank_key(self, leaderboard_name):
+        '''
+        Key of the sorted set used to count the members ranked ahead of a page, or
+        +None+ if ranks follow directly from the offset of the page.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a key or +None+.
+        '''
+        return None
+
+    def _ranks_for_slice(self, offset, ahead, scores):
+        '''
+        Ranks for a contiguous slice of the leaderboard.
+
+        @param offset [int] Zero-based position of the first member of the slice.
+        @param ahead [int] Members ranked ahead of the first member, as counted in +_slice_rank_key+.
+        @param scores [Array] Scores of the members in the slice, in leaderboard order.
+        @return a list of ranks.
+        '''
+        return [offset + index + 1 for index in range(len(scores))]
+
+    def _sort_members(self, ranks_for_members, sort_by):
+        '''
+        Sort ranked members by rank or score. Missing members sort last.
+
+        @param ranks_for_members [Array] Ranked members.
+        @param sort_by [String] Either +RANK_KEY+ or +SCORE_KEY+.
+        @return the sorted members.
+        '''
+        sort_value_if_none = float('-inf') if self.order == self.ASC else float('+inf')
+        if self.RANK_KEY == sort_by:
+            ranks_for_members = sorted(
+                ranks_for_members,
+                key=lambda member: member.get(self.RANK_KEY) if member.get(self.RANK_KEY) is not None else sort_value_if_none
+            )
+        elif self.SCORE_KEY == sort_by:
+            ranks_for_members = sorted(
+                ranks_for_members,
+                key=lambda member: member.get(self.SCORE_KEY) if member.get(self.SCORE_KEY) is not None else sort_value_if_none
+            )
+
+        return ranks_for_members
+
     def _parse_raw_members(
-            self, leaderboard_name, members, members_only=False, **options):
+            self, leaderboard_name, members, members_only=False, starting_offset=None,
+            members_ahead=0, member_data=None, **options):
         '''
         Parse the raw leaders data as returned from a given leader board query. Do associative
         lookups with the member to rank, score and potentially sort the results.
 
+        If +starting_offset+ is given, +members+ must be a contiguous slice of the leaderboard
+        as returned from a range query with scores. Ranks are then derived from the offset of
+        the slice instead of being looked up for each member.
+
         @param leaderboard_name [String] Name of the leaderboard.
         @param members [List] A list of members as returned from a sorted set range query
         @param members_only [bool] Set True to return the members as is, Default is False.
+        @param starting_offset [int] Zero-based position of the first member of a contiguous slice.
+        @param members_ahead [int] Members ranked ahead of the slice, as counted in +_slice_rank_key+.
+        @param member_data [List] Member data for the slice if it has already been fetched.
         @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
-        @return a list of members.
+          The +result_format+ option overrides the result format of the leaderboard for a slice.
+        @return a list of members, or +LeaderColumns+ for the +columnar+ result format.
         '''
+        if starting_offset is None:
+            if members_only:
+                return [{self.MEMBER_KEY: m} for m in members]
+
+            if members:
+                return self.ranked_in_list_in(leaderboard_name, members, **options)
+            else:
+                return []
+
+        result_format = options.get('result_format', self.result_format)
+        if result_format != self.DICT:
+            return self._formatted_slice(
+                leaderboard_name, members, members_only, starting_offset,
+                members_ahead, member_data, **options)
+
         if members_only:
-            return [{self.MEMBER_KEY: m} for m in members]
+            return [{self.MEMBER_KEY: m} for m, score in members]
 
-        if members:
-            return self.ranked_in_list_in(leaderboard_name, members, **options)
-        else:
+        if not members:
             return []
+
+        scores = [float(score) for member, score in members]
+        ranks = self._ranks_for_slice(starting_offset, members_ahead, scores)
+
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
+        if with_member_data and member_data is None:
+            member_data = self.members_data_for_in(
+                leaderboard_name, [member for member, score in members])
+
+        ranks_for_members = []
+        for index, (member, score) in enumerate(members):
+            data = {}
+            data[self.MEMBER_KEY] = member
+            data[self.RANK_KEY] = ranks[index]
+            data[self.SCORE_KEY] = scores[index]
+            if with_member_data:
+                data[self.MEMBER_DATA_KEY] = member_data[index]
+
+            ranks_for_members.append(data)
+
+        if 'sort_by' in options:
+            ranks_for_members = self._sort_members(
+                ranks_for_members, options['sort_by'])
+
+        return ranks_for_members
+
+    def _formatted_slice(
+            self, leaderboard_name, members, members_only, starting_offset,
+            members_ahead, member_data, **options):
+        '''
+        Build a contiguous slice of the leaderboard in a result format other than +dict+,
+        from parallel lists rather than a dictionary per member. Takes the same arguments
+        as the contiguous slice form of +_parse_raw_members+.
+
+        @return the slice in the +record+, +tuple+ or +columnar+ result format.
+        '''
+        result_format = options.get('result_format', self.result_format)
+        if not result_format in result_formats.RESULT_FORMATS:
+            raise ValueError(
+                "%s is not one of [%s]" % (result_format, ",".join(result_formats.RESULT_FORMATS)))
+
+        names = [member for member, score in members]
+        if members_only:
+            return result_formats.format_members(result_format, names)
+
+        scores = [float(score) for member, score in members]
+        ranks = self._ranks_for_slice(starting_offset, members_ahead, scores)
+
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
+        if with_member_data and member_data is None:
+            member_data = self.members_data_for_in(leaderboard_name, names) if names else []
+        if not with_member_data:
+            member_data = None
+
+        sort_by = options.get('sort_by')
+        if sort_by in [self.RANK_KEY, self.SCORE_KEY]:
+            column = ranks if sort_by == self.RANK_KEY else scores
+            order = sorted(range(len(names)), key=column.__getitem__)
+            names = [names[index] for index in order]
+            ranks = [ranks[index] for index in order]
+            scores = [scores[index] for index in order]
+            if member_data is not None:
+                member_data = [member_data[index] for index in order]
+
+        return result_formats.format_leaders(result_format, names, ranks, scores, member_data)
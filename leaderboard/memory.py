@@ -0,0 +1,934 @@
+'''
+In-process backend for leaderboards. +MemoryConnection+ is a redis-py connection
+class that runs commands against data held in the current process instead of sending
+them to a Redis server, so a +Leaderboard+ and all of its variants run unchanged, with
+pipelines, transactions and scripts, and without any network round trip.
+
+Sorted sets are kept in +SortedBlocks+, an order statistic structure giving ranks,
+positions and score ranges in O(log n). The server-side scripts of +leaderboard.scripts+
+run as their Python equivalents from +leaderboard.memory_scripts+; other scripts are
+rejected.
+
+Data lives in a database per (host, port, db), shared by every connection of the
+process, and is lost when the process exits.
+'''
+
+from redis.connection import Connection
+from redis.exceptions import ResponseError
+try:
+    from redis.connection import BaseParser
+except ImportError:
+    # redis-py 5 moved the parsers out of redis.connection
+    from redis._parsers import BaseParser
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from fnmatch import fnmatchcase
+from hashlib import sha1
+from itertools import chain
+import math
+import threading
+import time
+
+REDIS_VERSION = '7.2.0'
+
+
+class _Top(object):
+    '''
+    Member name sorting after every other member name, used to bound score ranges.
+    '''
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+class SortedBlocks(object):
+    '''
+    Sorted list of values kept as a list of sorted blocks of up to twice +load+ values,
+    with the largest value of each block for locating values and a Fenwick tree over the
+    block lengths for locating positions. Adding, removing and locating a value or a
+    position take O(log n) plus the cost of shifting values within a single block.
+    '''
+
+    def __init__(self, values=(), load=256):
+        '''
+        Create a sorted list.
+
+        @param values Values to start with, in any order.
+        @param load [int] Number of values per block.
+        '''
+        self._load = load
+        self._rebuild(sorted(values))
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('index out of range')
+
+        block, offset = self._locate(index)
+        return self._blocks[block][offset]
+
+    def add(self, value):
+        '''
+        Add a value.
+        '''
+        if not self._blocks:
+            self._rebuild([value])
+            return
+
+        block = bisect_right(self._maxes, value)
+        if block == len(self._blocks):
+            block -= 1
+            self._blocks[block].append(value)
+            self._maxes[block] = value
+        else:
+            insort(self._blocks[block], value)
+        self._len += 1
+
+        if len(self._blocks[block]) > 2 * self._load:
+            values = self._blocks[block]
+            self._blocks[block:block + 1] = [values[:self._load], values[self._load:]]
+            self._maxes[block:block + 1] = [values[self._load - 1], values[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(block, 1)
+
+    def remove(self, value):
+        '''
+        Remove a value, which must be in the list.
+        '''
+        block = bisect_left(self._maxes, value)
+        values = self._blocks[block]
+        del values[bisect_left(values, value)]
+        self._len -= 1
+
+        if not values:
+            del self._blocks[block]
+            del self._maxes[block]
+            self._build_tree()
+        else:
+            self._maxes[block] = values[-1]
+            self._tree_add(block, -1)
+
+    def bisect_left(self, value):
+        '''
+        Position at which +value+ would be inserted before any equal value.
+        '''
+        block = bisect_left(self._maxes, value)
+        if block == len(self._blocks):
+            return self._len
+        return self._prefix(block) + bisect_left(self._blocks[block], value)
+
+    def bisect_right(self, value):
+        '''
+        Position at which +value+ would be inserted after any equal value.
+        '''
+        block = bisect_right(self._maxes, value)
+        if block == len(self._blocks):
+            return self._len
+        return self._prefix(block) + bisect_right(self._blocks[block], value)
+
+    def slice(self, start, stop):
+        '''
+        Values from position +start+ up to, but not including, position +stop+.
+        '''
+        start = max(start, 0)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+
+        block, offset = self._locate(start)
+        values = []
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._blocks[block][offset:offset + remaining]
+            values.extend(chunk)
+            remaining -= len(chunk)
+            block += 1
+            offset = 0
+
+        return values
+
+    def delete_slice(self, start, stop):
+        '''
+        Remove the values from position +start+ up to, but not including, position +stop+.
+
+        @return the removed values.
+        '''
+        removed = self.slice(start, stop)
+        if len(removed) > self._len // 8:
+            self._rebuild(self.slice(0, start) + self.slice(stop, self._len))
+        else:
+            for value in removed:
+                self.remove(value)
+
+        return removed
+
+    def _rebuild(self, values):
+        self._blocks = [values[index:index + self._load] for index in range(0, len(values), self._load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(values)
+        self._build_tree()
+
+    def _build_tree(self):
+        tree = [0] + [len(block) for block in self._blocks]
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _tree_add(self, block, delta):
+        index = block + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def _prefix(self, block):
+        '''
+        Number of values in the blocks before +block+.
+        '''
+        total = 0
+        while block > 0:
+            total += self._tree[block]
+            block -= block & -block
+        return total
+
+    def _locate(self, index):
+        '''
+        Block and offset within the block of the value at position +index+.
+        '''
+        block = 0
+        bit = 1 << (len(self._tree).bit_length() - 1)
+        while bit:
+            following = block + bit
+            if following < len(self._tree) and self._tree[following] <= index:
+                block = following
+                index -= self._tree[following]
+            bit >>= 1
+
+        return block, index
+
+
+class SortedSet(object):
+    '''
+    Members and scores of a sorted set, ordered by score then member name.
+    '''
+
+    def __init__(self):
+        self.scores = {}
+        self.order = SortedBlocks()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def add(self, member, score):
+        previous = self.scores.get(member)
+        if previous == score:
+            return
+        if previous is not None:
+            self.order.remove((previous, member))
+        self.scores[member] = score
+        self.order.add((score, member))
+
+    def remove(self, member):
+        score = self.scores.pop(member, None)
+        if score is None:
+            return False
+        self.order.remove((score, member))
+        return True
+
+    def rank(self, member):
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return self.order.bisect_left((score, member))
+
+    def lower_position(self, score, exclusive):
+        '''
+        Position of the first member with a score above (or at, unless +exclusive+) +score+.
+        '''
+        if exclusive:
+            return self.order.bisect_right((score, _TOP))
+        return self.order.bisect_left((score, b''))
+
+    def upper_position(self, score, exclusive):
+        '''
+        Position after the last member with a score below (or at, unless +exclusive+) +score+.
+        '''
+        if exclusive:
+            return self.order.bisect_left((score, b''))
+        return self.order.bisect_right((score, _TOP))
+
+
+class CommandError(Exception):
+    '''
+    Error reply to a command, raised while running it.
+    '''
+
+
+def format_number(value):
+    '''
+    Reply for a score or float, formatted as Redis does.
+    '''
+    if math.isinf(value):
+        return b'inf' if value > 0 else b'-inf'
+    if value == int(value) and abs(value) < 1e17:
+        return ('%d' % value).encode()
+    return repr(value).encode()
+
+
+def _parse_float(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise CommandError('ERR value is not a valid float')
+    if math.isnan(number):
+        raise CommandError('ERR value is not a valid float')
+    return number
+
+
+def _parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CommandError('ERR value is not an integer or out of range')
+
+
+def _parse_bound(value):
+    '''
+    Score and exclusiveness of a score range bound such as '(1.5' or '-inf'.
+    '''
+    if value[:1] == b'(':
+        return _parse_float(value[1:]), True
+    return _parse_float(value), False
+
+
+def _index_range(start, stop, length):
+    '''
+    Positions from +start+ up to, but not including, the returned stop for Redis style
+    inclusive indexes, which may count from the end when negative.
+    '''
+    if start < 0:
+        start = max(start + length, 0)
+    if stop < 0:
+        stop += length
+    stop = min(stop, length - 1)
+    if start > stop:
+        return 0, 0
+    return start, stop + 1
+
+
+class MemoryDatabase(object):
+    '''
+    Keys of a single in-process database, with their expiry times, and the commands
+    running against them. Commands and scripts hold the database lock while they run,
+    so each of them is atomic.
+    '''
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._data = {}
+        self._expires = {}
+        self._scripts = set()
+
+    def execute(self, args):
+        '''
+        Run a command.
+
+        @param args [Array] Command name and arguments, as bytes.
+        @return the raw reply of the command.
+        '''
+        command = getattr(self, '_command_' + args[0].decode().lower(), None)
+        if command is None:
+            raise CommandError("ERR unknown command '%s'" % args[0].decode())
+
+        with self.lock:
+            return command(*args[1:])
+
+    def call(self, *args):
+        '''
+        Run a command from a script, as +redis.call+ does.
+        '''
+        return self.execute([_encode_argument(arg) for arg in args])
+
+    def flush(self):
+        with self.lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def _get(self, key, kind=None):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._delete(key)
+        value = self._data.get(key)
+        if kind is not None and value is not None and not isinstance(value, kind):
+            raise CommandError('WRONGTYPE Operation against a key holding the wrong kind of value')
+        return value
+
+    def _sorted_set(self, key, create=False):
+        value = self._get(key, SortedSet)
+        if value is None and create:
+            value = self._data[key] = SortedSet()
+        return value
+
+    def _hash(self, key, create=False):
+        value = self._get(key, dict)
+        if value is None and create:
+            value = self._data[key] = {}
+        return value
+
+    def _delete(self, key):
+        self._expires.pop(key, None)
+        return self._data.pop(key, None) is not None
+
+    def _drop_if_empty(self, key):
+        value = self._data.get(key)
+        if value is not None and not isinstance(value, bytes) and not len(value):
+            self._delete(key)
+
+    def _expire_at(self, key, timestamp):
+        if self._get(key) is None:
+            return 0
+        if timestamp <= time.time():
+            self._delete(key)
+        else:
+            self._expires[key] = timestamp
+        return 1
+
+    # Server and keys
+
+    def _command_ping(self, *args):
+        return b'PONG'
+
+    def _command_info(self, *args):
+        return ('# Server\r\nredis_version:%s\r\nredis_mode:standalone\r\n' % REDIS_VERSION).encode()
+
+    def _command_flushdb(self, *args):
+        self._data.clear()
+        self._expires.clear()
+        return b'OK'
+
+    def _command_dbsize(self):
+        return len([key for key in list(self._data) if self._get(key) is not None])
+
+    def _command_keys(self, pattern):
+        return [key for key in list(self._data) if self._get(key) is not None and fnmatchcase(key, pattern)]
+
+    def _command_type(self, key):
+        value = self._get(key)
+        if value is None:
+            return b'none'
+        if isinstance(value, bytes):
+            return b'string'
+        return b'hash' if isinstance(value, dict) else b'zset'
+
+    def _command_exists(self, *keys):
+        return sum(1 for key in keys if self._get(key) is not None)
+
+    def _command_del(self, *keys):
+        return sum(1 for key in keys if self._get(key) is not None and self._delete(key))
+
+    def _command_expire(self, key, seconds):
+        return self._expire_at(key, time.time() + _parse_int(seconds))
+
+    def _command_pexpire(self, key, milliseconds):
+        return self._expire_at(key, time.time() + _parse_int(milliseconds) / 1000.0)
+
+    def _command_expireat(self, key, timestamp):
+        return self._expire_at(key, _parse_int(timestamp))
+
+    def _command_persist(self, key):
+        if self._get(key) is None:
+            return 0
+        return 1 if self._expires.pop(key, None) is not None else 0
+
+    def _command_ttl(self, key):
+        milliseconds = self._command_pttl(key)
+        return milliseconds if milliseconds < 0 else int(round(milliseconds / 1000.0))
+
+    def _command_pttl(self, key):
+        if self._get(key) is None:
+            return -2
+        expires_at = self._expires.get(key)
+        if expires_at is None:
+            return -1
+        return int(round((expires_at - time.time()) * 1000))
+
+    # Strings
+
+    def _command_get(self, key):
+        return self._get(key, bytes)
+
+    def _command_set(self, key, value, *options):
+        expires_at = None
+        condition = None
+        options = [option.upper() for option in options]
+        index = 0
+        while index < len(options):
+            if options[index] in (b'EX', b'PX') and index + 1 < len(options):
+                amount = _parse_int(options[index + 1])
+                expires_at = time.time() + (amount if options[index] == b'EX' else amount / 1000.0)
+                index += 2
+            elif options[index] in (b'NX', b'XX'):
+                condition = options[index]
+                index += 1
+            else:
+                raise CommandError('ERR syntax error')
+
+        exists = self._get(key) is not None
+        if (condition == b'NX' and exists) or (condition == b'XX' and not exists):
+            return None
+
+        self._delete(key)
+        self._data[key] = value
+        if expires_at is not None:
+            self._expires[key] = expires_at
+        return b'OK'
+
+    def _command_incrby(self, key, increment):
+        value = self._get(key, bytes)
+        try:
+            number = int(value or 0) + _parse_int(increment)
+        except ValueError:
+            raise CommandError('ERR value is not an integer or out of range')
+        self._data[key] = str(number).encode()
+        return number
+
+    def _command_incr(self, key):
+        return self._command_incrby(key, b'1')
+
+    def _command_decrby(self, key, decrement):
+        return self._command_incrby(key, str(-_parse_int(decrement)).encode())
+
+    def _command_decr(self, key):
+        return self._command_incrby(key, b'-1')
+
+    def _command_incrbyfloat(self, key, increment):
+        number = _parse_float(self._get(key, bytes) or 0) + _parse_float(increment)
+        self._data[key] = format_number(number)
+        return self._data[key]
+
+    # Hashes
+
+    def _command_hget(self, key, field):
+        return (self._hash(key) or {}).get(field)
+
+    def _command_hmget(self, key, *fields):
+        values = self._hash(key) or {}
+        return [values.get(field) for field in fields]
+
+    def _command_hgetall(self, key):
+        return list(chain.from_iterable((self._hash(key) or {}).items()))
+
+    def _command_hkeys(self, key):
+        return list(self._hash(key) or {})
+
+    def _command_hvals(self, key):
+        return list((self._hash(key) or {}).values())
+
+    def _command_hlen(self, key):
+        return len(self._hash(key) or {})
+
+    def _command_hexists(self, key, field):
+        return 1 if field in (self._hash(key) or {}) else 0
+
+    def _command_hset(self, key, *fields_and_values):
+        if not fields_and_values or len(fields_and_values) % 2:
+            raise CommandError("ERR wrong number of arguments for 'hset' command")
+
+        values = self._hash(key, create=True)
+        added = 0
+        for index in range(0, len(fields_and_values), 2):
+            if fields_and_values[index] not in values:
+                added += 1
+            values[fields_and_values[index]] = fields_and_values[index + 1]
+        return added
+
+    def _command_hmset(self, key, *fields_and_values):
+        self._command_hset(key, *fields_and_values)
+        return b'OK'
+
+    def _command_hdel(self, key, *fields):
+        values = self._hash(key) or {}
+        removed = sum(1 for field in fields if values.pop(field, None) is not None)
+        self._drop_if_empty(key)
+        return removed
+
+    def _command_hincrby(self, key, field, increment):
+        values = self._hash(key, create=True)
+        try:
+            number = int(values.get(field, 0)) + _parse_int(increment)
+        except ValueError:
+            raise CommandError('ERR hash value is not an integer')
+        values[field] = str(number).encode()
+        return number
+
+    def _command_hincrbyfloat(self, key, field, increment):
+        values = self._hash(key, create=True)
+        values[field] = format_number(_parse_float(values.get(field, 0)) + _parse_float(increment))
+        return values[field]
+
+    # Sorted sets
+
+    def _command_zadd(self, key, *args):
+        flags = set()
+        index = 0
+        while index < len(args) and args[index].upper() in (b'NX', b'XX', b'GT', b'LT', b'CH', b'INCR'):
+            flags.add(args[index].upper())
+            index += 1
+        pairs = args[index:]
+        if not pairs or len(pairs) % 2:
+            raise CommandError('ERR syntax error')
+        if b'NX' in flags and b'XX' in flags:
+            raise CommandError('ERR XX and NX options at the same time are not compatible')
+        if (b'GT' in flags or b'LT' in flags) and (b'NX' in flags or (b'GT' in flags and b'LT' in flags)):
+            raise CommandError('ERR GT, LT, and/or NX options at the same time are not compatible')
+        if b'INCR' in flags and len(pairs) != 2:
+            raise CommandError('ERR INCR option supports a single increment-element pair')
+
+        scores = [_parse_float(pairs[index]) for index in range(0, len(pairs), 2)]
+        values = self._sorted_set(key, create=True)
+        added = changed = 0
+        score = None
+        for index, score in enumerate(scores):
+            member = pairs[index * 2 + 1]
+            previous = values.scores.get(member)
+            if (b'NX' in flags and previous is not None) or (b'XX' in flags and previous is None):
+                score = None
+                continue
+            if b'INCR' in flags and previous is not None:
+                score += previous
+            if previous is not None and ((b'GT' in flags and not score > previous) or
+                                         (b'LT' in flags and not score < previous)):
+                score = None
+                continue
+
+            if previous is None:
+                added += 1
+            elif previous != score:
+                changed += 1
+            values.add(member, score)
+
+        self._drop_if_empty(key)
+        if b'INCR' in flags:
+            return None if score is None else format_number(score)
+        return added + changed if b'CH' in flags else added
+
+    def _command_zincrby(self, key, increment, member):
+        values = self._sorted_set(key, create=True)
+        score = values.scores.get(member, 0.0) + _parse_float(increment)
+        if math.isnan(score):
+            raise CommandError('ERR resulting score is not a number (NaN)')
+        values.add(member, score)
+        return format_number(score)
+
+    def _command_zrem(self, key, *members):
+        values = self._sorted_set(key)
+        if values is None:
+            return 0
+        removed = sum(1 for member in members if values.remove(member))
+        self._drop_if_empty(key)
+        return removed
+
+    def _command_zscore(self, key, member):
+        score = (self._sorted_set(key) or SortedSet()).scores.get(member)
+        return None if score is None else format_number(score)
+
+    def _command_zmscore(self, key, *members):
+        return [self._command_zscore(key, member) for member in members]
+
+    def _command_zcard(self, key):
+        return len(self._sorted_set(key) or ())
+
+    def _command_zrank(self, key, member):
+        return (self._sorted_set(key) or SortedSet()).rank(member)
+
+    def _command_zrevrank(self, key, member):
+        values = self._sorted_set(key) or SortedSet()
+        rank = values.rank(member)
+        return None if rank is None else len(values) - 1 - rank
+
+    def _command_zcount(self, key, minimum, maximum):
+        start, stop = self._score_positions(key, minimum, maximum)
+        return max(stop - start, 0)
+
+    def _command_zrange(self, key, start, stop, *options):
+        return self._range(key, start, stop, options, False)
+
+    def _command_zrevrange(self, key, start, stop, *options):
+        return self._range(key, start, stop, options, True)
+
+    def _command_zrangebyscore(self, key, minimum, maximum, *options):
+        return self._range_by_score(key, minimum, maximum, options, False)
+
+    def _command_zrevrangebyscore(self, key, maximum, minimum, *options):
+        return self._range_by_score(key, minimum, maximum, options, True)
+
+    def _command_zremrangebyrank(self, key, start, stop):
+        values = self._sorted_set(key)
+        if values is None:
+            return 0
+        start, stop = _index_range(_parse_int(start), _parse_int(stop), len(values))
+        return self._remove_positions(key, values, start, stop)
+
+    def _command_zremrangebyscore(self, key, minimum, maximum):
+        values = self._sorted_set(key)
+        if values is None:
+            return 0
+        start, stop = self._score_positions(key, minimum, maximum)
+        return self._remove_positions(key, values, start, stop)
+
+    def _command_zunionstore(self, destination, count, *args):
+        return self._store_combined(destination, count, args, False)
+
+    def _command_zinterstore(self, destination, count, *args):
+        return self._store_combined(destination, count, args, True)
+
+    def _score_positions(self, key, minimum, maximum):
+        values = self._sorted_set(key) or SortedSet()
+        minimum, minimum_exclusive = _parse_bound(minimum)
+        maximum, maximum_exclusive = _parse_bound(maximum)
+        return (values.lower_position(minimum, minimum_exclusive),
+                values.upper_position(maximum, maximum_exclusive))
+
+    def _range(self, key, start, stop, options, reverse):
+        values = self._sorted_set(key) or SortedSet()
+        start, stop = _index_range(_parse_int(start), _parse_int(stop), len(values))
+        if reverse:
+            start, stop = len(values) - stop, len(values) - start
+        entries = values.order.slice(start, stop)
+        if reverse:
+            entries.reverse()
+        return self._entries_reply(entries, options)
+
+    def _range_by_score(self, key, minimum, maximum, options, reverse):
+        start, stop = self._score_positions(key, minimum, maximum)
+        entries = (self._sorted_set(key) or SortedSet()).order.slice(start, stop)
+        if reverse:
+            entries.reverse()
+
+        options = [option.upper() for option in options]
+        if b'LIMIT' in options:
+            index = options.index(b'LIMIT')
+            offset, count = _parse_int(options[index + 1]), _parse_int(options[index + 2])
+            entries = entries[offset:] if count < 0 else entries[offset:offset + count]
+        return self._entries_reply(entries, options)
+
+    def _entries_reply(self, entries, options):
+        if b'WITHSCORES' in [option.upper() for option in options]:
+            return list(chain.from_iterable((member, format_number(score)) for score, member in entries))
+        return [member for score, member in entries]
+
+    def _remove_positions(self, key, values, start, stop):
+        removed = values.order.delete_slice(start, stop)
+        for score, member in removed:
+            del values.scores[member]
+        self._drop_if_empty(key)
+        return len(removed)
+
+    def _store_combined(self, destination, count, args, intersect):
+        count = _parse_int(count)
+        keys = args[:count]
+        weights = [1.0] * count
+        aggregate = b'SUM'
+        options = list(args[count:])
+        while options:
+            option = options.pop(0).upper()
+            if option == b'WEIGHTS':
+                weights = [_parse_float(options.pop(0)) for index in range(count)]
+            elif option == b'AGGREGATE':
+                aggregate = options.pop(0).upper()
+            else:
+                raise CommandError('ERR syntax error')
+
+        combined = None
+        for key, weight in zip(keys, weights):
+            scores = dict(
+                (member, score * weight)
+                for member, score in (self._sorted_set(key) or SortedSet()).scores.items())
+            if combined is None:
+                combined = scores
+                continue
+            if intersect:
+                combined = dict((member, score) for member, score in combined.items() if member in scores)
+            for member, score in scores.items():
+                if member not in combined:
+                    if not intersect:
+                        combined[member] = score
+                elif aggregate == b'MIN':
+                    combined[member] = min(combined[member], score)
+                elif aggregate == b'MAX':
+                    combined[member] = max(combined[member], score)
+                else:
+                    combined[member] += score
+
+        self._delete(destination)
+        if combined:
+            values = self._data[destination] = SortedSet()
+            values.order = SortedBlocks((score, member) for member, score in combined.items())
+            values.scores = combined
+        return len(combined or ())
+
+    # Scripts
+
+    def _command_script(self, subcommand, *args):
+        from .memory_scripts import SCRIPTS_BY_SHA
+
+        subcommand = subcommand.upper()
+        if subcommand == b'LOAD':
+            sha = sha1(args[0]).hexdigest().encode()
+            if sha not in SCRIPTS_BY_SHA:
+                raise CommandError('ERR Error compiling script: the in-memory backend only runs the leaderboard scripts')
+            self._scripts.add(sha)
+            return sha
+        if subcommand == b'EXISTS':
+            return [1 if sha.lower() in self._scripts else 0 for sha in args]
+        if subcommand == b'FLUSH':
+            self._scripts.clear()
+            return b'OK'
+        raise CommandError('ERR unknown subcommand for SCRIPT')
+
+    def _command_eval(self, script, count, *args):
+        return self._command_evalsha(self._command_script(b'LOAD', script), count, *args)
+
+    def _command_evalsha(self, sha, count, *args):
+        from .memory_scripts import SCRIPTS_BY_SHA
+
+        sha = sha.lower()
+        if sha not in self._scripts:
+            raise CommandError('NOSCRIPT No matching script. Please use EVAL.')
+        count = _parse_int(count)
+        return SCRIPTS_BY_SHA[sha](self.call, list(args[:count]), list(args[count:]))
+
+
+def _encode_argument(value):
+    '''
+    Argument of a command called from a script, converted as Lua converts numbers.
+    '''
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, float):
+        return ('%.14g' % value).encode()
+    return str(value).encode()
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def database(host='localhost', port=6379, db=0):
+    '''
+    In-process database for a host, port and database number, created on first use.
+
+    @return a +MemoryDatabase+.
+    '''
+    key = (host, int(port), int(db))
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = MemoryDatabase()
+        return _databases[key]
+
+
+class MemoryConnection(Connection):
+    '''
+    redis-py connection running commands against an in-process +MemoryDatabase+ chosen
+    by the host, port and db of the connection. Replies go through the same parsing as
+    replies from a server, including +decode_responses+.
+    '''
+
+    description_format = 'MemoryConnection<host=%(host)s,port=%(port)s,db=%(db)s>'
+
+    def __init__(self, *args, **kwargs):
+        super(MemoryConnection, self).__init__(*args, **kwargs)
+        self._database = None
+        self._replies = deque()
+        self._transaction = None
+        self._error_parser = BaseParser()
+
+    def connect(self):
+        if self._database is None:
+            self._database = database(self.host, self.port, self.db or 0)
+
+    def disconnect(self):
+        self._database = None
+        self._replies.clear()
+        self._transaction = None
+
+    def pack_command(self, *args):
+        # commands such as 'SCRIPT LOAD' are given as a single argument
+        return [tuple(self.encoder.encode(args[0]).split()) +
+                tuple(self.encoder.encode(arg) for arg in args[1:])]
+
+    def pack_commands(self, commands):
+        return list(chain.from_iterable(self.pack_command(*args) for args in commands))
+
+    def send_packed_command(self, command, *args, **kwargs):
+        self.connect()
+        for args in command:
+            self._replies.append(self._execute(args))
+
+    def can_read(self, timeout=0):
+        return bool(self._replies)
+
+    def read_response(self, *args, **kwargs):
+        response = self._replies.popleft()
+        if isinstance(response, ResponseError):
+            raise response
+        return self._decode(response)
+
+    def _execute(self, args):
+        name = args[0].upper()
+        if name == b'MULTI':
+            if self._transaction is not None:
+                return self._error('ERR MULTI calls can not be nested')
+            self._transaction = []
+            return b'OK'
+        if name == b'EXEC':
+            if self._transaction is None:
+                return self._error('ERR EXEC without MULTI')
+            commands, self._transaction = self._transaction, None
+            with self._database.lock:
+                return [self._run(command) for command in commands]
+        if name == b'DISCARD':
+            self._transaction = None
+            return b'OK'
+        if name in (b'WATCH', b'UNWATCH'):
+            return b'OK'
+        if name == b'SELECT':
+            self._database = database(self.host, self.port, int(args[1]))
+            return b'OK'
+        if self._transaction is not None:
+            self._transaction.append(args)
+            return b'QUEUED'
+
+        return self._run(args)
+
+    def _run(self, args):
+        try:
+            return self._database.execute(args)
+        except CommandError as error:
+            return self._error(str(error))
+
+    def _error(self, message):
+        return self._error_parser.parse_error(message)
+
+    def _decode(self, response):
+        if isinstance(response, list):
+            return [self._decode(item) for item in response]
+        if isinstance(response, bytes):
+            return self.encoder.decode(response)
+        return response
+
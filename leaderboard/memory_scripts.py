@@ -0,0 +1,335 @@
+'''
+Python equivalents of the Lua scripts in +leaderboard.scripts+, run by the in-process
+backend of +leaderboard.memory+ in place of the scripts. Each takes a +call+ function
+running a command as +redis.call+ does, the keys and the arguments of the script, all
+as bytes, and returns what the script returns, with Lua's false and nil as +None+.
+'''
+
+from . import scripts
+from hashlib import sha1
+
+
+def _number(value):
+    if value in (b'inf', b'+inf'):
+        return float('inf')
+    if value == b'-inf':
+        return float('-inf')
+    return float(value)
+
+
+def _g17(value):
+    return ('%.17g' % value).encode()
+
+
+def _member_data(call, key, members):
+    member_data = []
+    for start in range(0, len(members), 1000):
+        member_data.extend(call('HMGET', key, *members[start:start + 1000]))
+    return member_data
+
+
+def page(call, keys, argv):
+    leaderboard = keys[0]
+    desc = argv[0] == b'desc'
+    mode = argv[2]
+
+    def range_by_rank(start, stop):
+        return call('ZREVRANGE' if desc else 'ZRANGE', leaderboard, start, stop, 'WITHSCORES')
+
+    def rank_of(member):
+        return call('ZREVRANK' if desc else 'ZRANK', leaderboard, member)
+
+    offset = 0
+    if mode == b'member':
+        rank = rank_of(argv[3])
+        if rank is None:
+            return []
+        size = _number(argv[4])
+        offset = max(rank - size // 2, 0)
+        members = range_by_rank(offset, offset + size - 1)
+    elif mode == b'rank':
+        offset = _number(argv[3])
+        members = range_by_rank(argv[3], argv[4])
+    else:
+        if desc:
+            members = call('ZREVRANGEBYSCORE', leaderboard, argv[4], argv[3], 'WITHSCORES')
+        else:
+            members = call('ZRANGEBYSCORE', leaderboard, argv[3], argv[4], 'WITHSCORES')
+        if members:
+            offset = rank_of(members[0])
+
+    if not members:
+        return []
+
+    ahead = -1
+    if len(keys) > 2:
+        if desc:
+            ahead = call('ZCOUNT', keys[2], b'(' + members[1], '+inf')
+        else:
+            ahead = call('ZCOUNT', keys[2], '-inf', b'(' + members[1])
+
+    result = [int(offset), ahead, members]
+    if argv[1] == b'1':
+        result.append(_member_data(call, keys[1], members[0::2]))
+    return result
+
+
+def ranked_in_list(call, keys, argv):
+    desc = argv[0] == b'desc'
+    scores = []
+    ranks = []
+    ranks_by_score = {}
+
+    for member in argv[2:]:
+        score = call('ZSCORE', keys[0], member)
+        rank = None
+        if score is not None:
+            rank = ranks_by_score.get(score)
+            if rank is None:
+                if desc:
+                    rank = call('ZCOUNT', keys[1], b'(' + score, '+inf') + 1
+                else:
+                    rank = call('ZCOUNT', keys[1], '-inf', b'(' + score) + 1
+                ranks_by_score[score] = rank
+        scores.append(score)
+        ranks.append(rank)
+
+    result = [scores, ranks]
+    if argv[1] == b'1':
+        result.append(_member_data(call, keys[2], argv[2:]))
+    return result
+
+
+def _condition_holds(condition, current_score, score):
+    if condition == b'keep_highest':
+        return current_score is None or _number(score) > _number(current_score)
+    elif condition == b'keep_lowest':
+        return current_score is None or _number(score) < _number(current_score)
+    elif condition == b'only_if_new':
+        return current_score is None
+    elif condition == b'only_if_exists':
+        return current_score is not None
+    return True
+
+
+def _track(call, aggregates, previous_score, score):
+    shift = call('HGET', aggregates, 'shift')
+    if shift is None and score is not None and call('EXISTS', aggregates) == 0:
+        shift = _g17(_number(score))
+        call('HSET', aggregates, 'shift', shift)
+    shift = _number(shift) if shift is not None else 0.0
+
+    if previous_score is not None:
+        previous = _number(previous_score)
+        call('HINCRBY', aggregates, 'count', -1)
+        call('HINCRBYFLOAT', aggregates, 'sum', _g17(-previous))
+        call('HINCRBYFLOAT', aggregates, 'squares', _g17(-(previous - shift) * (previous - shift)))
+    if score is not None:
+        current = _number(score)
+        call('HINCRBY', aggregates, 'count', 1)
+        call('HINCRBYFLOAT', aggregates, 'sum', _g17(current))
+        call('HINCRBYFLOAT', aggregates, 'squares', _g17((current - shift) * (current - shift)))
+
+
+def _index_range(call, leaderboard, mode, first, second, desc):
+    if mode == b'score':
+        start = call('ZCOUNT', leaderboard, '-inf', b'(' + first)
+        return start, start + call('ZCOUNT', leaderboard, first, second) - 1
+
+    total = call('ZCARD', leaderboard)
+    start = max(int(_number(first)), 0)
+    stop = int(_number(second))
+    if stop < 0 or stop >= total:
+        stop = total - 1
+    if desc:
+        return total - 1 - stop, total - 1 - start
+    return start, stop
+
+
+def _scores_in(call, leaderboard, start, stop):
+    for offset in range(start, stop + 1, 1000):
+        members = call('ZRANGE', leaderboard, offset, min(offset + 999, stop), 'WITHSCORES')
+        for score in members[1::2]:
+            yield score
+
+
+def aggregates(call, keys, argv):
+    start, stop = _index_range(call, keys[0], argv[1], argv[2], argv[3], argv[0] == b'desc')
+    if len(argv) > 4:
+        start += int(argv[4])
+        stop = min(stop, start + int(argv[5]) - 1)
+    count, total, mean, m2 = 0, 0.0, 0.0, 0.0
+    minimum = maximum = None
+
+    for value in _scores_in(call, keys[0], start, stop):
+        score = _number(value)
+        count += 1
+        total += score
+        delta = score - mean
+        mean += delta / count
+        m2 += delta * (score - mean)
+        if minimum is None:
+            minimum = value
+        maximum = value
+
+    if len(keys) > 1:
+        call('DEL', keys[1])
+        if count > 0:
+            call('HMSET', keys[1], 'count', count, 'sum', _g17(total),
+                 'squares', _g17(m2), 'shift', _g17(mean))
+
+    if count == 0:
+        return [0]
+    return [count, _g17(total), minimum, maximum, _g17(mean), _g17(m2)]
+
+
+def remove_range(call, keys, argv):
+    start, stop = _index_range(call, keys[0], argv[1], argv[2], argv[3], argv[0] == b'desc')
+    if stop < start:
+        return 0
+
+    shift = call('HGET', keys[1], 'shift')
+    shift = _number(shift) if shift is not None else 0.0
+    total = squares = 0.0
+    for value in _scores_in(call, keys[0], start, stop):
+        score = _number(value)
+        total += score
+        squares += (score - shift) * (score - shift)
+
+    removed = call('ZREMRANGEBYRANK', keys[0], start, stop)
+    call('HINCRBY', keys[1], 'count', -removed)
+    call('HINCRBYFLOAT', keys[1], 'sum', _g17(-total))
+    call('HINCRBYFLOAT', keys[1], 'squares', _g17(-squares))
+    return removed
+
+
+def _write(call, leaderboard, member, operation, score):
+    if operation == b'change':
+        return call('ZINCRBY', leaderboard, score, member)
+    call('ZADD', leaderboard, score, member)
+    return call('ZSCORE', leaderboard, member)
+
+
+def tracked_write(call, keys, argv):
+    score = None
+
+    for index in range(0, len(argv), 4):
+        operation, member = argv[index], argv[index + 1]
+        previous_score = call('ZSCORE', keys[0], member)
+        score = None
+
+        if operation == b'remove':
+            if previous_score is not None:
+                call('ZREM', keys[0], member)
+                _track(call, keys[1], previous_score, None)
+            call('HDEL', keys[2], member)
+        elif _condition_holds(operation, previous_score, argv[index + 2]):
+            score = _write(call, keys[0], member, operation, argv[index + 2])
+            _track(call, keys[1], previous_score, score)
+            if argv[index + 3] != b'':
+                call('HSET', keys[2], member, argv[index + 3])
+
+    return score
+
+
+def rank_member_if(call, keys, argv):
+    if not _condition_holds(argv[0], call('ZSCORE', keys[0], argv[1]), argv[2]):
+        return 0
+
+    call('ZADD', keys[0], argv[2], argv[1])
+    if argv[3] != b'':
+        call('HSET', keys[1], argv[1], argv[3])
+    return 1
+
+
+def tie_write(call, keys, argv):
+    score = None
+
+    for index in range(0, len(argv), 4):
+        operation, member = argv[index], argv[index + 1]
+        previous_score = call('ZSCORE', keys[0], member)
+        written = True
+        score = None
+
+        if operation == b'remove':
+            call('ZREM', keys[0], member)
+            call('HDEL', keys[2], member)
+            if len(keys) > 3 and previous_score is not None:
+                _track(call, keys[3], previous_score, None)
+        elif _condition_holds(operation, previous_score, argv[index + 2]):
+            score = _write(call, keys[0], member, operation, argv[index + 2])
+            if len(keys) > 3:
+                _track(call, keys[3], previous_score, score)
+            if call('ZCOUNT', keys[1], score, score) == 0:
+                call('ZADD', keys[1], score, score)
+            if argv[index + 3] != b'':
+                call('HSET', keys[2], member, argv[index + 3])
+        else:
+            written = False
+
+        if written and previous_score is not None and previous_score != score:
+            if call('ZCOUNT', keys[0], previous_score, previous_score) == 0:
+                call('ZREMRANGEBYSCORE', keys[1], previous_score, previous_score)
+
+    return score
+
+
+def sliding_window_write(call, keys, argv):
+    aggregate = argv[0]
+    union_exists = call('EXISTS', keys[0]) == 1
+
+    for index in range(3, len(argv), 4):
+        operation, member = argv[index], argv[index + 1]
+
+        if operation == b'remove':
+            for slot in keys[2:]:
+                call('ZREM', slot, member)
+            call('HDEL', keys[1], member)
+        else:
+            if operation == b'change':
+                call('ZINCRBY', keys[2], argv[index + 2], member)
+            else:
+                call('ZADD', keys[2], argv[index + 2], member)
+            call('EXPIREAT', keys[2], argv[1])
+            if argv[index + 3] != b'':
+                call('HSET', keys[1], member, argv[index + 3])
+                call('EXPIREAT', keys[1], argv[1])
+
+        if union_exists:
+            combined = None
+            for slot in keys[2:]:
+                score = call('ZSCORE', slot, member)
+                if score is not None:
+                    score = _number(score)
+                    if combined is None:
+                        combined = score
+                    elif aggregate == b'max':
+                        combined = max(combined, score)
+                    elif aggregate == b'min':
+                        combined = min(combined, score)
+                    else:
+                        combined += score
+            if combined is not None:
+                call('ZADD', keys[0], _g17(combined), member)
+            else:
+                call('ZREM', keys[0], member)
+
+    if not union_exists:
+        slots = keys[2:]
+        if call('ZUNIONSTORE', keys[0], len(slots), *(slots + [b'AGGREGATE', aggregate])) > 0:
+            call('EXPIREAT', keys[0], argv[2])
+
+
+SCRIPTS = {
+    scripts.PAGE: page,
+    scripts.RANKED_IN_LIST: ranked_in_list,
+    scripts.AGGREGATES: aggregates,
+    scripts.REMOVE_RANGE: remove_range,
+    scripts.TRACKED_WRITE: tracked_write,
+    scripts.RANK_MEMBER_IF: rank_member_if,
+    scripts.TIE_WRITE: tie_write,
+    scripts.SLIDING_WINDOW_WRITE: sliding_window_write,
+}
+
+SCRIPTS_BY_SHA = dict(
+    (sha1(source.encode()).hexdigest().encode(), function) for source, function in SCRIPTS.items())
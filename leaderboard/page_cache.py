@@ -0,0 +1,128 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class PageCache(object):
+    '''
+    In-process LRU cache of pages read from leaderboards. Every write through a leaderboard
+    with a page cache moves a version counter stored next to it in redis on, and each cached page
+    remembers the version it was read at. A page is served from memory for +ttl+
+    seconds after it was read or last checked; after that the version is read again,
+    which is much cheaper than reading the page, and the page is only read again if
+    the version has moved on.
+
+    Writes made through the same process invalidate the pages of their leaderboard
+    immediately, so the +ttl+ only bounds how stale a page can be with respect to
+    writes made by other processes.
+    '''
+
+    def __init__(self, max_entries, ttl, clock=time.time):
+        '''
+        Create a page cache.
+
+        @param max_entries [int] Number of pages kept, the least recently used pages being evicted first.
+        @param ttl [float] Seconds a page is served without checking the version of its leaderboard.
+        @param clock [function] Function returning the current time in seconds.
+        '''
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, leaderboard_name, key, fetch, version):
+        '''
+        Retrieve a page of the named leaderboard, reading it on a miss.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param key Hashable description of the page within the leaderboard.
+        @param fetch [function] Function reading the page from redis.
+        @param version [function] Function reading the current version of the leaderboard from redis.
+        @return the page.
+        '''
+        cache_key = (leaderboard_name, key)
+        generation, entry = self._lookup(leaderboard_name, cache_key)
+        if entry is not None and self.clock() - entry[1] < self.ttl:
+            return entry[3]
+
+        current_version = version()
+        checked_at = self.clock()
+        if self._checked(cache_key, generation, entry, current_version, checked_at):
+            return entry[3]
+
+        page = fetch()
+        self._store(leaderboard_name, cache_key, generation, current_version, checked_at, page)
+        return page
+
+    def invalidate(self, leaderboard_name):
+        '''
+        Drop the cached pages of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        with self._lock:
+            self._generations[leaderboard_name] = self._generations.get(leaderboard_name, 0) + 1
+
+    def clear(self):
+        '''
+        Drop every cached page.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def _lookup(self, leaderboard_name, cache_key):
+        '''
+        Current generation of the named leaderboard and the entry for a page, if it was
+        cached since the last invalidation of the leaderboard.
+
+        @return a (generation, entry) tuple. The entry is +None+ on a miss.
+        '''
+        with self._lock:
+            generation = self._generations.get(leaderboard_name, 0)
+            return generation, self._usable(cache_key, generation)
+
+    def _checked(self, cache_key, generation, entry, current_version, checked_at):
+        '''
+        Whether a cached page is still current at the version just read, restarting its
+        +ttl+ if so.
+        '''
+        if entry is None or entry[0] != current_version:
+            return False
+
+        with self._lock:
+            if self._usable(cache_key, generation) is not entry:
+                return False
+            entry[1] = checked_at
+            return True
+
+    def _store(self, leaderboard_name, cache_key, generation, current_version, checked_at, page):
+        '''
+        Cache a page read at a version, unless its leaderboard was invalidated meanwhile.
+        '''
+        with self._lock:
+            if self._generations.get(leaderboard_name, 0) == generation:
+                self._entries.pop(cache_key, None)
+                self._entries[cache_key] = [current_version, checked_at, generation, page]
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def _usable(self, cache_key, generation):
+        '''
+        Entry for a page if it was cached since the last invalidation of its leaderboard,
+        marking it as the most recently used. Must be called with the lock held.
+        '''
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if entry[2] != generation:
+            del self._entries[cache_key]
+            return None
+
+        self._entries[cache_key] = self._entries.pop(cache_key)
+        return entry
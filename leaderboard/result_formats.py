@@ -0,0 +1,151 @@
+from array import array
+
+DICT = 'dict'
+RECORD = 'record'
+TUPLE = 'tuple'
+COLUMNAR = 'columnar'
+RESULT_FORMATS = [DICT, RECORD, TUPLE, COLUMNAR]
+
+
+class Leader(object):
+    '''
+    A member of a page of leaders, with its rank, score and optional member data, as
+    returned with the +record+ result format. Records are much smaller than the
+    dictionaries returned by default.
+    '''
+
+    __slots__ = ['member', 'rank', 'score', 'member_data']
+
+    def __init__(self, member, rank=None, score=None, member_data=None):
+        self.member = member
+        self.rank = rank
+        self.score = score
+        self.member_data = member_data
+
+    def __eq__(self, other):
+        return isinstance(other, Leader) and self._fields() == other._fields()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Leader(member=%r, rank=%r, score=%r, member_data=%r)' % self._fields()
+
+    def _fields(self):
+        return (self.member, self.rank, self.score, self.member_data)
+
+
+class LeaderColumns(object):
+    '''
+    A page of leaders as parallel columns, as returned with the +columnar+ result format:
+    a list of members, an array of ranks, an array of scores and, if requested, a list of
+    member data. The ranks and scores columns are +None+ for +members_only+ requests.
+
+    Iterating over the columns, or indexing them, gives (member, rank, score) tuples, with
+    the member data appended if requested.
+    '''
+
+    __slots__ = ['members', 'ranks', 'scores', 'member_data']
+
+    def __init__(self, members, ranks=None, scores=None, member_data=None):
+        self.members = members
+        self.ranks = ranks
+        self.scores = scores
+        self.member_data = member_data
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        for index in range(len(self.members)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if self.ranks is None:
+            return (self.members[index],)
+        if self.member_data is None:
+            return (self.members[index], self.ranks[index], self.scores[index])
+        return (self.members[index], self.ranks[index], self.scores[index], self.member_data[index])
+
+    def __eq__(self, other):
+        # arrays only compare equal to arrays, so columns are compared as lists
+        return isinstance(other, LeaderColumns) and all(
+            (column is None and other_column is None) or
+            (column is not None and other_column is not None and list(column) == list(other_column))
+            for column, other_column in zip(self._fields(), other._fields()))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'LeaderColumns(members=%r, ranks=%r, scores=%r, member_data=%r)' % self._fields()
+
+    def copy(self):
+        '''
+        Copy of the columns.
+        '''
+        return LeaderColumns(*[
+            None if column is None else column[:] for column in self._fields()])
+
+    def _fields(self):
+        return (self.members, self.ranks, self.scores, self.member_data)
+
+
+def format_members(result_format, members):
+    '''
+    Members of a +members_only+ page in a result format other than +dict+.
+
+    @param result_format [String] One of +record+, +tuple+ or +columnar+.
+    @param members [Array] Member names.
+    @return the page.
+    '''
+    if result_format == COLUMNAR:
+        return LeaderColumns(list(members))
+    if result_format == RECORD:
+        return [Leader(member) for member in members]
+    return [(member,) for member in members]
+
+
+def format_leaders(result_format, members, ranks, scores, member_data=None):
+    '''
+    A page of leaders given as parallel lists in a result format other than +dict+.
+
+    @param result_format [String] One of +record+, +tuple+ or +columnar+.
+    @param members [Array] Member names.
+    @param ranks [Array] Ranks of the members.
+    @param scores [Array] Scores of the members.
+    @param member_data [Array] Member data of the members, or +None+ if not requested.
+    @return the page.
+    '''
+    if result_format == COLUMNAR:
+        return LeaderColumns(
+            list(members), array('l', ranks), array('d', scores),
+            None if member_data is None else list(member_data))
+    if result_format == RECORD:
+        if member_data is None:
+            return [Leader(*row) for row in zip(members, ranks, scores)]
+        return [Leader(*row) for row in zip(members, ranks, scores, member_data)]
+    if member_data is None:
+        return list(zip(members, ranks, scores))
+    return list(zip(members, ranks, scores, member_data))
+
+
+def copy_page(page):
+    '''
+    Copy of a page of leaders in any result format, sharing no mutable row with it.
+
+    @param page A page of leaders.
+    @return the copy.
+    '''
+    if isinstance(page, LeaderColumns):
+        return page.copy()
+
+    rows = []
+    for row in page:
+        if isinstance(row, dict):
+            row = dict(row)
+        elif isinstance(row, Leader):
+            row = Leader(*row._fields())
+        rows.append(row)
+
+    return rows
@@ -0,0 +1,509 @@
+'''
+Lua scripts executed server-side by the leaderboard classes. Each script is
+registered against a redis connection with +register_script+ and invoked
+through EVALSHA, so a call costs a single round trip.
+'''
+
+# Fetch a page of members along with their scores, the information needed to
+# derive their ranks and (optionally) their member data.
+#
+# KEYS[1] leaderboard, KEYS[2] member data hash, KEYS[3] (optional) sorted set
+# used to count the members ranked strictly ahead of the first member returned.
+# ARGV[1] order ('asc' or 'desc'), ARGV[2] '1' to include member data,
+# ARGV[3] range mode followed by its two arguments:
+#   'rank'   starting offset, ending offset
+#   'score'  minimum score, maximum score
+#   'member' member, page size
+#
+# Returns an empty table if there is nothing to return, otherwise
+# {offset of the first member, count ahead of it or -1, {member, score, ...}}
+# with the member data values appended as a fourth element when requested.
+PAGE = '''
+local leaderboard = KEYS[1]
+local desc = ARGV[1] == 'desc'
+local mode = ARGV[3]
+
+local function range_by_rank(start, stop)
+  if desc then
+    return redis.call('ZREVRANGE', leaderboard, start, stop, 'WITHSCORES')
+  end
+  return redis.call('ZRANGE', leaderboard, start, stop, 'WITHSCORES')
+end
+
+local function rank_of(member)
+  if desc then
+    return redis.call('ZREVRANK', leaderboard, member)
+  end
+  return redis.call('ZRANK', leaderboard, member)
+end
+
+local offset = 0
+local range
+if mode == 'member' then
+  local rank = rank_of(ARGV[4])
+  if not rank then
+    return {}
+  end
+  offset = rank - math.floor(tonumber(ARGV[5]) / 2)
+  if offset < 0 then
+    offset = 0
+  end
+  range = range_by_rank(offset, offset + tonumber(ARGV[5]) - 1)
+elseif mode == 'rank' then
+  offset = tonumber(ARGV[4])
+  range = range_by_rank(ARGV[4], ARGV[5])
+else
+  if desc then
+    range = redis.call('ZREVRANGEBYSCORE', leaderboard, ARGV[5], ARGV[4], 'WITHSCORES')
+  else
+    range = redis.call('ZRANGEBYSCORE', leaderboard, ARGV[4], ARGV[5], 'WITHSCORES')
+  end
+  if #range > 0 then
+    offset = rank_of(range[1])
+  end
+end
+
+if #range == 0 then
+  return {}
+end
+
+local ahead = -1
+if KEYS[3] then
+  if desc then
+    ahead = redis.call('ZCOUNT', KEYS[3], '(' .. range[2], '+inf')
+  else
+    ahead = redis.call('ZCOUNT', KEYS[3], '-inf', '(' .. range[2])
+  end
+end
+
+local result = {offset, ahead, range}
+if ARGV[2] == '1' then
+  local member_data = {}
+  local members = {}
+  for index = 1, #range, 2 do
+    members[#members + 1] = range[index]
+    if #members == 1000 or index + 1 == #range then
+      local values = redis.call('HMGET', KEYS[2], unpack(members))
+      for value_index = 1, #members do
+        member_data[#member_data + 1] = values[value_index]
+      end
+      members = {}
+    end
+  end
+  result[4] = member_data
+end
+return result
+'''
+
+# Look up the score of each member in a list and rank it by counting the entries
+# with a better score in a second sorted set. Members sharing a score are only
+# counted once.
+#
+# KEYS[1] leaderboard, KEYS[2] sorted set to count ahead in, KEYS[3] member
+# data hash. ARGV[1] order ('asc' or 'desc'), ARGV[2] '1' to include member
+# data, ARGV[3...] members.
+#
+# Returns {scores, ranks} with the member data values appended as a third
+# element when requested. Missing members have a nil score and rank.
+RANKED_IN_LIST = '''
+local desc = ARGV[1] == 'desc'
+local scores = {}
+local ranks = {}
+local ranks_by_score = {}
+
+for index = 3, #ARGV do
+  local score = redis.call('ZSCORE', KEYS[1], ARGV[index])
+  local rank = false
+  if score then
+    rank = ranks_by_score[score]
+    if not rank then
+      if desc then
+        rank = redis.call('ZCOUNT', KEYS[2], '(' .. score, '+inf') + 1
+      else
+        rank = redis.call('ZCOUNT', KEYS[2], '-inf', '(' .. score) + 1
+      end
+      ranks_by_score[score] = rank
+    end
+  end
+  scores[#scores + 1] = score
+  ranks[#ranks + 1] = rank
+end
+
+local result = {scores, ranks}
+if ARGV[2] == '1' then
+  local member_data = {}
+  for index = 3, #ARGV, 1000 do
+    local values = redis.call('HMGET', KEYS[3], unpack(ARGV, index, math.min(index + 999, #ARGV)))
+    for value_index = 1, #values do
+      member_data[#member_data + 1] = values[value_index]
+    end
+  end
+  result[3] = member_data
+end
+return result
+'''
+
+# Lua function deciding whether a conditional ranking mode allows a member to be
+# ranked with +score+ given its +current_score+ (false if it is not ranked).
+# Operations other than the conditional modes always hold.
+CONDITION = '''
+local function condition_holds(condition, current_score, score)
+  if condition == 'keep_highest' then
+    return (not current_score) or tonumber(score) > tonumber(current_score)
+  elseif condition == 'keep_lowest' then
+    return (not current_score) or tonumber(score) < tonumber(current_score)
+  elseif condition == 'only_if_new' then
+    return not current_score
+  elseif condition == 'only_if_exists' then
+    return current_score ~= false
+  end
+  return true
+end
+'''
+
+# Lua function updating the tracked aggregates hash of a leaderboard (count,
+# sum and sum of squares of the scores less a shift) when a member's score
+# changes from +previous_score+ to +score+ (false if the member was not ranked
+# or is removed). The shift is the first score tracked, or the mean when the
+# aggregates are rebuilt, and keeps the variance computed from the squares
+# accurate when the scores are large next to their spread.
+TRACK = '''
+local function track(aggregates, previous_score, score)
+  local shift = redis.call('HGET', aggregates, 'shift')
+  if not shift and score and redis.call('EXISTS', aggregates) == 0 then
+    shift = string.format('%.17g', tonumber(score))
+    redis.call('HSET', aggregates, 'shift', shift)
+  end
+  shift = tonumber(shift or 0)
+
+  if previous_score then
+    local previous = tonumber(previous_score)
+    redis.call('HINCRBY', aggregates, 'count', -1)
+    redis.call('HINCRBYFLOAT', aggregates, 'sum', string.format('%.17g', -previous))
+    redis.call('HINCRBYFLOAT', aggregates, 'squares',
+      string.format('%.17g', -(previous - shift) * (previous - shift)))
+  end
+  if score then
+    local current = tonumber(score)
+    redis.call('HINCRBY', aggregates, 'count', 1)
+    redis.call('HINCRBYFLOAT', aggregates, 'sum', string.format('%.17g', current))
+    redis.call('HINCRBYFLOAT', aggregates, 'squares',
+      string.format('%.17g', (current - shift) * (current - shift)))
+  end
+end
+'''
+
+# Lua function converting a range of the leaderboard to zero-based ascending
+# positions. The range is given by +mode+: 'rank' for positions +first+ to
+# +second+ in leaderboard order (a negative +second+ meaning the last member),
+# or 'score' for scores between +first+ and +second+ inclusive.
+INDEX_RANGE = '''
+local function index_range(leaderboard, mode, first, second, desc)
+  if mode == 'score' then
+    local start = redis.call('ZCOUNT', leaderboard, '-inf', '(' .. first)
+    return start, start + redis.call('ZCOUNT', leaderboard, first, second) - 1
+  end
+
+  local total = redis.call('ZCARD', leaderboard)
+  local start = tonumber(first)
+  local stop = tonumber(second)
+  if start < 0 then
+    start = 0
+  end
+  if stop < 0 or stop >= total then
+    stop = total - 1
+  end
+  if desc then
+    return total - 1 - stop, total - 1 - start
+  end
+  return start, stop
+end
+
+local function to_number(score)
+  if score == 'inf' then
+    return math.huge
+  elseif score == '-inf' then
+    return -math.huge
+  end
+  return tonumber(score)
+end
+'''
+
+# Compute aggregate statistics over a range of a leaderboard, or over a chunk
+# of it, reading it in chunks of 1000 members. Optionally store the count, sum
+# and sum of squares about the mean as the tracked aggregates of the leaderboard.
+#
+# KEYS[1] leaderboard, KEYS[2] (optional) tracked aggregates hash to replace.
+# ARGV[1] order ('asc' or 'desc'), ARGV[2] range mode ('rank' or 'score'),
+# ARGV[3] and ARGV[4] range, see +index_range+, ARGV[5] and ARGV[6] (optional)
+# offset into the range, in ascending order, and maximum number of members of
+# the chunk.
+#
+# Returns {count, sum, minimum, maximum, mean, sum of squared differences from
+# the mean}, or {0} for an empty range.
+AGGREGATES = INDEX_RANGE + '''
+local start, stop = index_range(KEYS[1], ARGV[2], ARGV[3], ARGV[4], ARGV[1] == 'desc')
+if ARGV[5] then
+  start = start + tonumber(ARGV[5])
+  stop = math.min(stop, start + tonumber(ARGV[6]) - 1)
+end
+local count, sum, mean, m2 = 0, 0, 0, 0
+local minimum, maximum = false, false
+
+for offset = start, stop, 1000 do
+  local range = redis.call('ZRANGE', KEYS[1], offset, math.min(offset + 999, stop), 'WITHSCORES')
+  for index = 2, #range, 2 do
+    local score = to_number(range[index])
+    count = count + 1
+    sum = sum + score
+    local delta = score - mean
+    mean = mean + delta / count
+    m2 = m2 + delta * (score - mean)
+    if not minimum then
+      minimum = range[index]
+    end
+    maximum = range[index]
+  end
+end
+
+if KEYS[2] then
+  redis.call('DEL', KEYS[2])
+  if count > 0 then
+    redis.call('HMSET', KEYS[2], 'count', count, 'sum', string.format('%.17g', sum),
+      'squares', string.format('%.17g', m2), 'shift', string.format('%.17g', mean))
+  end
+end
+
+if count == 0 then
+  return {0}
+end
+return {count, string.format('%.17g', sum), minimum, maximum,
+  string.format('%.17g', mean), string.format('%.17g', m2)}
+'''
+
+# Remove a range of members from a leaderboard, keeping its tracked aggregates
+# in step.
+#
+# KEYS[1] leaderboard, KEYS[2] tracked aggregates hash. ARGV as for AGGREGATES.
+#
+# Returns the number of members removed.
+REMOVE_RANGE = INDEX_RANGE + '''
+local start, stop = index_range(KEYS[1], ARGV[2], ARGV[3], ARGV[4], ARGV[1] == 'desc')
+if stop < start then
+  return 0
+end
+
+local shift = tonumber(redis.call('HGET', KEYS[2], 'shift') or 0)
+local sum, squares = 0, 0
+for offset = start, stop, 1000 do
+  local range = redis.call('ZRANGE', KEYS[1], offset, math.min(offset + 999, stop), 'WITHSCORES')
+  for index = 2, #range, 2 do
+    local score = to_number(range[index])
+    sum = sum + score
+    squares = squares + (score - shift) * (score - shift)
+  end
+end
+
+local removed = redis.call('ZREMRANGEBYRANK', KEYS[1], start, stop)
+redis.call('HINCRBY', KEYS[2], 'count', -removed)
+redis.call('HINCRBYFLOAT', KEYS[2], 'sum', string.format('%.17g', -sum))
+redis.call('HINCRBYFLOAT', KEYS[2], 'squares', string.format('%.17g', -squares))
+return removed
+'''
+
+# Rank, change the score of or remove members of a leaderboard with tracked
+# aggregates, keeping the aggregates in step.
+#
+# KEYS[1] leaderboard, KEYS[2] tracked aggregates hash, KEYS[3] member data
+# hash. ARGV holds groups of four arguments as for TIE_WRITE.
+#
+# Returns the new score of the last member written, or nil if it was removed
+# or its condition did not hold.
+TRACKED_WRITE = CONDITION + TRACK + '''
+local score = false
+
+for index = 1, #ARGV, 4 do
+  local operation = ARGV[index]
+  local member = ARGV[index + 1]
+  local previous_score = redis.call('ZSCORE', KEYS[1], member)
+  score = false
+
+  if operation == 'remove' then
+    if previous_score then
+      redis.call('ZREM', KEYS[1], member)
+      track(KEYS[2], previous_score, false)
+    end
+    redis.call('HDEL', KEYS[3], member)
+  elseif condition_holds(operation, previous_score, ARGV[index + 2]) then
+    if operation == 'change' then
+      score = redis.call('ZINCRBY', KEYS[1], ARGV[index + 2], member)
+    else
+      redis.call('ZADD', KEYS[1], ARGV[index + 2], member)
+      score = redis.call('ZSCORE', KEYS[1], member)
+    end
+    track(KEYS[2], previous_score, score)
+    if ARGV[index + 3] ~= '' then
+      redis.call('HSET', KEYS[3], member, ARGV[index + 3])
+    end
+  end
+end
+
+return score
+'''
+
+# Rank a member if a conditional ranking mode allows it.
+#
+# KEYS[1] leaderboard, KEYS[2] member data hash. ARGV[1] conditional mode
+# ('keep_highest', 'keep_lowest', 'only_if_new' or 'only_if_exists'),
+# ARGV[2] member, ARGV[3] score, ARGV[4] member data or ''.
+#
+# Returns 1 if the member was ranked, 0 otherwise.
+RANK_MEMBER_IF = CONDITION + '''
+if not condition_holds(ARGV[1], redis.call('ZSCORE', KEYS[1], ARGV[2]), ARGV[3]) then
+  return 0
+end
+
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[2])
+if ARGV[4] ~= '' then
+  redis.call('HSET', KEYS[2], ARGV[2], ARGV[4])
+end
+return 1
+'''
+
+# Rank, change the score of or remove members of a tie ranking leaderboard,
+# keeping the ties sorted set in step. The ties set holds one entry per distinct
+# score; the number of members holding a score (counted with ZCOUNT) is its
+# reference count, so an entry is added with the first member to reach a score
+# and removed with the last member to leave it.
+#
+# KEYS[1] leaderboard, KEYS[2] ties leaderboard, KEYS[3] member data hash,
+# KEYS[4] (optional) tracked aggregates hash. ARGV holds one or more groups of
+# four arguments, applied in order: operation, member, score (or delta for
+# 'change'), member data or ''. The
+# operation is 'rank', 'change', 'remove' or one of the conditional modes,
+# which rank the member only if their condition holds.
+#
+# Returns the new score of the last member written, or nil if it was removed
+# or its condition did not hold.
+TIE_WRITE = CONDITION + TRACK + '''
+local score = false
+
+for index = 1, #ARGV, 4 do
+  local operation = ARGV[index]
+  local member = ARGV[index + 1]
+  local previous_score = redis.call('ZSCORE', KEYS[1], member)
+  local written = true
+  score = false
+
+  if operation == 'remove' then
+    redis.call('ZREM', KEYS[1], member)
+    redis.call('HDEL', KEYS[3], member)
+    if KEYS[4] and previous_score then
+      track(KEYS[4], previous_score, false)
+    end
+  elseif condition_holds(operation, previous_score, ARGV[index + 2]) then
+    if operation == 'change' then
+      score = redis.call('ZINCRBY', KEYS[1], ARGV[index + 2], member)
+    else
+      redis.call('ZADD', KEYS[1], ARGV[index + 2], member)
+      score = redis.call('ZSCORE', KEYS[1], member)
+    end
+    if KEYS[4] then
+      track(KEYS[4], previous_score, score)
+    end
+    if redis.call('ZCOUNT', KEYS[2], score, score) == 0 then
+      redis.call('ZADD', KEYS[2], score, score)
+    end
+    if ARGV[index + 3] ~= '' then
+      redis.call('HSET', KEYS[3], member, ARGV[index + 3])
+    end
+  else
+    written = false
+  end
+
+  if written and previous_score and previous_score ~= score then
+    if redis.call('ZCOUNT', KEYS[1], previous_score, previous_score) == 0 then
+      redis.call('ZREMRANGEBYSCORE', KEYS[2], previous_score, previous_score)
+    end
+  end
+end
+
+return score
+'''
+
+# Rank, change the score of or remove members of a sliding window leaderboard.
+# Scores are written to the sorted set of the current slot. If the union of the
+# window has been built, the union score of each member written is recomputed
+# from its scores in the slots of the window, so the union stays current until
+# the window advances. Otherwise the union is built from the slots once the
+# writes are applied, so readers never see a window missing a write.
+#
+# KEYS[1] union of the window, KEYS[2] member data hash, KEYS[3] current slot,
+# KEYS[4...] previous slots of the window. ARGV[1] aggregate ('sum', 'min' or
+# 'max'), ARGV[2] UNIX timestamp at which the current slot and the member data
+# expire, ARGV[3] UNIX timestamp at which the union expires, then groups of four
+# arguments applied in order: operation ('rank', 'change' or 'remove'), member,
+# score (or delta for 'change'), member data or ''.
+SLIDING_WINDOW_WRITE = '''
+local aggregate = ARGV[1]
+local union_exists = redis.call('EXISTS', KEYS[1]) == 1
+
+for index = 4, #ARGV, 4 do
+  local operation = ARGV[index]
+  local member = ARGV[index + 1]
+
+  if operation == 'remove' then
+    for slot = 3, #KEYS do
+      redis.call('ZREM', KEYS[slot], member)
+    end
+    redis.call('HDEL', KEYS[2], member)
+  else
+    if operation == 'change' then
+      redis.call('ZINCRBY', KEYS[3], ARGV[index + 2], member)
+    else
+      redis.call('ZADD', KEYS[3], ARGV[index + 2], member)
+    end
+    redis.call('EXPIREAT', KEYS[3], ARGV[2])
+    if ARGV[index + 3] ~= '' then
+      redis.call('HSET', KEYS[2], member, ARGV[index + 3])
+      redis.call('EXPIREAT', KEYS[2], ARGV[2])
+    end
+  end
+
+  if union_exists then
+    local combined = false
+    for slot = 3, #KEYS do
+      local score = redis.call('ZSCORE', KEYS[slot], member)
+      if score then
+        score = tonumber(score)
+        if not combined then
+          combined = score
+        elseif aggregate == 'max' then
+          combined = math.max(combined, score)
+        elseif aggregate == 'min' then
+          combined = math.min(combined, score)
+        else
+          combined = combined + score
+        end
+      end
+    end
+    if combined then
+      redis.call('ZADD', KEYS[1], string.format('%.17g', combined), member)
+    else
+      redis.call('ZREM', KEYS[1], member)
+    end
+  end
+end
+
+if not union_exists then
+  local union = {'ZUNIONSTORE', KEYS[1], #KEYS - 2}
+  for slot = 3, #KEYS do
+    table.insert(union, KEYS[slot])
+  end
+  table.insert(union, 'AGGREGATE')
+  table.insert(union, aggregate)
+  if redis.call(unpack(union)) > 0 then
+    redis.call('EXPIREAT', KEYS[1], ARGV[3])
+  end
+end
+'''
@@ -0,0 +1,853 @@
+from .leaderboard import Leaderboard, chunked_members
+from redis import StrictRedis, Redis
+from itertools import islice
+import heapq
+import math
+import zlib
+
+
+class ShardedLeaderboard(Leaderboard):
+    '''
+    Leaderboard whose members are spread across several redis instances. Each member
+    is stored on the shard chosen by hashing its name, so calls for a single member go
+    to one shard, and queries over the whole leaderboard are answered by querying every
+    shard and merging the results.
+
+    Members with the same score are ordered by shard, and then in the order their shard
+    returns them.
+    '''
+
+    def __init__(self, leaderboard_name, shards, **options):
+        '''
+        Initialize a connection to a specific sharded leaderboard.
+
+        The options are the same as for +Leaderboard+, and apply to every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param shards [Array] One entry per shard, either a redis connection or a Hash of
+          connection options, e.g. +{'host': 'localhost', 'port': 6380}+. Read replicas of a
+          shard are given with the +read_replicas+ option of the shard.
+        '''
+        if 'read_replicas' in options:
+            raise ValueError('read_replicas must be given in the options of each shard')
+
+        self.shards = []
+        for shard in shards:
+            shard_options = dict(options)
+            if isinstance(shard, (StrictRedis, Redis)):
+                shard_options['redis_connection'] = shard
+            else:
+                shard_options.update(shard)
+            self.shards.append(Leaderboard(leaderboard_name, **shard_options))
+
+        if not self.shards:
+            raise ValueError('a sharded leaderboard needs at least one shard')
+
+        super(ShardedLeaderboard, self).__init__(
+            leaderboard_name,
+            redis_connection=self.shards[0].redis_connection,
+            **options)
+        # Writes go through the shards, so they invalidate the pages cached here
+        for shard in self.shards:
+            shard._page_cache = self._page_cache
+
+    def flush(self):
+        '''
+        Write any score changes buffered by the +write_behind+ option on every shard.
+
+        @return the number of members whose buffered score changes were written.
+        '''
+        return sum(shard.flush() for shard in self.shards)
+
+    def shard_for(self, member):
+        '''
+        Retrieve the shard holding a member.
+
+        @param member [String] Member name.
+        @return the +Leaderboard+ for the shard holding the member.
+        '''
+        return self.shards[self._shard_index(member)]
+
+    def delete_leaderboard_named(self, leaderboard_name):
+        '''
+        Delete the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        for shard in self.shards:
+            shard.delete_leaderboard_named(leaderboard_name)
+
+    def rank_member_in(
+            self, leaderboard_name, member, score, member_data=None):
+        '''
+        Rank a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        self.shard_for(member).rank_member_in(
+            leaderboard_name, member, score, member_data)
+
+    def rank_member_across(
+            self, leaderboards, member, score, member_data=None):
+        '''
+        Rank a member across multiple leaderboards.
+
+        @param leaderboards [Array] Leaderboard names.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        self.shard_for(member).rank_member_across(
+            leaderboards, member, score, member_data)
+
+    def rank_member_if_in(
+            self,
+            leaderboard_name,
+            rank_conditional,
+            member,
+            score,
+            member_data=None):
+        '''
+        Rank a member in the named leaderboard based on execution of the +rank_conditional+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param rank_conditional [String, function] Conditional mode, or function which must return +True+ or +False+ that controls whether or not the member is ranked in the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member_data.
+        @return +True+ if the member was ranked, +False+ otherwise.
+        '''
+        return self.shard_for(member).rank_member_if_in(
+            leaderboard_name, rank_conditional, member, score, member_data)
+
+    def rank_members_in(self, leaderboard_name, members_and_scores,
+                        chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, progress=None):
+        '''
+        Rank an array of members in the named leaderboard, writing each chunk to the shards
+        holding its members.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members_and_scores [Array] Variable list of members and scores, or an iterable of
+          (member, score) or (member, score, member_data) tuples.
+        @param chunk_size [int] Maximum number of members read from the input at a time.
+        @param progress [function] Optional function called with the number of members ranked so far after each chunk.
+        @return the number of members ranked.
+        '''
+        total = 0
+        for chunk in chunked_members(members_and_scores, chunk_size):
+            for index, entries in self._group_by_shard(chunk, lambda entry: entry[0]).items():
+                self.shards[index].rank_members_in(
+                    leaderboard_name, entries, chunk_size=chunk_size)
+
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+
+        return total
+
+    def member_data_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return String of optional member data.
+        '''
+        return self.shard_for(member).member_data_for_in(
+            leaderboard_name, member)
+
+    def members_data_for_in(self, leaderboard_name, members):
+        '''
+        Retrieve the optional member data for a given list of members in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members [Array] Member names.
+        @return Array of strings of optional member data.
+        '''
+        members_data = [None] * len(members)
+        for index, positions in self._group_by_shard(
+                range(len(members)), lambda position: members[position]).items():
+            responses = self.shards[index].members_data_for_in(
+                leaderboard_name, [members[position] for position in positions])
+            for position, member_data in zip(positions, responses):
+                members_data[position] = member_data
+
+        return members_data
+
+    def update_member_data_in(self, leaderboard_name, member, member_data):
+        '''
+        Update the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param member_data [String] Optional member data.
+        '''
+        self.shard_for(member).update_member_data_in(
+            leaderboard_name, member, member_data)
+
+    def remove_member_data_in(self, leaderboard_name, member):
+        '''
+        Remove the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        self.shard_for(member).remove_member_data_in(leaderboard_name, member)
+
+    def total_members_in(self, leaderboard_name):
+        '''
+        Retrieve the total number of members in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return the total number of members in the named leaderboard.
+        '''
+        return sum(shard.total_members_in(leaderboard_name) for shard in self.shards)
+
+    def remove_member_from(self, leaderboard_name, member):
+        '''
+        Remove the optional member data for a given member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        self.shard_for(member).remove_member_from(leaderboard_name, member)
+
+    def total_members_in_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Retrieve the total members in a given score range from the named leaderboard.
+
+        @param leaderboard_name Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return the total members in a given score range from the named leaderboard.
+        '''
+        return sum(
+            shard.total_members_in_score_range_in(leaderboard_name, min_score, max_score)
+            for shard in self.shards)
+
+    def aggregates_in(self, leaderboard_name):
+        '''
+        Aggregate statistics of the scores of all members in the named leaderboard, combined
+        from the aggregates of every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self._combined_aggregates(
+            [shard.aggregates_in(leaderboard_name) for shard in self.shards])
+
+    def aggregates_for_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Aggregate statistics of the scores of the members in a given score range of the named
+        leaderboard, combined from the aggregates of every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        return self._combined_aggregates([
+            shard.aggregates_for_score_range_in(leaderboard_name, min_score, max_score)
+            for shard in self.shards])
+
+    def aggregates_for_rank_range_in(
+            self, leaderboard_name, starting_rank, ending_rank):
+        '''
+        Aggregate statistics of the scores of the members in a given rank range of the named
+        leaderboard. Ranks span shards, so the scores of the range are merged on the client.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param starting_rank [int] Starting rank (inclusive).
+        @param ending_rank [int] Ending rank (inclusive).
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        scores = [score for member, score in self._range_in(
+            leaderboard_name, max(starting_rank - 1, 0), ending_rank - 1)]
+        if not scores:
+            return self._aggregates(0, 0.0)
+
+        mean = sum(scores) / len(scores)
+        return self._aggregates(
+            len(scores),
+            float(sum(scores)),
+            min(scores),
+            max(scores),
+            sum((score - mean) ** 2 for score in scores) / len(scores))
+
+    def rebuild_aggregates_in(self, leaderboard_name):
+        '''
+        Recompute the tracked aggregates of the named leaderboard on every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        for shard in self.shards:
+            shard.rebuild_aggregates_in(leaderboard_name)
+
+    def check_member_in(self, leaderboard_name, member):
+        '''
+        Check to see if a member exists in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return +true+ if the member exists in the named leaderboard, +false+ otherwise.
+        '''
+        return self.shard_for(member).check_member_in(leaderboard_name, member)
+
+    def rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the rank for a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return the rank for a member in the leaderboard.
+        '''
+        return self._scores_and_ranks_in(leaderboard_name, [member])[0][1]
+
+    def score_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score for a member in the named leaderboard.
+
+        @param leaderboard_name Name of the leaderboard.
+        @param member [String] Member name.
+        @return the score for a member in the leaderboard or +None+ if the member is not in the leaderboard.
+        '''
+        return self.shard_for(member).score_for_in(leaderboard_name, member)
+
+    def score_and_rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score and rank for a member in the named leaderboard.
+
+        @param leaderboard_name [String]Name of the leaderboard.
+        @param member [String] Member name.
+        @return the score and rank for a member in the named leaderboard as a Hash.
+        '''
+        score, rank = self._scores_and_ranks_in(leaderboard_name, [member])[0]
+        return {
+            self.MEMBER_KEY: member,
+            self.SCORE_KEY: score,
+            self.RANK_KEY: rank
+        }
+
+    def change_score_for_member_in(self, leaderboard_name, member, delta, member_data=None):
+        '''
+        Change the score for a member in the named leaderboard by a delta which can be positive or negative.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param delta [float] Score change.
+        @param member_data [String] Optional member data.
+        '''
+        self.shard_for(member).change_score_for_member_in(
+            leaderboard_name, member, delta, member_data)
+
+    def remove_members_in_score_range_in(
+            self, leaderboard_name, min_score, max_score):
+        '''
+        Remove members from the named leaderboard in a given score range.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        '''
+        for shard in self.shards:
+            shard.remove_members_in_score_range_in(
+                leaderboard_name, min_score, max_score)
+
+    def remove_members_outside_rank_in(self, leaderboard_name, rank):
+        '''
+        Remove members from the named leaderboard in a given rank range.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param rank [int] the rank (inclusive) which we should keep.
+        @return the total member count which was removed.
+        '''
+        kept = [0] * len(self.shards)
+        merged = self._merged_in(leaderboard_name, rank - 1, self.order, primary=True)
+        for entry in islice(merged, rank):
+            kept[entry[1]] += 1
+
+        return sum(
+            shard.remove_members_outside_rank_in(leaderboard_name, kept[index])
+            for index, shard in enumerate(self.shards))
+
+    def page_for_in(self, leaderboard_name, member,
+                    page_size=Leaderboard.DEFAULT_PAGE_SIZE):
+        '''
+        Determine the page where a member falls in the named leaderboard.
+
+        @param leaderboard [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param page_size [int] Page size to be used in determining page location.
+        @return the page where a member falls in the leaderboard.
+        '''
+        rank_for_member = self.rank_for_in(leaderboard_name, member) or 0
+
+        return int(math.ceil(float(rank_for_member) / float(page_size)))
+
+    def percentile_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the percentile for a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @return the percentile for a member in the named leaderboard.
+        '''
+        rank = self.rank_for_in(leaderboard_name, member)
+        if rank is None:
+            return None
+
+        total_members = self.total_members_in(leaderboard_name)
+        if self.order == self.ASC:
+            rank = total_members - rank + 1
+
+        percentile = math.ceil(
+            float(total_members - rank) / float(total_members) * 100)
+
+        if self.order == self.ASC:
+            return 100 - percentile
+        else:
+            return percentile
+
+    def score_for_percentile_in(self, leaderboard_name, percentile):
+        '''
+        Calculate the score for a given percentile value in the leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param percentile [float] Percentile value (0.0 to 100.0 inclusive).
+        @return the score corresponding to the percentile argument. Return +None+ for arguments outside 0-100 inclusive and for leaderboards with no members.
+        '''
+        if not 0 <= percentile <= 100:
+            return None
+
+        total_members = self.total_members_in(leaderboard_name)
+        if total_members < 1:
+            return None
+
+        if self.order == self.ASC:
+            percentile = 100 - percentile
+
+        index = (total_members - 1) * (percentile / 100.0)
+
+        scores = [
+            score for member, score in self._range_in(
+                leaderboard_name,
+                int(math.floor(index)),
+                int(math.ceil(index)),
+                self.ASC)]
+
+        if index == math.floor(index):
+            return scores[0]
+        else:
+            interpolate_fraction = index - math.floor(index)
+            return scores[0] + interpolate_fraction * (scores[1] - scores[0])
+
+    def expire_leaderboard_for(self, leaderboard_name, seconds):
+        '''
+        Expire the given leaderboard in a set number of seconds.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param seconds [int] Number of seconds after which the leaderboard will be expired.
+        '''
+        for shard in self.shards:
+            shard.expire_leaderboard_for(leaderboard_name, seconds)
+
+    def expire_leaderboard_at_for(self, leaderboard_name, timestamp):
+        '''
+        Expire the given leaderboard at a specific UNIX timestamp.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param timestamp [int] UNIX timestamp at which the leaderboard will be expired.
+        '''
+        for shard in self.shards:
+            shard.expire_leaderboard_at_for(leaderboard_name, timestamp)
+
+    def all_leaders_from(self, leaderboard_name, **options):
+        '''
+        Retrieves all leaders from the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return the named leaderboard.
+        '''
+        return self._parse_raw_members(
+            leaderboard_name,
+            self._range_in(leaderboard_name, 0, -1),
+            starting_offset=0,
+            **options)
+
+    def _iter_pages_from(self, leaderboard_name, chunk_size, **options):
+        '''
+        Iterate over all leaders of the named leaderboard, one window of +chunk_size+
+        ranks at a time. Every shard is read lazily in windows of +chunk_size+ ranks and
+        the windows are merged as the leaders are consumed.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk_size [int] Number of leaders fetched from a shard in each round trip.
+        @param options [Hash] Options to be used when retrieving the leaders from the named leaderboard.
+        @return a generator of pages of leaders.
+        '''
+        sign = -1 if self.order == self.DESC else 1
+        merged = heapq.merge(*[
+            self._iter_shard(index, leaderboard_name, chunk_size)
+            for index in range(len(self.shards))])
+
+        offset = 0
+        while True:
+            chunk = [(member, sign * key) for key, index, position, member in islice(merged, chunk_size)]
+            if not chunk:
+                return
+
+            yield self._parse_raw_members(
+                leaderboard_name, chunk, starting_offset=offset, **options)
+            offset += len(chunk)
+
+    def ranked_in_list_in(self, leaderboard_name, members, **options):
+        '''
+        Retrieve a page of leaders from the named leaderboard for a given list of members.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members [Array] Member names.
+        @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
+        @return a page of leaders from the named leaderboard for a given list of members.
+        '''
+        ranks_for_members = []
+
+        members_data = None
+        if ('with_member_data' in options) and (True == options['with_member_data']):
+            members_data = self.members_data_for_in(leaderboard_name, members)
+
+        for index, (score, rank) in enumerate(self._scores_and_ranks_in(leaderboard_name, members)):
+            if rank is None and not options.get('include_missing', True):
+                continue
+
+            data = {}
+            data[self.MEMBER_KEY] = members[index]
+            data[self.RANK_KEY] = rank
+            data[self.SCORE_KEY] = score
+            if members_data is not None:
+                data[self.MEMBER_DATA_KEY] = members_data[index]
+
+            ranks_for_members.append(data)
+
+        if 'sort_by' in options:
+            ranks_for_members = self._sort_members(
+                ranks_for_members, options['sort_by'])
+
+        return ranks_for_members
+
+    def merge_leaderboards(self, destination, keys, aggregate='SUM'):
+        '''
+        Merge leaderboards given by keys with this leaderboard into a named destination leaderboard.
+        Members live on the same shard in every leaderboard, so each shard is merged on its own.
+
+        @param destination [String] Destination leaderboard name.
+        @param keys [Array] Leaderboards to be merged with the current leaderboard.
+        @param options [Hash] Options for merging the leaderboards.
+        '''
+        for shard in self.shards:
+            shard.merge_leaderboards(destination, list(keys), aggregate)
+
+    def intersect_leaderboards(self, destination, keys, aggregate='SUM'):
+        '''
+        Intersect leaderboards given by keys with this leaderboard into a named destination leaderboard.
+        Members live on the same shard in every leaderboard, so each shard is intersected on its own.
+
+        @param destination [String] Destination leaderboard name.
+        @param keys [Array] Leaderboards to be merged with the current leaderboard.
+        @param options [Hash] Options for intersecting the leaderboards.
+        '''
+        for shard in self.shards:
+            shard.intersect_leaderboards(destination, list(keys), aggregate)
+
+    def _members_from_page_in(
+            self, leaderboard_name, mode, first, second, members_only=False, **options):
+        '''
+        Retrieve a contiguous page of members from the named leaderboard by merging the
+        ranges of every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] One of 'rank', 'score' or 'member'.
+        @param first Starting offset, minimum score or member name depending on +mode+.
+        @param second Ending offset, maximum score or page size depending on +mode+.
+        @param members_only [bool] Set True to return the members as is, Default is False.
+        @param options [Hash] Options to be used when retrieving the page from the named leaderboard.
+        @return a list of members.
+        '''
+        if mode == 'member':
+            rank = self.rank_for_in(leaderboard_name, first)
+            if rank is None:
+                return self._parse_raw_members(
+                    leaderboard_name, [], members_only, starting_offset=0, **options)
+            offset = max(rank - 1 - second // 2, 0)
+            raw_leader_data = self._range_in(
+                leaderboard_name, offset, offset + second - 1)
+        elif mode == 'rank':
+            offset = first
+            raw_leader_data = self._range_in(leaderboard_name, first, second)
+        else:
+            raw_leader_data = self._range_by_score_in(leaderboard_name, first, second)
+            offset = 0
+            if raw_leader_data:
+                offset = self.rank_for_in(leaderboard_name, raw_leader_data[0][0]) - 1
+
+        return self._parse_raw_members(
+            leaderboard_name,
+            raw_leader_data,
+            members_only,
+            starting_offset=offset,
+            **options)
+
+    def _range_in(self, leaderboard_name, start, stop, order=None):
+        '''
+        Members and scores between two zero-based positions (inclusive) of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param start [int] Starting position.
+        @param stop [int] Ending position, or a negative value for the end of the leaderboard.
+        @param order [String] Order of the positions, defaults to the order of the leaderboard.
+        @return a list of (member, score) tuples.
+        '''
+        order = order or self.order
+        if stop < 0:
+            merged = islice(self._merged_in(leaderboard_name, -1, order), start, None)
+        elif start > 0:
+            merged = self._seek_in(leaderboard_name, start, stop, order)
+        else:
+            merged = islice(self._merged_in(leaderboard_name, stop, order), start, stop + 1)
+
+        sign = -1 if order == self.DESC else 1
+        return [(member, sign * key) for key, index, position, member in merged]
+
+    def _seek_in(self, leaderboard_name, start, stop, order):
+        '''
+        Merge of the members between two zero-based positions (inclusive) of the named
+        leaderboard, reading a window about the size of the range from each shard rather
+        than every member ahead of it.
+
+        Members are spread evenly by hashing, so the member at position +start+ is usually
+        found near position +start+ divided by the number of shards on each shard. The
+        best score found at that position of a shard is a boundary with at most +start+
+        members ahead of it across shards, counted exactly with ZCOUNT as for
+        +_scores_and_ranks_in+, and each shard is then read from the boundary on with
+        ZRANGEBYSCORE ... LIMIT, up to position +stop+. A skewed spread costs a larger
+        window, never more than the merge of +_merged_in+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param start [int] Starting position.
+        @param stop [int] Ending position.
+        @param order [String] Order of the positions.
+        @return an iterator of (signed score, shard index, shard position, member) tuples.
+        '''
+        sign = -1 if order == self.DESC else 1
+        readers = [shard._reader() for shard in self.shards]
+
+        probe = start // len(self.shards)
+        keys = []
+        for reader in readers:
+            if order == self.DESC:
+                raw_leader_data = reader.zrevrange(leaderboard_name, probe, probe, withscores=True)
+            else:
+                raw_leader_data = reader.zrange(leaderboard_name, probe, probe, withscores=True)
+            keys.extend(sign * score for member, score in raw_leader_data)
+        # no shard has a member at the probed position, so there are at most +start+ members
+        if not keys:
+            return iter([])
+
+        boundary = repr(sign * min(keys))
+        ahead = 0
+        for reader in readers:
+            if order == self.DESC:
+                ahead += reader.zcount(leaderboard_name, '(' + boundary, '+inf')
+            else:
+                ahead += reader.zcount(leaderboard_name, '-inf', '(' + boundary)
+
+        ranges = []
+        for index, reader in enumerate(readers):
+            if order == self.DESC:
+                raw_leader_data = reader.zrevrangebyscore(
+                    leaderboard_name, boundary, '-inf', start=0, num=stop - ahead + 1,
+                    withscores=True)
+            else:
+                raw_leader_data = reader.zrangebyscore(
+                    leaderboard_name, boundary, '+inf', start=0, num=stop - ahead + 1,
+                    withscores=True)
+            ranges.append([
+                (sign * score, index, position, member)
+                for position, (member, score) in enumerate(raw_leader_data)])
+
+        return islice(heapq.merge(*ranges), start - ahead, stop - ahead + 1)
+
+    def _range_by_score_in(self, leaderboard_name, minimum_score, maximum_score):
+        '''
+        Members and scores within a score range of the named leaderboard, in leaderboard order.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param minimum_score [float] Minimum score (inclusive).
+        @param maximum_score [float] Maximum score (inclusive).
+        @return a list of (member, score) tuples.
+        '''
+        sign = -1 if self.order == self.DESC else 1
+        ranges = []
+        for index, shard in enumerate(self.shards):
+            if self.order == self.DESC:
+                raw_leader_data = shard._reader().zrevrangebyscore(
+                    leaderboard_name, maximum_score, minimum_score, withscores=True)
+            else:
+                raw_leader_data = shard._reader().zrangebyscore(
+                    leaderboard_name, minimum_score, maximum_score, withscores=True)
+            ranges.append([
+                (sign * score, index, position, member)
+                for position, (member, score) in enumerate(raw_leader_data)])
+
+        return [(member, sign * key) for key, index, position, member in heapq.merge(*ranges)]
+
+    def _merged_in(self, leaderboard_name, stop, order, primary=False):
+        '''
+        K-way merge of the leading members of every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param stop [int] Last position needed, or -1 for every member.
+        @param order [String] Order of the merge.
+        @param primary [bool] Read from the primary of each shard rather than from its read replicas.
+        @return an iterator of (signed score, shard index, shard position, member) tuples.
+        '''
+        sign = -1 if order == self.DESC else 1
+        ranges = []
+        for index, shard in enumerate(self.shards):
+            connection = shard.redis_connection if primary else shard._reader()
+            if order == self.DESC:
+                raw_leader_data = connection.zrevrange(
+                    leaderboard_name, 0, stop, withscores=True)
+            else:
+                raw_leader_data = connection.zrange(
+                    leaderboard_name, 0, stop, withscores=True)
+            ranges.append([
+                (sign * score, index, position, member)
+                for position, (member, score) in enumerate(raw_leader_data)])
+
+        return heapq.merge(*ranges)
+
+    def _iter_shard(self, index, leaderboard_name, chunk_size):
+        '''
+        Lazily read the members of a shard in windows of +chunk_size+ ranks.
+
+        @return a generator of (signed score, shard index, shard position, member) tuples.
+        '''
+        sign = -1 if self.order == self.DESC else 1
+        start = 0
+        while True:
+            raw_leader_data = self._range_method(
+                self.shards[index]._reader(),
+                leaderboard_name, start, start + chunk_size - 1, withscores=True)
+            for position, (member, score) in enumerate(raw_leader_data):
+                yield (sign * score, index, start + position, member)
+
+            if len(raw_leader_data) < chunk_size:
+                return
+            start += chunk_size
+
+    def _scores_and_ranks_in(self, leaderboard_name, members):
+        '''
+        Scores and global ranks for a list of members. The rank of a member is one more than
+        its rank on its own shard plus, for every other shard, the count of members with a
+        better score, and also of members with the same score on shards ordered before it.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param members [Array] Member names.
+        @return a list of (score, rank) tuples, with +None+ for missing members.
+        '''
+        owners = [self._shard_index(member) for member in members]
+        scores = [None] * len(members)
+        ranks = [None] * len(members)
+
+        for index, positions in self._group_by_shard(
+                range(len(members)), lambda position: members[position]).items():
+            pipeline = self.shards[index]._reader().pipeline()
+            for position in positions:
+                pipeline.zscore(leaderboard_name, members[position])
+                if self.order == self.ASC:
+                    pipeline.zrank(leaderboard_name, members[position])
+                else:
+                    pipeline.zrevrank(leaderboard_name, members[position])
+            responses = pipeline.execute()
+            for offset, position in enumerate(positions):
+                if responses[offset * 2] is not None:
+                    scores[position] = float(responses[offset * 2])
+                    ranks[position] = responses[offset * 2 + 1] + 1
+
+        found = [position for position in range(len(members)) if scores[position] is not None]
+        for index, shard in enumerate(self.shards):
+            pipeline = shard._reader().pipeline()
+            counted = []
+            for position in found:
+                if owners[position] == index:
+                    continue
+                score = repr(scores[position])
+                exclusive = '' if index < owners[position] else '('
+                if self.order == self.ASC:
+                    pipeline.zcount(leaderboard_name, '-inf', exclusive + score)
+                else:
+                    pipeline.zcount(leaderboard_name, exclusive + score, '+inf')
+                counted.append(position)
+            if counted:
+                for position, count in zip(counted, pipeline.execute()):
+                    ranks[position] += count
+
+        return list(zip(scores, ranks))
+
+    def _combined_aggregates(self, parts):
+        '''
+        Combine the aggregates of disjoint sets of scores, pooling their variances.
+
+        @param parts [Array] Hashes returned by +aggregates_in+.
+        @return a Hash of the count, sum, mean, min, max and (population) variance of the scores.
+        '''
+        parts = [part for part in parts if part['count']]
+        if not parts:
+            return self._aggregates(0, 0.0)
+
+        total_count = sum(part['count'] for part in parts)
+        total = sum(part['sum'] for part in parts)
+        mean = total / total_count
+        return self._aggregates(
+            total_count,
+            total,
+            min(part['min'] for part in parts),
+            max(part['max'] for part in parts),
+            sum(part['count'] * (part['variance'] + (part['mean'] - mean) ** 2)
+                for part in parts) / total_count)
+
+    def _page_version_in(self, leaderboard_name):
+        '''
+        Current version of the named leaderboard, made of the version of every shard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a tuple of versions.
+        '''
+        return tuple(
+            shard._page_version_in(leaderboard_name) for shard in self.shards)
+
+    def _group_by_shard(self, entries, member_for):
+        '''
+        Group entries by the shard holding their member, keeping their order.
+
+        @param entries [Iterable] Entries to group.
+        @param member_for [function] Function returning the member of an entry.
+        @return a Hash of shard index to list of entries.
+        '''
+        groups = {}
+        for entry in entries:
+            groups.setdefault(self._shard_index(member_for(entry)), []).append(entry)
+
+        return groups
+
+    def _shard_index(self, member):
+        if not isinstance(member, bytes):
+            member = (u'%s' % member).encode('utf-8')
+
+        return (zlib.crc32(member) & 0xffffffff) % len(self.shards)
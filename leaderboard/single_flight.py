@@ -0,0 +1,69 @@
+import threading
+
+
+class _Flight(object):
+    '''
+    A read in flight, and its result or error once it returns.
+    '''
+
+    __slots__ = ['done', 'result', 'error', 'waiters']
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    '''
+    Collapse identical reads made concurrently by several threads into one. The first
+    thread to make a read runs it; threads making the same read before it returns wait
+    for it and share its result, or raise its error, instead of reading again.
+    '''
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._flights)
+
+    def do(self, key, fetch, copy=None):
+        '''
+        Run a read unless the same read is already in flight.
+
+        @param key Hashable description of the read.
+        @param fetch [function] Function making the read.
+        @param copy [function] Optional function copying the result for each waiting thread.
+        @return the result of the read.
+        '''
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                leads = True
+            else:
+                flight.waiters += 1
+                leads = False
+
+        if not leads:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result if copy is None else copy(flight.result)
+
+        try:
+            flight.result = fetch()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        # the result itself is only ever copied once shared, so no caller sees another's changes
+        if copy is None or not flight.waiters:
+            return flight.result
+        return copy(flight.result)
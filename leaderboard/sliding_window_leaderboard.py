@@ -0,0 +1,561 @@
+from .leaderboard import Leaderboard
+from . import scripts
+import time
+
+
+class SlidingWindowLeaderboard(Leaderboard):
+    '''
+    Leaderboard over a sliding window of time, e.g. the last 24 hours. Scores are
+    written to one sorted set per slot of time, and the window is the union of the
+    slots it covers, aggregated by sum, minimum or maximum.
+
+    The union is stored under a key versioned by the current slot and is only rebuilt
+    with ZUNIONSTORE when the window advances to a new slot. Writes made in between
+    update the union of the current version along with their slot, or build it if it
+    does not exist yet, so reads are plain queries on the stored union.
+
+    Every read of the leaderboard, or of a leaderboard named in a +_in+ method, is
+    made on the union of its current window. Writes that act on the stored scores as
+    a whole (+rank_member_if+, range removals, +rebuild_aggregates+ and expiry) are
+    not supported, as the window has no scores of its own to apply them to.
+    '''
+    DEFAULT_WINDOW = 24
+
+    DEFAULT_SLOT_SECONDS = 3600
+    DEFAULT_AGGREGATE = 'SUM'
+
+    def __init__(self, leaderboard_name, **options):
+        '''
+        Initialize a connection to a specific sliding window leaderboard.
+
+        The options are the same as for +Leaderboard+, plus:
+
+        window : number of slots covered by the window (24)
+        slot_seconds : length of a slot in seconds (3600)
+        aggregate : how the scores of a member in several slots are combined, 'SUM', 'MIN' or 'MAX' ('SUM')
+        clock : function returning the current UNIX timestamp (time.time)
+        '''
+        self.options = options
+        self.window = self.options.pop('window', self.DEFAULT_WINDOW)
+        self.slot_seconds = self.options.pop('slot_seconds', self.DEFAULT_SLOT_SECONDS)
+        self.aggregate = self.options.pop('aggregate', self.DEFAULT_AGGREGATE).upper()
+        if not self.aggregate in ['SUM', 'MIN', 'MAX']:
+            raise ValueError("%s is not one of [SUM,MIN,MAX]" % self.aggregate)
+        self.clock = self.options.pop('clock', time.time)
+        if self.options.get('track_aggregates'):
+            raise ValueError('track_aggregates is not supported by sliding window leaderboards')
+        self._built = {}
+
+        super(SlidingWindowLeaderboard, self).__init__(
+            leaderboard_name, **options)
+
+    def window_name(self):
+        '''
+        Name of the stored union of the current window of the leaderboard.
+
+        @return the name of the window leaderboard.
+        '''
+        return self.window_name_in(self.leaderboard_name)
+
+    def window_name_in(self, leaderboard_name):
+        '''
+        Name of the stored union of the current window of the named leaderboard, building
+        the union if the window has advanced since it was last built.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return the name of the window leaderboard.
+        '''
+        slot = self._slot()
+        window_name = self._window_key(leaderboard_name, slot)
+        if self._built.get(leaderboard_name) == slot:
+            return window_name
+
+        built = self.redis_connection.exists(window_name)
+        if not built:
+            slot_keys = self._slot_keys(leaderboard_name, slot)
+            pipeline = self._pipeline_for([window_name] + slot_keys)
+            pipeline.zunionstore(window_name, slot_keys, self.aggregate)
+            expires_at = self._window_expires_at(slot)
+            pipeline.expireat(window_name, expires_at)
+            self._bump_version_in(window_name, pipeline, timestamp=expires_at)
+            built = pipeline.execute()[0] > 0
+        # an empty window has no union key to keep; the next write builds it
+        if built:
+            self._built[leaderboard_name] = slot
+
+        return window_name
+
+    def delete_leaderboard_named(self, leaderboard_name):
+        '''
+        Delete the slots, current window and member data of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        slot = self._slot()
+        keys = [
+            self._window_key(leaderboard_name, slot),
+            self._member_data_key(leaderboard_name)] + self._slot_keys(leaderboard_name, slot)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.delete(key)
+        self._drop_version_in(keys[0], pipeline)
+        pipeline.execute()
+        self._built.pop(leaderboard_name, None)
+
+    def rank_member_in(
+            self, leaderboard_name, member, score, member_data=None):
+        '''
+        Rank a member in the current slot of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        self._write_members_in(
+            leaderboard_name, [('rank', member, score, member_data)])
+
+    def rank_member_across(
+            self, leaderboards, member, score, member_data=None):
+        '''
+        Rank a member in the current slot of multiple leaderboards.
+
+        @param leaderboards [Array] Leaderboard names.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        pipeline = self.redis_connection.pipeline()
+        for leaderboard_name in leaderboards:
+            self._write_members_in(
+                leaderboard_name, [('rank', member, score, member_data)], client=pipeline)
+        pipeline.execute()
+
+    def remove_member_from(self, leaderboard_name, member):
+        '''
+        Remove a member and its optional member data from every slot of the current window
+        of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        self._write_members_in(
+            leaderboard_name, [('remove', member, 0, None)])
+
+    def total_members_in(self, leaderboard_name):
+        '''
+        Retrieve the total number of members in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @return the total number of members in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).total_members_in(
+            self._window_for(leaderboard_name))
+
+    def total_pages_in(self, leaderboard_name, page_size=None):
+        '''
+        Retrieve the total number of pages in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param page_size [int, nil] Page size to be used when calculating the total number of pages.
+        @return the total number of pages in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).total_pages_in(
+            self._window_for(leaderboard_name), page_size)
+
+    def total_members_in_score_range_in(self, leaderboard_name, min_score, max_score):
+        '''
+        Retrieve the total members in a given score range from the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return the total members in the score range of the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).total_members_in_score_range_in(
+            self._window_for(leaderboard_name), min_score, max_score)
+
+    def total_scores_in(self, leaderboard_name):
+        '''
+        Sum of scores for all members in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @return the sum of scores in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).total_scores_in(
+            self._window_for(leaderboard_name))
+
+    def aggregates_in(self, leaderboard_name):
+        '''
+        Aggregate statistics of the scores of all members in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @return the aggregates of the window, as returned by +Leaderboard.aggregates_in+.
+        '''
+        return super(SlidingWindowLeaderboard, self).aggregates_in(
+            self._window_for(leaderboard_name))
+
+    def aggregates_for_score_range_in(self, leaderboard_name, min_score, max_score):
+        '''
+        Aggregate statistics of the scores of the members in a given score range of the current window
+        of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param min_score [float] Minimum score.
+        @param max_score [float] Maximum score.
+        @return the aggregates of the score range of the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).aggregates_for_score_range_in(
+            self._window_for(leaderboard_name), min_score, max_score)
+
+    def aggregates_for_rank_range_in(self, leaderboard_name, starting_rank, ending_rank):
+        '''
+        Aggregate statistics of the scores of the members in a given rank range of the current window
+        of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param starting_rank [int] Starting rank (inclusive).
+        @param ending_rank [int] Ending rank (inclusive).
+        @return the aggregates of the rank range of the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).aggregates_for_rank_range_in(
+            self._window_for(leaderboard_name), starting_rank, ending_rank)
+
+    def check_member_in(self, leaderboard_name, member):
+        '''
+        Check to see if a member exists in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @return +true+ if the member exists in the window, +false+ otherwise.
+        '''
+        return super(SlidingWindowLeaderboard, self).check_member_in(
+            self._window_for(leaderboard_name), member)
+
+    def rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the rank for a member in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @return the rank for a member in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).rank_for_in(
+            self._window_for(leaderboard_name), member)
+
+    def score_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score for a member in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @return the score for a member in the window, or +None+ if the member is not in it.
+        '''
+        return super(SlidingWindowLeaderboard, self).score_for_in(
+            self._window_for(leaderboard_name), member)
+
+    def score_and_rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score and rank for a member in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @return the score and rank for a member in the window as a Hash.
+        '''
+        return super(SlidingWindowLeaderboard, self).score_and_rank_for_in(
+            self._window_for(leaderboard_name), member)
+
+    def page_for_in(self, leaderboard_name, member, page_size=Leaderboard.DEFAULT_PAGE_SIZE):
+        '''
+        Determine the page where a member falls in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @param page_size [int] Page size to be used in determining page location.
+        @return the page where a member falls in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).page_for_in(
+            self._window_for(leaderboard_name), member, page_size)
+
+    def percentile_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the percentile for a member in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @return the percentile for a member in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).percentile_for_in(
+            self._window_for(leaderboard_name), member)
+
+    def score_for_percentile_in(self, leaderboard_name, percentile):
+        '''
+        Calculate the score for a given percentile value in the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param percentile [float] Percentile value (0.0 to 100.0 inclusive).
+        @return the score corresponding to the percentile in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).score_for_percentile_in(
+            self._window_for(leaderboard_name), percentile)
+
+    def leaders_in(self, leaderboard_name, current_page, **options):
+        '''
+        Retrieve a page of leaders from the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param current_page [int] Page to retrieve from the window.
+        @param options [Hash] Options to be used when retrieving the page.
+        @return a page of leaders from the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).leaders_in(
+            self._window_for(leaderboard_name), current_page, **options)
+
+    def all_leaders_from(self, leaderboard_name, **options):
+        '''
+        Retrieves all leaders from the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param options [Hash] Options to be used when retrieving the leaders.
+        @return the leaders of the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).all_leaders_from(
+            self._window_for(leaderboard_name), **options)
+
+    def members_from_score_range_in(
+            self, leaderboard_name, minimum_score, maximum_score, **options):
+        '''
+        Retrieve members from the current window of the named leaderboard within a given score range.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param minimum_score [float] Minimum score (inclusive).
+        @param maximum_score [float] Maximum score (inclusive).
+        @param options [Hash] Options to be used when retrieving the data.
+        @return members from the window that fall within the given score range.
+        '''
+        return super(SlidingWindowLeaderboard, self).members_from_score_range_in(
+            self._window_for(leaderboard_name), minimum_score, maximum_score, **options)
+
+    def members_from_rank_range_in(self, leaderboard_name, starting_rank, ending_rank, **options):
+        '''
+        Retrieve members from the current window of the named leaderboard within a given rank range.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param starting_rank [int] Starting rank (inclusive).
+        @param ending_rank [int] Ending rank (inclusive).
+        @param options [Hash] Options to be used when retrieving the data.
+        @return members from the window that fall within the given rank range.
+        '''
+        return super(SlidingWindowLeaderboard, self).members_from_rank_range_in(
+            self._window_for(leaderboard_name), starting_rank, ending_rank, **options)
+
+    def top_in(self, leaderboard_name, number, **options):
+        '''
+        Retrieve members from the current window of the named leaderboard within a range from 1 to the
+        number given.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param number [int] Rank limit.
+        @param options [Hash] Options to be used when retrieving the data.
+        @return the top members of the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).top_in(
+            self._window_for(leaderboard_name), number, **options)
+
+    def member_at_in(self, leaderboard_name, position, **options):
+        '''
+        Retrieve a member at the specified index from the current window of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param position [int] Position in the window.
+        @param options [Hash] Options to be used when retrieving the member.
+        @return a page of leaders containing the member at the position, or +None+.
+        '''
+        return super(SlidingWindowLeaderboard, self).member_at_in(
+            self._window_for(leaderboard_name), position, **options)
+
+    def around_me_in(self, leaderboard_name, member, **options):
+        '''
+        Retrieve a page of leaders from the current window of the named leaderboard around a given member.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param member [String] Member name.
+        @param options [Hash] Options to be used when retrieving the page.
+        @return a page of leaders around the member in the window.
+        '''
+        return super(SlidingWindowLeaderboard, self).around_me_in(
+            self._window_for(leaderboard_name), member, **options)
+
+    def ranked_in_list_in(self, leaderboard_name, members, **options):
+        '''
+        Retrieve a page of leaders from the current window of the named leaderboard for a given list
+        of members.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param members [Array] Member names.
+        @param options [Hash] Options to be used when retrieving the page.
+        @return a page of leaders from the window for the given list of members.
+        '''
+        return super(SlidingWindowLeaderboard, self).ranked_in_list_in(
+            self._window_for(leaderboard_name), members, **options)
+
+    def rank_member_if_in(
+            self, leaderboard_name, rank_conditional, member, score, member_data=None):
+        '''
+        Not supported, as the window has no scores of its own to compare with.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('rank_member_if_in is not supported by sliding window leaderboards')
+
+    def remove_members_in_score_range_in(self, leaderboard_name, min_score, max_score):
+        '''
+        Not supported, as the window has no scores of its own to remove.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('remove_members_in_score_range_in is not supported by sliding window leaderboards')
+
+    def remove_members_outside_rank_in(self, leaderboard_name, rank):
+        '''
+        Not supported, as the window has no scores of its own to remove.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('remove_members_outside_rank_in is not supported by sliding window leaderboards')
+
+    def rebuild_aggregates_in(self, leaderboard_name):
+        '''
+        Not supported, as sliding window leaderboards do not track aggregates.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('rebuild_aggregates_in is not supported by sliding window leaderboards')
+
+    def expire_leaderboard_for(self, leaderboard_name, seconds):
+        '''
+        Not supported, as the slots and window of the leaderboard already expire as the window moves.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('expire_leaderboard_for is not supported by sliding window leaderboards')
+
+    def expire_leaderboard_at_for(self, leaderboard_name, timestamp):
+        '''
+        Not supported, as the slots and window of the leaderboard already expire as the window moves.
+
+        @raise ValueError always.
+        '''
+        raise ValueError('expire_leaderboard_at_for is not supported by sliding window leaderboards')
+
+    def _change_scores_in(self, leaderboard_name, changes, pipeline=None):
+        '''
+        Change the scores of members in the current slot of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param changes [Array] (member, delta, member_data) tuples.
+        @param pipeline Pipeline to queue the changes on. If +None+, the changes are written immediately.
+        '''
+        self._write_members_in(
+            leaderboard_name,
+            [('change', member, delta, member_data) for member, delta, member_data in changes],
+            client=pipeline)
+
+    def _rank_chunk_in(self, pipeline, leaderboard_name, chunk):
+        '''
+        Queue the writes for a chunk of members to the current slot of the named leaderboard on a pipeline.
+
+        @param pipeline Redis pipeline.
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk [Array] (member, score, member_data) tuples.
+        '''
+        self._write_members_in(
+            leaderboard_name,
+            [('rank', member, score, member_data) for member, score, member_data in chunk],
+            client=pipeline)
+
+    def _write_members_in(self, leaderboard_name, writes, client=None):
+        '''
+        Apply writes to the current slot and union of the named leaderboard with a single script call.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param writes [Array] (operation, member, score or delta, member_data) tuples.
+        @param client Pipeline to queue the script call on, or +None+ to run it immediately.
+        '''
+        slot = self._slot()
+        args = [
+            self.aggregate.lower(),
+            (slot + self.window) * self.slot_seconds,
+            self._window_expires_at(slot)]
+        for operation, member, value, member_data in writes:
+            args.extend([operation, member, value, member_data or ''])
+
+        keys = [
+            self._window_key(leaderboard_name, slot),
+            self._member_data_key(leaderboard_name)] + self._slot_keys(leaderboard_name, slot)
+        self._write_in(
+            keys[0],
+            lambda client: self._script(scripts.SLIDING_WINDOW_WRITE)(
+                keys=keys,
+                args=args,
+                client=client),
+            client)
+
+    def _iter_pages_from(self, leaderboard_name, chunk_size, **options):
+        '''
+        Iterate over all leaders of the current window of the named leaderboard, one window of
+        +chunk_size+ ranks at a time.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @param chunk_size [int] Number of leaders fetched in each round trip.
+        @param options [Hash] Options to be used when retrieving the leaders.
+        @return a generator of pages of leaders.
+        '''
+        return super(SlidingWindowLeaderboard, self)._iter_pages_from(
+            self._window_for(leaderboard_name), chunk_size, **options)
+
+    def _member_data_key(self, leaderboard_name):
+        '''
+        Key for retrieving optional member data. Windows share the member data of their leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a key in the form of +leaderboard_name:member_data+
+        '''
+        if self._is_window(leaderboard_name):
+            leaderboard_name = leaderboard_name.rpartition(':window:')[0]
+
+        return super(SlidingWindowLeaderboard, self)._member_data_key(leaderboard_name)
+
+    def _window_for(self, leaderboard_name):
+        '''
+        Name of the window to read for the named leaderboard, which may already be a window.
+
+        @param leaderboard_name [String] Name of the leaderboard or of one of its windows.
+        @return the name of the window leaderboard.
+        '''
+        if self._is_window(leaderboard_name):
+            return leaderboard_name
+
+        return self.window_name_in(leaderboard_name)
+
+    def _is_window(self, leaderboard_name):
+        head, separator, version = leaderboard_name.rpartition(':window:')
+        return bool(separator) and version.isdigit()
+
+    def _window_key(self, leaderboard_name, slot):
+        return '%s:window:%s' % (self._hash_tagged(leaderboard_name), slot)
+
+    def _window_expires_at(self, slot):
+        return (slot + 2) * self.slot_seconds
+
+    def _slot_keys(self, leaderboard_name, slot):
+        '''
+        Keys of the slots covered by the window ending with a slot, newest first.
+        '''
+        return [
+            '%s:slot:%s' % (self._hash_tagged(leaderboard_name), slot - ago)
+            for ago in range(self.window)]
+
+    def _slot(self):
+        return int(self.clock() // self.slot_seconds)
+
@@ -0,0 +1,134 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class LeaderboardSnapshot(object):
+    '''
+    Copy of a whole leaderboard as NumPy arrays, in leaderboard order, as returned by
+    +snapshot_arrays+: +members+ (an object array of member names), +scores+ (float64)
+    and +ranks+ (int64). The helpers below answer analytics queries over the snapshot
+    with vectorized operations instead of a loop over every leader.
+    '''
+
+    def __init__(self, members, scores, ranks, order='desc', dense_ranks=False):
+        '''
+        Create a snapshot.
+
+        @param members Member names in leaderboard order.
+        @param scores Scores of the members.
+        @param ranks Ranks of the members.
+        @param order [String] Order of the leaderboard, 'desc' or 'asc'.
+        @param dense_ranks [boolean] Whether members sharing a score share a rank and the
+          next score gets the next rank, as with +TieRankingLeaderboard+.
+        '''
+        if numpy is None:
+            raise ImportError('LeaderboardSnapshot needs numpy')
+
+        self.members = numpy.asarray(members, dtype=object)
+        self.scores = numpy.asarray(scores, dtype=numpy.float64)
+        self.ranks = numpy.asarray(ranks, dtype=numpy.int64)
+        self.order = order
+        self.dense_ranks = dense_ranks
+        self._ascending_scores = None
+
+    def __len__(self):
+        return len(self.members)
+
+    def percentile_table(self, percentiles=(0, 25, 50, 75, 90, 95, 99, 100)):
+        '''
+        Score at each of the given percentiles, interpolated as +score_for_percentile+ does.
+
+        @param percentiles Percentile values (0.0 to 100.0 inclusive).
+        @return a float64 array of scores, or +None+ for an empty snapshot.
+        '''
+        if not len(self.scores):
+            return None
+
+        percentiles = numpy.asarray(percentiles, dtype=numpy.float64)
+        if self.order == 'asc':
+            percentiles = 100 - percentiles
+
+        return numpy.percentile(self.scores, percentiles)
+
+    def histogram(self, bins=10, range=None):
+        '''
+        Histogram of the scores, see +numpy.histogram+.
+
+        @param bins [int] Number of equal-width bins, or an array of bin edges.
+        @param range Lower and upper edges of the bins, the lowest and highest scores by default.
+        @return the count of scores in each bin and the bin edges.
+        '''
+        return numpy.histogram(self.scores, bins=bins, range=range)
+
+    def ranks_for(self, scores):
+        '''
+        Rank a member would have with each of the given scores: one more than the number
+        of members ahead of it, or of distinct scores ahead of it with dense ranks. A score
+        held by members gets the rank of the first of them.
+
+        @param scores Array of scores.
+        @return an int64 array of ranks.
+        '''
+        ascending = self._ascending()
+        scores = numpy.asarray(scores, dtype=numpy.float64)
+        if self.order == 'asc':
+            ahead = numpy.searchsorted(ascending, scores, side='left')
+        else:
+            ahead = len(ascending) - numpy.searchsorted(ascending, scores, side='right')
+
+        return ahead.astype(numpy.int64) + 1
+
+    def _ascending(self):
+        '''
+        Scores in ascending order, distinct with dense ranks, sorted once per snapshot.
+        '''
+        if self._ascending_scores is None:
+            if self.dense_ranks:
+                self._ascending_scores = numpy.unique(self.scores)
+            elif self.order == 'asc':
+                self._ascending_scores = self.scores
+            else:
+                self._ascending_scores = self.scores[::-1]
+        return self._ascending_scores
+
+
+class SnapshotBuilder(object):
+    '''
+    Accumulate pages of leaders in the +columnar+ result format into the arrays of a
+    +LeaderboardSnapshot+, one page at a time.
+    '''
+
+    def __init__(self):
+        if numpy is None:
+            raise ImportError('snapshot_arrays needs numpy')
+
+        self._members = []
+        self._scores = []
+        self._ranks = []
+
+    def add(self, columns):
+        '''
+        Add a page of leaders.
+
+        @param columns [LeaderColumns] Page of leaders in the +columnar+ result format.
+        '''
+        self._members.extend(columns.members)
+        self._scores.append(numpy.frombuffer(columns.scores, dtype=numpy.float64))
+        self._ranks.append(numpy.array(columns.ranks, dtype=numpy.int64))
+
+    def build(self, order='desc', dense_ranks=False):
+        '''
+        Snapshot of the pages added so far.
+
+        @param order [String] Order of the leaderboard, 'desc' or 'asc'.
+        @param dense_ranks [boolean] Whether the leaderboard gives dense ranks.
+        @return a +LeaderboardSnapshot+.
+        '''
+        return LeaderboardSnapshot(
+            self._members,
+            numpy.concatenate(self._scores) if self._scores else numpy.empty(0, dtype=numpy.float64),
+            numpy.concatenate(self._ranks) if self._ranks else numpy.empty(0, dtype=numpy.int64),
+            order,
+            dense_ranks)
@@ -1,11 +1,13 @@
 from .leaderboard import Leaderboard
-from .leaderboard import grouper
+from .leaderboard import chunked_members
+from . import scripts
 from redis import StrictRedis, Redis, ConnectionPool
 import math
 
 
 class TieRankingLeaderboard(Leaderboard):
     DEFAULT_TIES_NAMESPACE = 'ties'
+    DENSE_RANKS = True
 
     def __init__(self, leaderboard_name, **options):
         '''
@@ -36,45 +38,14 @@ class TieRankingLeaderboard(Leaderboard):
 
         @param leaderboard_name [String] Name of the leaderboard.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.delete(leaderboard_name)
-        pipeline.delete(self._member_data_key(leaderboard_name))
-        pipeline.delete(self._ties_leaderboard_key(leaderboard_name))
+        self._settle_pending_in(leaderboard_name, drop=True)
+        keys = self._stored_keys_for(leaderboard_name)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.delete(key)
+        self._drop_version_in(leaderboard_name, pipeline)
         pipeline.execute()
 
-    def change_score_for_member_in(self, leaderboard_name, member, delta, member_data=None):
-        '''
-        Change the score for a member in the named leaderboard by a delta which can be positive or negative.
-
-        @param leaderboard_name [String] Name of the leaderboard.
-        @param member [String] Member name.
-        @param delta [float] Score change.
-        @param member_data [String] Optional member data.
-        '''
-        previous_score = self.score_for(member)
-        new_score = (previous_score or 0) + delta
-
-        total_members_at_previous_score = []
-        if previous_score is not None:
-            total_members_at_previous_score = self.redis_connection.zrevrangebyscore(leaderboard_name, previous_score, previous_score)
-
-        pipeline = self.redis_connection.pipeline()
-        if isinstance(self.redis_connection, Redis):
-            pipeline.zadd(leaderboard_name, member, new_score)
-            pipeline.zadd(self._ties_leaderboard_key(leaderboard_name), str(float(new_score)), new_score)
-        else:
-            pipeline.zadd(leaderboard_name, new_score, member)
-            pipeline.zadd(self._ties_leaderboard_key(leaderboard_name), new_score, str(float(new_score)))
-        if member_data:
-            pipeline.hset(
-                self._member_data_key(leaderboard_name),
-                member,
-                member_data)
-        pipeline.execute()
-
-        if len(total_members_at_previous_score) == 1:
-            self.redis_connection.zrem(self._ties_leaderboard_key(leaderboard_name), str(float(previous_score)))
-
     def rank_member_in(
             self, leaderboard_name, member, score, member_data=None):
         '''
@@ -85,29 +56,9 @@ class TieRankingLeaderboard(Leaderboard):
         @param score [float] Member score.
         @param member_data [String] Optional member data.
         '''
-        member_score = None or self.redis_connection.zscore(leaderboard_name, member)
-        can_delete_score = member_score is not None and\
-            (len(self.members_from_score_range_in(leaderboard_name, member_score, member_score)) == 1) and\
-            member_score != score
-
-        pipeline = self.redis_connection.pipeline()
-        if isinstance(self.redis_connection, Redis):
-            pipeline.zadd(leaderboard_name, member, score)
-            pipeline.zadd(self._ties_leaderboard_key(leaderboard_name),
-                          str(float(score)), score)
-        else:
-            pipeline.zadd(leaderboard_name, score, member)
-            pipeline.zadd(self._ties_leaderboard_key(leaderboard_name),
-                          score, str(float(score)))
-        if can_delete_score:
-            pipeline.zrem(self._ties_leaderboard_key(leaderboard_name),
-                          str(float(member_score)))
-        if member_data:
-            pipeline.hset(
-                self._member_data_key(leaderboard_name),
-                member,
-                member_data)
-        pipeline.execute()
+        self._settle_pending_in(leaderboard_name, [member])
+        self._write_members_in(
+            leaderboard_name, [('rank', member, score, member_data)])
 
     def rank_member_across(
             self, leaderboards, member, score, member_data=None):
@@ -120,17 +71,39 @@ class TieRankingLeaderboard(Leaderboard):
         @param member_data [String] Optional member data.
         '''
         for leaderboard_name in leaderboards:
-            self.rank_member_in(leaderboard_name, member, score, member_data)
+            self._settle_pending_in(leaderboard_name, [member])
+        pipeline = self._pipeline_for(self._keys_for(leaderboards))
+        for leaderboard_name in leaderboards:
+            self._write_members_in(
+                leaderboard_name, [('rank', member, score, member_data)], client=pipeline)
+        pipeline.execute()
 
-    def rank_members_in(self, leaderboard_name, members_and_scores):
+    def rank_members_in(self, leaderboard_name, members_and_scores,
+                        chunk_size=Leaderboard.DEFAULT_CHUNK_SIZE, progress=None):
         '''
-        Rank an array of members in the named leaderboard.
+        Rank an array of members in the named leaderboard. Members are written in chunks,
+        each chunk updating the leaderboard, the ties leaderboard and the member data
+        atomically in a single round trip.
 
         @param leaderboard_name [String] Name of the leaderboard.
-        @param members_and_scores [Array] Variable list of members and scores.
+        @param members_and_scores [Array] Variable list of members and scores, or an iterable of
+          (member, score) or (member, score, member_data) tuples.
+        @param chunk_size [int] Maximum number of members written in each round trip.
+        @param progress [function] Optional function called with the number of members ranked so far after each chunk.
+        @return the number of members ranked.
         '''
-        for member, score in grouper(2, members_and_scores):
-            self.rank_member_in(leaderboard_name, member, score)
+        total = 0
+        for chunk in chunked_members(members_and_scores, chunk_size):
+            self._settle_pending_in(leaderboard_name, [member for member, score, member_data in chunk])
+            self._write_members_in(
+                leaderboard_name,
+                [('rank', member, score, member_data) for member, score, member_data in chunk])
+
+            total += len(chunk)
+            if progress is not None:
+                progress(total)
+
+        return total
 
     def remove_member_from(self, leaderboard_name, member):
         '''
@@ -139,18 +112,9 @@ class TieRankingLeaderboard(Leaderboard):
         @param leaderboard_name [String] Name of the leaderboard.
         @param member [String] Member name.
         '''
-        member_score = None or self.redis_connection.zscore(
-            leaderboard_name, member)
-        can_delete_score = member_score and len(
-            self.members_from_score_range_in(leaderboard_name, member_score, member_score)) == 1
-
-        pipeline = self.redis_connection.pipeline()
-        pipeline.zrem(leaderboard_name, member)
-        if can_delete_score:
-            pipeline.zrem(self._ties_leaderboard_key(leaderboard_name),
-                          str(float(member_score)))
-        pipeline.hdel(self._member_data_key(leaderboard_name), member)
-        pipeline.execute()
+        self._settle_pending_in(leaderboard_name, [member], drop=True)
+        self._write_members_in(
+            leaderboard_name, [('remove', member, 0, None)])
 
     def rank_for_in(self, leaderboard_name, member):
         '''
@@ -160,19 +124,18 @@ class TieRankingLeaderboard(Leaderboard):
         @param member [String] Member name.
         @return the rank for a member in the leaderboard.
         '''
-        member_score = self.score_for_in(leaderboard_name, member)
-        if self.order == self.ASC:
-            try:
-                return self.redis_connection.zrank(
-                    self._ties_leaderboard_key(leaderboard_name), str(float(member_score))) + 1
-            except:
-                return None
-        else:
-            try:
-                return self.redis_connection.zrevrank(
-                    self._ties_leaderboard_key(leaderboard_name), str(float(member_score))) + 1
-            except:
-                return None
+        return self.ranked_in_list_in(
+            leaderboard_name, [member])[0][self.RANK_KEY]
+
+    def score_and_rank_for_in(self, leaderboard_name, member):
+        '''
+        Retrieve the score and rank for a member in the named leaderboard.
+
+        @param leaderboard_name [String]Name of the leaderboard.
+        @param member [String] Member name.
+        @return the score and rank for a member in the named leaderboard as a Hash.
+        '''
+        return self.ranked_in_list_in(leaderboard_name, [member])[0]
 
     def remove_members_in_score_range_in(
             self, leaderboard_name, min_score, max_score):
@@ -183,11 +146,18 @@ class TieRankingLeaderboard(Leaderboard):
         @param min_score [float] Minimum score.
         @param max_score [float] Maximum score.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.zremrangebyscore(
-            leaderboard_name,
-            min_score,
-            max_score)
+        self._settle_pending_in(leaderboard_name)
+        pipeline = self._pipeline_for(
+            self._keys_for([leaderboard_name]) + [self._ties_leaderboard_key(leaderboard_name)])
+        if self.track_aggregates:
+            self._remove_range_in(
+                leaderboard_name, 'score', min_score, max_score, client=pipeline)
+        else:
+            pipeline.zremrangebyscore(
+                leaderboard_name,
+                min_score,
+                max_score)
+            self._bump_version_in(leaderboard_name, pipeline)
         pipeline.zremrangebyscore(
             self._ties_leaderboard_key(leaderboard_name),
             min_score,
@@ -196,33 +166,38 @@ class TieRankingLeaderboard(Leaderboard):
 
     def expire_leaderboard_for(self, leaderboard_name, seconds):
         '''
-        Expire the given leaderboard in a set number of seconds. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the given leaderboard in a set number of seconds, along with its ties
+        leaderboard, its member data, its tracked aggregates with the +track_aggregates+
+        option and its version with the page cache. With the +global_member_data+ option
+        the shared member data expires too.
 
         @param leaderboard_name [String] Name of the leaderboard.
         @param seconds [int] Number of seconds after which the leaderboard will be expired.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.expire(leaderboard_name, seconds)
-        pipeline.expire(self._ties_leaderboard_key(leaderboard_name), seconds)
-        pipeline.expire(self._member_data_key(leaderboard_name), seconds)
+        keys = self._keys_for([leaderboard_name]) + [
+            self._ties_leaderboard_key(leaderboard_name)]
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expire(key, seconds)
+        self._bump_version_in(leaderboard_name, pipeline, seconds=seconds)
         pipeline.execute()
 
     def expire_leaderboard_at_for(self, leaderboard_name, timestamp):
         '''
-        Expire the given leaderboard at a specific UNIX timestamp. Do not use this with
-        leaderboards that utilize member data as there is no facility to cascade the
-        expiration out to the keys for the member data.
+        Expire the given leaderboard at a specific UNIX timestamp, along with its ties
+        leaderboard, its member data, its tracked aggregates with the +track_aggregates+
+        option and its version with the page cache. With the +global_member_data+ option
+        the shared member data expires too.
 
         @param leaderboard_name [String] Name of the leaderboard.
         @param timestamp [int] UNIX timestamp at which the leaderboard will be expired.
         '''
-        pipeline = self.redis_connection.pipeline()
-        pipeline.expireat(leaderboard_name, timestamp)
-        pipeline.expireat(
-            self._ties_leaderboard_key(leaderboard_name), timestamp)
-        pipeline.expireat(self._member_data_key(leaderboard_name), timestamp)
+        keys = self._keys_for([leaderboard_name]) + [
+            self._ties_leaderboard_key(leaderboard_name)]
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.expireat(key, timestamp)
+        self._bump_version_in(leaderboard_name, pipeline, timestamp=timestamp)
         pipeline.execute()
 
     def ranked_in_list_in(self, leaderboard_name, members, **options):
@@ -235,68 +210,161 @@ class TieRankingLeaderboard(Leaderboard):
         @return a page of leaders from the named leaderboard for a given list of members.
         '''
         ranks_for_members = []
+        if not members:
+            return ranks_for_members
 
-        pipeline = self.redis_connection.pipeline()
-
-        for member in members:
-            if self.order == self.ASC:
-                pipeline.zrank(leaderboard_name, member)
-            else:
-                pipeline.zrevrank(leaderboard_name, member)
-
-            pipeline.zscore(leaderboard_name, member)
+        with_member_data = ('with_member_data' in options) and (True == options['with_member_data'])
 
-        responses = pipeline.execute()
+        responses = self._script(scripts.RANKED_IN_LIST)(
+            keys=[
+                leaderboard_name,
+                self._ties_leaderboard_key(leaderboard_name),
+                self._member_data_key(leaderboard_name)],
+            args=[self.order, int(with_member_data)] + list(members),
+            client=self._reader())
 
         for index, member in enumerate(members):
             data = {}
             data[self.MEMBER_KEY] = member
 
-            score = responses[index * 2 + 1]
+            score = responses[0][index]
             if score is not None:
                 score = float(score)
             data[self.SCORE_KEY] = score
 
-            if self.order == self.ASC:
-                data[self.RANK_KEY] = self.redis_connection.zrank(
-                    self._ties_leaderboard_key(leaderboard_name), str(data[self.SCORE_KEY]))
-            else:
-                data[self.RANK_KEY] = self.redis_connection.zrevrank(
-                    self._ties_leaderboard_key(leaderboard_name), str(data[self.SCORE_KEY]))
-            if data[self.RANK_KEY] is not None:
-                data[self.RANK_KEY] += 1
-            else:
+            data[self.RANK_KEY] = responses[1][index]
+            if data[self.RANK_KEY] is None:
                 if not options.get('include_missing', True):
                     continue
 
-            ranks_for_members.append(data)
+            if with_member_data:
+                data[self.MEMBER_DATA_KEY] = responses[2][index]
 
-        if ('with_member_data' in options) and (True == options['with_member_data']):
-            for index, member_data in enumerate(self.members_data_for_in(leaderboard_name, members)):
-                try:
-                    ranks_for_members[index][self.MEMBER_DATA_KEY] = member_data
-                except:
-                    pass
+            ranks_for_members.append(data)
 
         if 'sort_by' in options:
-            if self.RANK_KEY == options['sort_by']:
-                ranks_for_members = sorted(
-                    ranks_for_members,
-                    key=lambda member: member[
-                        self.RANK_KEY])
-            elif self.SCORE_KEY == options['sort_by']:
-                ranks_for_members = sorted(
-                    ranks_for_members,
-                    key=lambda member: member[
-                        self.SCORE_KEY])
+            ranks_for_members = self._sort_members(
+                ranks_for_members, options['sort_by'])
 
         return ranks_for_members
 
+    def _slice_rank_key(self, leaderboard_name):
+        '''
+        Key of the sorted set used to count the members ranked ahead of a page.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return the ties leaderboard key.
+        '''
+        return self._ties_leaderboard_key(leaderboard_name)
+
+    def _ranks_for_slice(self, offset, ahead, scores):
+        '''
+        Ranks for a contiguous slice of the leaderboard. Members with the same score
+        share a rank and the next distinct score takes the following rank.
+
+        @param offset [int] Zero-based position of the first member of the slice.
+        @param ahead [int] Distinct scores ranked ahead of the first member.
+        @param scores [Array] Scores of the members in the slice, in leaderboard order.
+        @return a list of ranks.
+        '''
+        ranks = []
+        rank = ahead + 1
+        for index, score in enumerate(scores):
+            if index > 0 and score != scores[index - 1]:
+                rank += 1
+            ranks.append(rank)
+
+        return ranks
+
+    def _change_scores_in(self, leaderboard_name, changes, pipeline=None):
+        '''
+        Change the scores of members in the named leaderboard and the ties leaderboard
+        atomically, in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param changes [Array] (member, delta, member_data) tuples.
+        @param pipeline Pipeline to queue the changes on. If +None+, the changes are written immediately.
+        '''
+        self._write_members_in(
+            leaderboard_name,
+            [('change', member, delta, member_data) for member, delta, member_data in changes],
+            client=pipeline)
+
+    def _rank_member_if_mode_in(
+            self, leaderboard_name, mode, member, score, member_data=None):
+        '''
+        Rank a member in the named leaderboard and the ties leaderboard if the conditional
+        mode allows it, atomically in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] Conditional mode.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        @return +True+ if the member was ranked, +False+ otherwise.
+        '''
+        return self._write_members_in(
+            leaderboard_name, [(mode, member, score, member_data)]) is not None
+
+    def _rank_chunk_in(self, pipeline, leaderboard_name, chunk):
+        '''
+        Queue the writes for a chunk of members to the named leaderboard and the ties
+        leaderboard on a pipeline, as a single script call.
+
+        @param pipeline Redis pipeline.
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk [Array] (member, score, member_data) tuples.
+        '''
+        self._write_members_in(
+            leaderboard_name,
+            [('rank', member, score, member_data) for member, score, member_data in chunk],
+            client=pipeline)
+
+    def _write_members_in(self, leaderboard_name, writes, client=None):
+        '''
+        Rank, change the score of or remove members in the named leaderboard, the ties
+        leaderboard and the tracked aggregates atomically, in a single round trip.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param writes [Array] (operation, member, value, member_data) tuples applied in order. The
+          operation is one of 'rank', 'change' or 'remove' and the value is the member score for
+          'rank' or the score change for 'change'.
+        @param client Redis connection or pipeline to run the script on.
+        @return the new score for the last member written.
+        '''
+        args = []
+        for operation, member, value, member_data in writes:
+            args.extend([operation, member, value, member_data or ''])
+
+        keys = [
+            leaderboard_name,
+            self._ties_leaderboard_key(leaderboard_name),
+            self._member_data_key(leaderboard_name)]
+        if self.track_aggregates:
+            keys.append(self._aggregates_key(leaderboard_name))
+
+        return self._write_in(
+            leaderboard_name,
+            lambda client: self._script(scripts.TIE_WRITE)(
+                keys=keys,
+                args=args,
+                client=client),
+            client)
+
+    def _stored_keys_for(self, leaderboard_name):
+        '''
+        All keys stored for a leaderboard, including its ties leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a list of keys.
+        '''
+        return self._keys_for([leaderboard_name]) + [self._ties_leaderboard_key(leaderboard_name)]
+
     def _ties_leaderboard_key(self, leaderboard_name):
         '''
         Key for ties leaderboard.
 
         @param leaderboard_name [String] Name of the leaderboard.
-        @return a key in the form of +leaderboard_name:ties_namespace+
+        @return a key in the form of +leaderboard_name:ties_namespace+, or +{leaderboard_name}:ties_namespace+ in cluster mode.
         '''
-        return '%s:%s' % (leaderboard_name, self.ties_namespace)
+        return '%s:%s' % (self._hash_tagged(leaderboard_name), self.ties_namespace)
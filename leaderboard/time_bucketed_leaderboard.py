@@ -0,0 +1,381 @@
+from .leaderboard import Leaderboard
+from datetime import datetime, timedelta
+import calendar
+import time
+try:
+    from datetime import timezone
+except ImportError:
+    timezone = None
+
+
+class TimeBucketedLeaderboard(Leaderboard):
+    '''
+    Leaderboard that also keeps a leaderboard per day, week and month. Every write to
+    the leaderboard is applied to the current bucket of each period in the same round
+    trip, and buckets expire once they are older than the retention of their period. The
+    leaderboard itself holds the all-time scores, and its member data is shared by its
+    buckets and windows.
+
+    Buckets are named +leaderboard_name:period:bucket+, e.g. +highscores:daily:2026-10-16+,
+    +highscores:weekly:2026-W42+ or +highscores:monthly:2026-10+, and periods start at
+    midnight UTC (on Monday for weeks).
+
+    Windows over several buckets combine the scores of a member in each bucket with the
+    +aggregate+ option: 'SUM' suits scores built up with +change_score_for+, while 'MAX'
+    (or 'MIN' for an ascending leaderboard) suits scores set with +rank_member+, which
+    writes the member's absolute score to every current bucket.
+    '''
+    DAILY = 'daily'
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    DEFAULT_PERIODS = [DAILY, WEEKLY, MONTHLY]
+    DEFAULT_RETENTION = {DAILY: 31, WEEKLY: 5, MONTHLY: 13}
+    DEFAULT_WINDOW_TTL = 60
+    DEFAULT_AGGREGATE = 'SUM'
+
+    def __init__(self, leaderboard_name, **options):
+        '''
+        Initialize a connection to a specific time bucketed leaderboard.
+
+        The options are the same as for +Leaderboard+, plus:
+
+        periods : periods to keep buckets for ([DAILY, WEEKLY, MONTHLY])
+        retention : number of buckets kept per period, including the current one ({DAILY: 31, WEEKLY: 5, MONTHLY: 13})
+        window_ttl : seconds a union of several buckets is reused before it is rebuilt (60)
+        aggregate : how the scores of a member in several buckets are combined, 'SUM', 'MIN' or 'MAX' ('SUM')
+        clock : function returning the current UNIX timestamp (time.time)
+        '''
+        self.options = options
+        self.periods = list(self.options.pop('periods', self.DEFAULT_PERIODS))
+        for period in self.periods:
+            if period not in self.DEFAULT_PERIODS:
+                raise ValueError(
+                    "%s is not one of [%s]" % (period, ",".join(self.DEFAULT_PERIODS)))
+        self.retention = dict(self.DEFAULT_RETENTION)
+        self.retention.update(self.options.pop('retention', {}))
+        self.window_ttl = self.options.pop('window_ttl', self.DEFAULT_WINDOW_TTL)
+        self.aggregate = self.options.pop('aggregate', self.DEFAULT_AGGREGATE).upper()
+        if not self.aggregate in ['SUM', 'MIN', 'MAX']:
+            raise ValueError("%s is not one of [SUM,MIN,MAX]" % self.aggregate)
+        self.clock = self.options.pop('clock', time.time)
+
+        super(TimeBucketedLeaderboard, self).__init__(
+            leaderboard_name, **options)
+
+    def bucket_name(self, period, buckets_ago=0):
+        '''
+        Name of a bucket of the leaderboard.
+
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param buckets_ago [int] 0 for the current bucket, 1 for the previous one and so on.
+        @return the name of the bucket leaderboard.
+        '''
+        return self.bucket_name_in(self.leaderboard_name, period, buckets_ago)
+
+    def bucket_name_in(self, leaderboard_name, period, buckets_ago=0):
+        '''
+        Name of a bucket of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param buckets_ago [int] 0 for the current bucket, 1 for the previous one and so on.
+        @return the name of the bucket leaderboard.
+        '''
+        return self._bucket_name(
+            leaderboard_name, period, self._bucket_start(period, self._now(), -buckets_ago))
+
+    def window_name(self, period, buckets):
+        '''
+        Name of a leaderboard holding the aggregated scores of the current and previous
+        buckets of a period, e.g. the last 30 days.
+
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param buckets [int] Number of buckets, including the current one.
+        @return the name of the window leaderboard.
+        '''
+        return self.window_name_in(self.leaderboard_name, period, buckets)
+
+    def window_name_in(self, leaderboard_name, period, buckets):
+        '''
+        Name of a leaderboard holding the aggregated scores of the current and previous
+        buckets of a period of the named leaderboard. The union is stored for +window_ttl+
+        seconds and rebuilt by the first call after it expires. Windows aggregated other
+        than by sum are named with the aggregate, e.g. +highscores:daily:2026-10-16:last_7:max+.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param buckets [int] Number of buckets, including the current one.
+        @return the name of the window leaderboard.
+        '''
+        if buckets == 1:
+            return self.bucket_name_in(leaderboard_name, period)
+        if not 1 <= buckets <= self.retention[period]:
+            raise ValueError(
+                '%s buckets are retained for the %s period' % (self.retention[period], period))
+
+        window_name = '%s:last_%s' % (self.bucket_name_in(leaderboard_name, period), buckets)
+        if self.aggregate != 'SUM':
+            window_name = '%s:%s' % (window_name, self.aggregate.lower())
+        if not self.redis_connection.exists(window_name):
+            keys = [self.bucket_name_in(leaderboard_name, period, ago) for ago in range(buckets)]
+            pipeline = self._pipeline_for([window_name] + keys)
+            pipeline.zunionstore(window_name, keys, self.aggregate)
+            pipeline.expire(window_name, self.window_ttl)
+            self._bump_version_in(window_name, pipeline, seconds=self.window_ttl)
+            pipeline.execute()
+
+        return window_name
+
+    def leaders_for(self, period, current_page, buckets=1, **options):
+        '''
+        Retrieve a page of leaders from the current bucket, or from the current and previous
+        buckets, of a period.
+
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param current_page [int] Page to retrieve from the leaderboard.
+        @param buckets [int] Number of buckets, including the current one.
+        @param options [Hash] Options to be used when retrieving the page from the leaderboard.
+        @return a page of leaders from the bucket or window leaderboard.
+        '''
+        return self.leaders_in(
+            self.window_name(period, buckets), current_page, **options)
+
+    def delete_leaderboard_named(self, leaderboard_name):
+        '''
+        Delete the named leaderboard and its retained buckets.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        '''
+        names = [leaderboard_name] + self._retained_buckets(leaderboard_name)
+        keys = self._keys_for(names)
+        pipeline = self._pipeline_for(keys)
+        for key in keys:
+            pipeline.delete(key)
+        for name in names:
+            self._drop_version_in(name, pipeline)
+        pipeline.execute()
+
+    def rank_member_in(
+            self, leaderboard_name, member, score, member_data=None):
+        '''
+        Rank a member in the named leaderboard and its current buckets.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        self.rank_members_in(
+            leaderboard_name, [(member, score, member_data)])
+
+    def rank_member_across(
+            self, leaderboards, member, score, member_data=None):
+        '''
+        Rank a member across multiple leaderboards and their current buckets.
+
+        @param leaderboards [Array] Leaderboard names.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        '''
+        pipeline = self._pipeline_for(self._keys_for(leaderboards))
+        for leaderboard_name in leaderboards:
+            self._rank_chunk_in(
+                pipeline, leaderboard_name, [(member, score, member_data)])
+        pipeline.execute()
+
+    def remove_member_from(self, leaderboard_name, member):
+        '''
+        Remove a member and its optional member data from the named leaderboard and its
+        retained buckets.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        '''
+        names = [leaderboard_name] + self._retained_buckets(leaderboard_name)
+        pipeline = self._pipeline_for(self._keys_for(names))
+        for name in names:
+            if self.track_aggregates:
+                self._write_members_in(
+                    name, [('remove', member, 0, None)], client=pipeline)
+            else:
+                pipeline.zrem(name, member)
+                pipeline.hdel(self._member_data_key(name), member)
+                self._bump_version_in(name, pipeline)
+        pipeline.execute()
+
+    def _change_scores_in(self, leaderboard_name, changes, pipeline=None):
+        '''
+        Change the scores of members in the named leaderboard and its current buckets.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param changes [Array] (member, delta, member_data) tuples.
+        @param pipeline Pipeline to queue the changes on. If +None+, the changes are written immediately.
+        '''
+        execute = pipeline is None
+        if execute:
+            pipeline = self.redis_connection.pipeline()
+
+        super(TimeBucketedLeaderboard, self)._change_scores_in(
+            leaderboard_name, changes, pipeline)
+        # buckets share the member data written to the leaderboard
+        changes = [(member, delta, None) for member, delta, _ in changes]
+        for bucket_name, expire_at in self._current_buckets(leaderboard_name):
+            super(TimeBucketedLeaderboard, self)._change_scores_in(
+                bucket_name, changes, pipeline)
+            self._expire_bucket(pipeline, bucket_name, expire_at)
+
+        if execute:
+            pipeline.execute()
+
+    def _rank_chunk_in(self, pipeline, leaderboard_name, chunk):
+        '''
+        Queue the writes for a chunk of members to the named leaderboard and its current
+        buckets on a pipeline.
+
+        @param pipeline Redis pipeline.
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param chunk [Array] (member, score, member_data) tuples.
+        '''
+        super(TimeBucketedLeaderboard, self)._rank_chunk_in(
+            pipeline, leaderboard_name, chunk)
+        # buckets share the member data written to the leaderboard
+        chunk = [(member, score, None) for member, score, _ in chunk]
+        for bucket_name, expire_at in self._current_buckets(leaderboard_name):
+            super(TimeBucketedLeaderboard, self)._rank_chunk_in(
+                pipeline, bucket_name, chunk)
+            self._expire_bucket(pipeline, bucket_name, expire_at)
+
+    def _rank_member_if_mode_in(
+            self, leaderboard_name, mode, member, score, member_data=None):
+        '''
+        Rank a member in the named leaderboard and its current buckets if the conditional
+        mode allows it, in a single transaction. The mode is checked against the score of
+        the member in each of them, so that +KEEP_HIGHEST+ keeps the highest score of the
+        day in the daily bucket, and +ONLY_IF_NEW+ ranks the first score of the day.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param mode [String] Conditional mode.
+        @param member [String] Member name.
+        @param score [float] Member score.
+        @param member_data [String] Optional member data.
+        @return +True+ if the member was ranked in the leaderboard, +False+ otherwise.
+        '''
+        buckets = self._current_buckets(leaderboard_name)
+        pipeline = self._pipeline_for(
+            self._keys_for([leaderboard_name] + [bucket_name for bucket_name, _ in buckets]))
+        super(TimeBucketedLeaderboard, self)._rank_member_if_mode_in(
+            leaderboard_name, mode, member, score, member_data, client=pipeline)
+        for bucket_name, expire_at in buckets:
+            super(TimeBucketedLeaderboard, self)._rank_member_if_mode_in(
+                bucket_name, mode, member, score, client=pipeline)
+            self._expire_bucket(pipeline, bucket_name, expire_at)
+
+        ranked = pipeline.execute()[0]
+        if self.track_aggregates:
+            return ranked is not None
+
+        return ranked == 1
+
+    def _member_data_key(self, leaderboard_name):
+        '''
+        Key for retrieving optional member data. Buckets and windows share the member data
+        of their leaderboard, which holds the latest member data of every member.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a key in the form of +leaderboard_name:member_data+
+        '''
+        if self._is_window(leaderboard_name):
+            leaderboard_name = leaderboard_name.rpartition(':last_')[0]
+        if self._is_bucket(leaderboard_name):
+            leaderboard_name = leaderboard_name.rsplit(':', 2)[0]
+        return super(TimeBucketedLeaderboard, self)._member_data_key(leaderboard_name)
+
+    def _keys_for(self, leaderboard_names):
+        '''
+        Keys of the named leaderboards, see +Leaderboard._keys_for+, leaving out the member
+        data shared by buckets and windows, so that it is not expired or deleted with them.
+
+        @param leaderboard_names [Array] Leaderboard names.
+        @return a list of keys.
+        '''
+        keys = []
+        for leaderboard_name in leaderboard_names:
+            leaderboard_keys = super(TimeBucketedLeaderboard, self)._keys_for([leaderboard_name])
+            if self._is_bucket(leaderboard_name) or self._is_window(leaderboard_name):
+                leaderboard_keys.remove(self._member_data_key(leaderboard_name))
+            keys.extend(leaderboard_keys)
+
+        return keys
+
+    def _is_bucket(self, leaderboard_name):
+        parts = leaderboard_name.rsplit(':', 2)
+        return len(parts) == 3 and parts[1] in self.DEFAULT_PERIODS
+
+    def _is_window(self, leaderboard_name):
+        bucket_name, separator, suffix = leaderboard_name.rpartition(':last_')
+        buckets, _, aggregate = suffix.partition(':')
+        return (bool(separator) and buckets.isdigit() and aggregate in ('', 'min', 'max')
+                and bucket_name.count(':') >= 2)
+
+    def _expire_bucket(self, pipeline, bucket_name, expire_at):
+        for key in self._keys_for([bucket_name]):
+            pipeline.expireat(key, expire_at)
+        self._bump_version_in(bucket_name, pipeline, timestamp=expire_at)
+
+    def _current_buckets(self, leaderboard_name):
+        '''
+        Current buckets of the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @return a list of (bucket name, UNIX timestamp at which it expires) tuples.
+        '''
+        now = self._now()
+        return [
+            (self._bucket_name(leaderboard_name, period, self._bucket_start(period, now)),
+             calendar.timegm(
+                 self._bucket_start(period, now, self.retention[period]).utctimetuple()))
+            for period in self.periods]
+
+    def _retained_buckets(self, leaderboard_name):
+        return [
+            self.bucket_name_in(leaderboard_name, period, ago)
+            for period in self.periods
+            for ago in range(self.retention[period])]
+
+    def _bucket_name(self, leaderboard_name, period, start):
+        if period == self.DAILY:
+            bucket = start.strftime('%Y-%m-%d')
+        elif period == self.WEEKLY:
+            bucket = '%04d-W%02d' % start.isocalendar()[:2]
+        else:
+            bucket = start.strftime('%Y-%m')
+
+        return '%s:%s:%s' % (self._hash_tagged(leaderboard_name), period, bucket)
+
+    def _now(self):
+        '''
+        Current time as a naive UTC datetime.
+        '''
+        if timezone is None:
+            return datetime.utcfromtimestamp(self.clock())
+
+        return datetime.fromtimestamp(self.clock(), timezone.utc).replace(tzinfo=None)
+
+    def _bucket_start(self, period, moment, shift=0):
+        '''
+        Start of a bucket.
+
+        @param period [String] DAILY, WEEKLY or MONTHLY.
+        @param moment [datetime] Time within the bucket to shift from.
+        @param shift [int] Number of buckets to move forward (or backward if negative).
+        @return the start of the bucket as a UTC datetime.
+        '''
+        day = datetime(moment.year, moment.month, moment.day)
+        if period == self.DAILY:
+            return day + timedelta(days=shift)
+        elif period == self.WEEKLY:
+            return day - timedelta(days=day.weekday()) + timedelta(weeks=shift)
+        else:
+            months = moment.year * 12 + moment.month - 1 + shift
+            return datetime(months // 12, months % 12 + 1, 1)
@@ -0,0 +1,123 @@
+import threading
+
+
+class WriteBehindBuffer(object):
+    '''
+    Accumulate score changes per leaderboard and member in process and write the
+    summed changes to redis in a single pipeline. Changes are flushed once +max_pending+
+    distinct members have pending changes, or +max_delay+ seconds after the first
+    pending change, whichever comes first.
+    '''
+
+    def __init__(self, leaderboard, max_pending, max_delay):
+        '''
+        Create a write-behind buffer for a leaderboard.
+
+        @param leaderboard [Leaderboard] Leaderboard used to write the changes.
+        @param max_pending [int] Number of distinct members with pending changes that triggers a flush.
+        @param max_delay [float] Seconds after which pending changes are flushed, or +None+ to only flush on size or explicitly.
+        '''
+        self.leaderboard = leaderboard
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def change_score_for_member_in(self, leaderboard_name, member, delta, member_data=None):
+        '''
+        Buffer a change of score for a member in the named leaderboard.
+
+        @param leaderboard_name [String] Name of the leaderboard.
+        @param member [String] Member name.
+        @param delta [float] Score change.
+        @param member_data [String] Optional member data. The latest member data given for a member is written.
+        '''
+        with self._lock:
+            change = self._pending.get((leaderboard_name, member))
+            if change is None:
+                self._pending[(leaderboard_name, member)] = [delta, member_data]
+            else:
+                change[0] += delta
+                if member_data:
+                    change[1] = member_data
+
+            full = len(self._pending) >= self.max_pending
+            if not full and self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        '''
+        Write all pending changes in a single pipeline. If the write fails, the changes
+        are kept to be written by the next flush.
+
+        @return the number of members whose changes were written.
+        '''
+        return self.settle(None)
+
+    def settle(self, leaderboard_name, members=None, drop=False):
+        '''
+        Write, or drop, the pending changes of some members, waiting for any flush in
+        progress, so that a write made directly to those members afterwards is not
+        overtaken by their buffered changes.
+
+        @param leaderboard_name [String] Name of the leaderboard, or +None+ for every leaderboard.
+        @param members [Array] Member names, or +None+ for every member of the leaderboard.
+        @param drop [bool] Drop the pending changes rather than writing them.
+        @return the number of members whose changes were written or dropped.
+        '''
+        with self._flush_lock:
+            with self._lock:
+                if leaderboard_name is None:
+                    keys = list(self._pending)
+                elif members is None:
+                    keys = [key for key in self._pending if key[0] == leaderboard_name]
+                else:
+                    keys = [
+                        (leaderboard_name, member) for member in set(members)
+                        if (leaderboard_name, member) in self._pending]
+                pending = dict((key, self._pending.pop(key)) for key in keys)
+                if not self._pending and self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            if not pending or drop:
+                return len(pending)
+
+            changes_by_leaderboard = {}
+            for (name, member), (delta, member_data) in pending.items():
+                changes_by_leaderboard.setdefault(name, []).append(
+                    (member, delta, member_data))
+
+            pipeline = self.leaderboard._pipeline_for(
+                self.leaderboard._keys_for(changes_by_leaderboard))
+            for name, changes in changes_by_leaderboard.items():
+                self.leaderboard._change_scores_in(
+                    name, changes, pipeline=pipeline)
+            try:
+                pipeline.execute()
+            except Exception:
+                self._restore(pending)
+                raise
+
+            return len(pending)
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, (delta, member_data) in pending.items():
+                change = self._pending.get(key)
+                if change is None:
+                    self._pending[key] = [delta, member_data]
+                else:
+                    change[0] += delta
+                    if not change[1]:
+                        change[1] = member_data
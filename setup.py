@@ -6,6 +6,7 @@ except ImportError:
   from distutils.core import setup
 
 requirements = [req.strip() for req in open('requirements.pip')]
+async_requirements = [req.strip() for req in open('async.pip')]
 
 setup(
   name = 'leaderboard',
@@ -14,6 +15,7 @@ setup(
   author_email = "dczarnecki@agoragames.com",
   packages = ['leaderboard'],
   install_requires = requirements,
+  extras_require = {'async': async_requirements},
   url = 'https://github.com/agoragames/leaderboard-python',
   license = "LICENSE.txt",
   description = 'Leaderboards backed by Redis in Python',
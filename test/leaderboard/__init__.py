@@ -5,6 +5,12 @@ from .tie_ranking_leaderboard_test import TieRankingLeaderboardTest
 from .competition_ranking_leaderboard_test import CompetitionRankingLeaderboardTest
 from .reverse_tie_ranking_leaderboard_test import ReverseTieRankingLeaderboardTest
 from .reverse_competition_ranking_leaderboard_test import ReverseCompetitionRankingLeaderboardTest
+from .sharded_leaderboard_test import ShardedLeaderboardTest
+from .time_bucketed_leaderboard_test import TimeBucketedLeaderboardTest
+from .sliding_window_leaderboard_test import SlidingWindowLeaderboardTest
+from .async_leaderboard_test import AsyncLeaderboardTest
+from .memory_test import MemoryTest
+from .benchmark_test import BenchmarkTest
 
 
 def all_tests():
@@ -14,4 +20,10 @@ def all_tests():
     suite.addTest(unittest.makeSuite(ReverseTieRankingLeaderboardTest))
     suite.addTest(unittest.makeSuite(CompetitionRankingLeaderboardTest))
     suite.addTest(unittest.makeSuite(ReverseCompetitionRankingLeaderboardTest))
+    suite.addTest(unittest.makeSuite(ShardedLeaderboardTest))
+    suite.addTest(unittest.makeSuite(TimeBucketedLeaderboardTest))
+    suite.addTest(unittest.makeSuite(SlidingWindowLeaderboardTest))
+    suite.addTest(unittest.makeSuite(AsyncLeaderboardTest))
+    suite.addTest(unittest.makeSuite(MemoryTest))
+    suite.addTest(unittest.makeSuite(BenchmarkTest))
     return suite
@@ -0,0 +1,202 @@
+from leaderboard.async_leaderboard import AsyncLeaderboard, AsyncTieRankingLeaderboard, \
+    AsyncCompetitionRankingLeaderboard, aioredis
+from leaderboard.leaderboard import Leaderboard
+from leaderboard import snapshot
+from .backend import BACKEND
+import asyncio
+import os
+import tempfile
+import unittest
+import sure
+
+
+@unittest.skipIf(aioredis is None, 'needs an asyncio redis client')
+@unittest.skipIf(BACKEND == 'memory', 'needs a redis server')
+class AsyncLeaderboardTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.leaderboard = AsyncLeaderboard('name', decode_responses=True)
+
+    async def asyncTearDown(self):
+        await self.leaderboard.redis_connection.flushdb()
+        await self.leaderboard.close()
+
+    async def test_rank_member_and_leaders(self):
+        await self.leaderboard.rank_member('member_1', 10, 'data_1')
+        await self.leaderboard.rank_members_in('name', ['member_2', 30, 'member_3', 20])
+
+        (await self.leaderboard.total_members()).should.equal(3)
+        leaders = await self.leaderboard.leaders(1, with_member_data=True)
+        [leader['member'] for leader in leaders].should.equal(['member_2', 'member_3', 'member_1'])
+        [leader['rank'] for leader in leaders].should.equal([1, 2, 3])
+        leaders[2]['member_data'].should.equal('data_1')
+
+        around = await self.leaderboard.around_me('member_1', page_size=2)
+        [leader['member'] for leader in around].should.equal(['member_3', 'member_1'])
+
+    async def test_score_and_rank_for(self):
+        await self.leaderboard.rank_members(['member_1', 10, 'member_2', 20])
+
+        (await self.leaderboard.score_and_rank_for('member_1')).should.equal(
+            {'member': 'member_1', 'score': 10.0, 'rank': 2})
+        (await self.leaderboard.rank_for('member_2')).should.equal(1)
+        (await self.leaderboard.score_for('member_3')).should.be.none
+        ranked = await self.leaderboard.ranked_in_list(
+            ['member_3', 'member_2'], include_missing=False)
+        ranked.should.equal([{'member': 'member_2', 'score': 20.0, 'rank': 1}])
+
+    async def test_writes_match_the_synchronous_leaderboard(self):
+        await self.leaderboard.rank_members(['member_1', 10, 'member_2', 20, 'member_3', 30])
+        await self.leaderboard.change_score_for('member_1', 25)
+        await self.leaderboard.remove_member('member_3')
+        (await self.leaderboard.rank_member_if_in(
+            'name', Leaderboard.KEEP_HIGHEST, 'member_2', 5)).should.be.false
+        (await self.leaderboard.rank_member_if_in(
+            'name', Leaderboard.KEEP_HIGHEST, 'member_2', 40)).should.be.true
+
+        synchronous = Leaderboard('name', decode_responses=True)
+        synchronous.all_leaders().should.equal(await self.leaderboard.all_leaders())
+        (await self.leaderboard.score_for('member_1')).should.equal(35.0)
+        (await self.leaderboard.percentile_for('member_2')).should.equal(synchronous.percentile_for('member_2'))
+
+    async def test_iter_leaders_and_aggregates(self):
+        await self.leaderboard.rank_members_in(
+            'name', [('member_%d' % index, index) for index in range(1, 11)])
+
+        members = [leader['member'] async for leader in self.leaderboard.iter_leaders_from('name', chunk_size=3)]
+        members.should.equal(['member_%d' % index for index in range(10, 0, -1)])
+        aggregates = await self.leaderboard.aggregates()
+        aggregates['count'].should.equal(10)
+        aggregates['sum'].should.equal(55.0)
+        (await self.leaderboard.total_pages(page_size=3)).should.equal(4)
+
+    async def test_tracked_aggregates(self):
+        leaderboard = AsyncLeaderboard('tracked', track_aggregates=True, decode_responses=True)
+        await leaderboard.rank_members(['member_1', 10, 'member_2', 20])
+        await leaderboard.change_score_for('member_1', 5)
+        await leaderboard.remove_members_in_score_range(19, 21)
+
+        aggregates = await leaderboard.aggregates()
+        aggregates['count'].should.equal(1)
+        aggregates['sum'].should.equal(15.0)
+        await leaderboard.close()
+
+    @unittest.skipIf(snapshot.numpy is None, 'needs numpy')
+    async def test_snapshot_arrays(self):
+        await self.leaderboard.rank_members_in(
+            'name', [('member_%d' % index, index) for index in range(1, 11)])
+
+        arrays = await self.leaderboard.snapshot_arrays(chunk_size=3)
+        list(arrays.members).should.equal(['member_%d' % index for index in range(10, 0, -1)])
+        list(arrays.ranks).should.equal(list(range(1, 11)))
+        list(arrays.ranks_for([5.5])).should.equal([6])
+
+    async def test_export_and_restore_archive(self):
+        await self.leaderboard.rank_members_in(
+            'name', [('member_%d' % index, index, 'data_%d' % index) for index in range(1, 11)])
+        path = os.path.join(tempfile.mkdtemp(), 'name.lbarchive')
+
+        (await self.leaderboard.export_archive(path, chunk_size=3, with_member_data=True)).should.equal(10)
+        (await self.leaderboard.restore_archive_in('restored', path)).should.equal(10)
+        (await self.leaderboard.all_leaders_from('restored', with_member_data=True)).should.equal(
+            await self.leaderboard.all_leaders(with_member_data=True))
+        os.remove(path)
+
+    async def test_auto_pipeline(self):
+        leaderboard = AsyncLeaderboard('name', auto_pipeline=True, decode_responses=True)
+        await leaderboard.rank_members_in('name', [('member_%d' % index, index) for index in range(1, 11)])
+        await leaderboard.redis_connection.set('not_a_leaderboard', 'value')
+        pipelines = []
+        pipeline = leaderboard.redis_connection.pipeline
+        leaderboard.redis_connection.pipeline = lambda *args, **options: pipelines.append(args) or \
+            pipeline(*args, **options)
+
+        results = await asyncio.gather(
+            leaderboard.score_for_in('not_a_leaderboard', 'member_1'),
+            *[leaderboard.score_for('member_%d' % index) for index in range(1, 11)],
+            return_exceptions=True)
+        results[0].should.be.a(aioredis.ResponseError)
+        results[1:].should.equal([float(index) for index in range(1, 11)])
+        len(pipelines).should.equal(1)
+        await leaderboard.close()
+
+    async def test_single_flight(self):
+        leaderboard = AsyncLeaderboard('name', single_flight=True, decode_responses=True)
+        await leaderboard.rank_members_in('name', [('member_%d' % index, index) for index in range(1, 11)])
+        reads = []
+        members_from_page_in = leaderboard._members_from_page_in
+
+        async def counted_members_from_page_in(*args, **options):
+            reads.append(args)
+            return await members_from_page_in(*args, **options)
+        leaderboard._members_from_page_in = counted_members_from_page_in
+
+        pages = await asyncio.gather(*[leaderboard.leaders(1) for index in range(10)])
+        len(reads).should.equal(1)
+        pages[0].should.equal(pages[9])
+        pages[0].shouldnt.be(pages[9])
+        len(leaderboard._single_flight).should.equal(0)
+
+        for result_format in [Leaderboard.TUPLE, Leaderboard.RECORD, Leaderboard.COLUMNAR]:
+            pages = await asyncio.gather(
+                *[leaderboard.leaders(1, result_format=result_format) for index in range(2)])
+            pages[0].should.equal(pages[1])
+            pages[0].shouldnt.be(pages[1])
+        len(reads).should.equal(4)
+        await leaderboard.close()
+
+    async def test_page_cache(self):
+        leaderboard = AsyncLeaderboard('name', page_cache=True, page_cache_ttl=60, decode_responses=True)
+        await leaderboard.rank_members(['member_1', 10, 'member_2', 20])
+        reads = []
+        members_from_page_in = leaderboard._members_from_page_in
+
+        async def counted_members_from_page_in(*args, **options):
+            reads.append(args)
+            return await members_from_page_in(*args, **options)
+        leaderboard._members_from_page_in = counted_members_from_page_in
+
+        (await leaderboard.leaders(1))[0]['member'].should.equal('member_2')
+        (await leaderboard.leaders(1))[0]['rank'] = 10
+        (await leaderboard.leaders(1))[0]['rank'].should.equal(1)
+        len(reads).should.equal(1)
+
+        # Writes invalidate the pages and move the version on for other page caches
+        synchronous = Leaderboard('name', page_cache=True, page_cache_ttl=0, decode_responses=True)
+        synchronous.leaders(1)[0]['member'].should.equal('member_2')
+        await leaderboard.change_score_for('member_1', 20)
+        (await leaderboard.leaders(1))[0]['member'].should.equal('member_1')
+        synchronous.leaders(1)[0]['member'].should.equal('member_1')
+        len(reads).should.equal(2)
+
+        await leaderboard.expire_leaderboard(60)
+        (await leaderboard.redis_connection.ttl('name:version')).should.be.greater_than(0)
+        await leaderboard.delete_leaderboard()
+        (await leaderboard.redis_connection.exists('name:version')).should.equal(0)
+        (await leaderboard.leaders(1)).should.equal([])
+        await leaderboard.close()
+
+    async def test_unsupported_options(self):
+        AsyncLeaderboard.when.called_with('name', write_behind=True).should.throw(ValueError)
+
+    async def test_tie_ranking(self):
+        leaderboard = AsyncTieRankingLeaderboard('ties', decode_responses=True)
+        await leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+
+        [leader['rank'] for leader in await leaderboard.leaders(1)].should.equal([1, 1, 2])
+        (await leaderboard.rank_for('member_3')).should.equal(2)
+        (await leaderboard.redis_connection.exists('ties:ties')).should.equal(1)
+        await leaderboard.expire_leaderboard(60)
+        (await leaderboard.redis_connection.ttl('ties:ties')).should.be.greater_than(0)
+
+        await leaderboard.delete_leaderboard()
+        (await leaderboard.redis_connection.exists('ties:ties')).should.equal(0)
+        await leaderboard.close()
+
+    async def test_competition_ranking(self):
+        leaderboard = AsyncCompetitionRankingLeaderboard('competition', decode_responses=True)
+        await leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+
+        [leader['rank'] for leader in await leaderboard.leaders(1)].should.equal([1, 1, 3])
+        (await leaderboard.score_and_rank_for('member_3'))['rank'].should.equal(3)
+        await leaderboard.close()
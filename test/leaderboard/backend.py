@@ -0,0 +1,16 @@
+import os
+from redis import ConnectionPool, StrictRedis
+from leaderboard.memory import MemoryConnection
+
+# LEADERBOARD_BACKEND=memory runs the suite against the in-process backend instead of a redis server
+BACKEND = os.environ.get('LEADERBOARD_BACKEND', 'redis')
+
+
+def client(redis_class=StrictRedis, **options):
+    '''
+    Redis client for the backend the suite runs against.
+    '''
+    if BACKEND == 'memory':
+        return redis_class(connection_pool=ConnectionPool(connection_class=MemoryConnection, **options))
+
+    return redis_class(**options)
@@ -0,0 +1,61 @@
+from leaderboard.benchmark import Benchmark, OPERATIONS, compare, main
+from leaderboard.leaderboard import Leaderboard
+from leaderboard.tie_ranking_leaderboard import TieRankingLeaderboard
+from .backend import BACKEND
+import json
+import os
+import tempfile
+import unittest
+import sure
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.leaderboard = Leaderboard('name', backend=BACKEND, decode_responses=True)
+
+    def tearDown(self):
+        self.leaderboard.redis_connection.flushdb()
+
+    def test_run_measures_every_operation(self):
+        self.leaderboard.rank_member('member_1', 1)
+        benchmark = Benchmark(backend=BACKEND, sizes=[10, 50], duration=0.01, max_calls=5, warmup=1, batch_size=5)
+        results = benchmark.run()
+
+        results['meta']['version'].should.equal(Leaderboard.VERSION)
+        results['meta']['redis_version'].should_not.be.none
+        results['results'].should.have.length_of(3 * 2 * len(OPERATIONS))
+        for record in results['results']:
+            record['calls'].should.be.greater_than(0)
+            record['calls'].should.be.lower_than_or_equal_to(5)
+            record['p50_ms'].should.be.lower_than_or_equal_to(record['p99_ms'])
+            record['round_trips_per_call'].should.be.greater_than_or_equal_to(1)
+
+        leaders = [record for record in results['results'] if record['operation'] == 'leaders_in']
+        [(record['leaderboard'], record['size']) for record in leaders].should.equal([
+            ('Leaderboard', 10), ('Leaderboard', 50),
+            ('TieRankingLeaderboard', 10), ('TieRankingLeaderboard', 50),
+            ('CompetitionRankingLeaderboard', 10), ('CompetitionRankingLeaderboard', 50)])
+        [record['round_trips_per_call'] for record in leaders].should.equal([1.0] * 6)
+        writes = [record for record in results['results']
+                  if record['operation'] in ('rank_member_in', 'rank_members_in')]
+        [record['round_trips_per_call'] for record in writes].should.equal([1.0] * 12)
+
+        self.leaderboard.redis_connection.keys('leaderboard-benchmark*').should.equal([])
+        self.leaderboard.all_leaders().should.have.length_of(1)
+        Benchmark.when.called_with(operations=['leaders']).should.throw(ValueError)
+
+    def test_compare_and_command_line(self):
+        path = os.path.join(tempfile.mkdtemp(), 'results.json')
+        main(['--sizes', '20', '--types', 'TieRankingLeaderboard', '--operations', 'rank_member_in,around_me_in',
+              '--duration', '0.01', '--max-calls', '3', '--backend', BACKEND, '--output', path])
+        with open(path) as output:
+            results = json.load(output)
+        [record['operation'] for record in results['results']].should.equal(['rank_member_in', 'around_me_in'])
+
+        comparison = compare(results, results)
+        comparison.should.have.length_of(2)
+        comparison[0]['ops_per_sec_ratio'].should.equal(1.0)
+        comparison[0]['round_trips_change'].should.equal(0)
+        compare(results, {'results': []}).should.equal([])
+        os.remove(path)
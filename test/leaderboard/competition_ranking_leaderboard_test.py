@@ -1,4 +1,5 @@
 from leaderboard.competition_ranking_leaderboard import CompetitionRankingLeaderboard
+from .backend import BACKEND
 import unittest
 import sure
 
@@ -6,7 +7,7 @@ import sure
 class CompetitionRankingLeaderboardTest(unittest.TestCase):
 
     def setUp(self):
-        self.leaderboard = CompetitionRankingLeaderboard('ties', decode_responses=True)
+        self.leaderboard = CompetitionRankingLeaderboard('ties', backend=BACKEND, decode_responses=True)
 
     def tearDown(self):
         self.leaderboard.redis_connection.flushdb()
@@ -83,6 +84,19 @@ class CompetitionRankingLeaderboardTest(unittest.TestCase):
         leaders[4]['rank'].should.equal(5)
         leaders[9]['rank'].should.equal(9)
 
+    def test_correct_rankings_for_members_from_score_range(self):
+        self.leaderboard.rank_member('member_1', 50)
+        self.leaderboard.rank_member('member_2', 50)
+        self.leaderboard.rank_member('member_3', 30)
+        self.leaderboard.rank_member('member_4', 30)
+        self.leaderboard.rank_member('member_5', 10)
+
+        members = self.leaderboard.members_from_score_range(10, 30)
+        len(members).should.equal(3)
+        members[0]['rank'].should.equal(3)
+        members[1]['rank'].should.equal(3)
+        members[2]['rank'].should.equal(5)
+
     def test_retrieve_the_rank_of_a_single_member_using_rank_for(self):
         self.leaderboard.rank_member('member_1', 50)
         self.leaderboard.rank_member('member_2', 50)
@@ -1,5 +1,16 @@
-from redis import Redis, StrictRedis, ConnectionPool
-from leaderboard.leaderboard import Leaderboard
+from redis import Redis, ConnectionPool
+from redis.exceptions import ResponseError
+from leaderboard.leaderboard import Leaderboard, key_slot
+from leaderboard.result_formats import Leader, LeaderColumns
+from leaderboard import snapshot
+from leaderboard.archive import LeaderboardArchive
+from leaderboard.importer import BulkImporter
+from .backend import BACKEND, client
+import io
+import json
+import os
+import tempfile
+import threading
 import unittest
 import time
 import sure
@@ -8,7 +19,7 @@ import sure
 class LeaderboardTest(unittest.TestCase):
 
     def setUp(self):
-        self.leaderboard = Leaderboard('name', decode_responses=True)
+        self.leaderboard = Leaderboard('name', backend=BACKEND, decode_responses=True)
 
     def tearDown(self):
         self.leaderboard.redis_connection.flushdb()
@@ -29,13 +40,13 @@ class LeaderboardTest(unittest.TestCase):
             self.leaderboard.page_size)
 
     def test_init_sets_page_size_to_default_if_set_to_invalid_value(self):
-        self.leaderboard = Leaderboard('name', page_size=0)
+        self.leaderboard = Leaderboard('name', backend=BACKEND, page_size=0)
         self.leaderboard.page_size.should.equal(Leaderboard.DEFAULT_PAGE_SIZE)
 
     def test_init_uses_connection_pooling(self):
-        lb0 = Leaderboard('lb0', db=0)
-        lb1 = Leaderboard('lb1', db=0)
-        lb2 = Leaderboard('lb2', db=1)
+        lb0 = Leaderboard('lb0', backend=BACKEND, db=0)
+        lb1 = Leaderboard('lb1', backend=BACKEND, db=0)
+        lb2 = Leaderboard('lb2', backend=BACKEND, db=1)
 
         lb0.redis_connection.connection_pool.should.equal(
             lb1.redis_connection.connection_pool)
@@ -43,10 +54,10 @@ class LeaderboardTest(unittest.TestCase):
             lb2.redis_connection.connection_pool)
 
     def test_init_uses_connection(self):
-        lb = Leaderboard('lb0', connection=Redis(db=1))
+        lb = Leaderboard('lb0', connection=client(Redis, db=1))
         lb.redis_connection.connection_pool.connection_kwargs[
             'db'].should.equal(1)
-        lb = Leaderboard('lb1', connection=StrictRedis(db=1))
+        lb = Leaderboard('lb1', connection=client(db=1))
         lb.redis_connection.connection_pool.connection_kwargs[
             'db'].should.equal(1)
 
@@ -138,6 +149,214 @@ class LeaderboardTest(unittest.TestCase):
         self.leaderboard.score_for('member_1').should.equal(5.0)
         self.leaderboard.member_data_for('member_1').should.equal('optional-data')
 
+    def test_change_score_for_with_write_behind(self):
+        with Leaderboard(
+                'name', backend=BACKEND, write_behind=True, write_behind_max_delay=None,
+                decode_responses=True) as lb:
+            for index in range(100):
+                lb.change_score_for('member_1', 1)
+                lb.change_score_for('member_2', -1, 'data_%s' % index)
+            lb.score_for('member_1').should.be(None)
+
+        self.leaderboard.score_for('member_1').should.equal(100.0)
+        self.leaderboard.score_for('member_2').should.equal(-100.0)
+        self.leaderboard.member_data_for('member_2').should.equal('data_99')
+
+    def test_write_behind_keeps_the_order_of_direct_writes(self):
+        with Leaderboard(
+                'name', backend=BACKEND, write_behind=True, write_behind_max_delay=None,
+                decode_responses=True) as lb:
+            lb.change_score_for('member_1', 5)
+            lb.remove_member('member_1')
+            lb.change_score_for('member_2', 1)
+            lb.rank_member('member_2', 100)
+            lb.rank_member('member_3', 100)
+            lb.change_score_for('member_3', 1)
+            lb.rank_member('member_3', 10)
+            lb.change_score_for('member_4', 1)
+            lb.rank_member_if(Leaderboard.KEEP_HIGHEST, 'member_4', 0).should.be.false
+            lb.change_score_for('member_5', 1)
+            lb.change_score_for('member_6', 1)
+            lb.remove_members_in_score_range(2, 3)
+
+        self.leaderboard.score_for('member_1').should.be(None)
+        self.leaderboard.score_for('member_2').should.equal(100.0)
+        self.leaderboard.score_for('member_3').should.equal(10.0)
+        self.leaderboard.score_for('member_4').should.equal(1.0)
+        self.leaderboard.score_for('member_5').should.equal(1.0)
+        self.leaderboard.score_for('member_6').should.equal(1.0)
+
+    def test_write_behind_flushes_on_size_and_delay(self):
+        lb = Leaderboard('name', backend=BACKEND, write_behind=True, write_behind_max_pending=2,
+                         write_behind_max_delay=0.05, decode_responses=True)
+        lb.change_score_for('member_1', 5)
+        lb.change_score_for('member_1', 5)
+        lb.score_for('member_1').should.be(None)
+        lb.change_score_for('member_2', 5)
+        lb.score_for('member_1').should.equal(10.0)
+
+        lb.change_score_for('member_3', 5)
+        time.sleep(0.2)
+        lb.score_for('member_3').should.equal(5.0)
+        lb.flush().should.equal(0)
+
+    def test_page_cache_serves_pages_until_the_leaderboard_version_changes(self):
+        lb = Leaderboard('name', backend=BACKEND, page_cache=True, page_cache_ttl=60, decode_responses=True)
+        lb.rank_members(['member_1', 1, 'member_2', 2])
+        reads = []
+        members_from_page_in = lb._members_from_page_in
+        lb._members_from_page_in = lambda *args, **options: reads.append(args) or \
+            members_from_page_in(*args, **options)
+
+        lb.leaders(1)[0]['member'].should.equal('member_2')
+        lb.leaders(1)[0]['rank'] = 10
+        lb.leaders(1)[0]['rank'].should.equal(1)
+        lb.top(1).should.equal([{'member': 'member_2', 'rank': 1, 'score': 2.0}])
+        len(reads).should.equal(2)
+
+        # Writes from other processes are seen once the ttl has passed and the version is checked
+        lb._page_cache.ttl = 0
+        lb.leaders(1)[0]['member'].should.equal('member_2')
+        Leaderboard('name', backend=BACKEND, page_cache=True, decode_responses=True).rank_member('member_3', 3)
+        lb.leaders(1)[0]['member'].should.equal('member_3')
+        lb.leaders(1)
+        len(reads).should.equal(3)
+
+        # Writes through the leaderboard invalidate its pages immediately
+        lb._page_cache.ttl = 60
+        lb.change_score_for('member_1', 10)
+        lb.leaders(1)[0]['member'].should.equal('member_1')
+        lb.remove_member('member_1')
+        lb.around_me('member_2')[0]['member'].should.equal('member_3')
+        lb.update_member_data('member_2', 'member_data_2')
+        lb.leaders(1, with_member_data=True)[1]['member_data'].should.equal('member_data_2')
+
+    def test_page_cache_sees_new_members_without_the_page_cache_and_expiry(self):
+        lb = Leaderboard('name', backend=BACKEND, page_cache=True, page_cache_ttl=0, decode_responses=True)
+        lb.rank_members(['member_1', 1, 'member_2', 2])
+        lb.leaders(1)[0]['member'].should.equal('member_2')
+
+        # Writers without the page cache do not move the version on, but change the number of members
+        Leaderboard('name', backend=BACKEND, decode_responses=True).rank_member('member_3', 3)
+        lb.redis_connection.exists('name:version').should.be.true
+        lb.leaders(1)[0]['member'].should.equal('member_3')
+        Leaderboard('other', backend=BACKEND, decode_responses=True).rank_member('member_1', 1)
+        lb.redis_connection.exists('other:version').should.be.false
+
+        lb.expire_leaderboard(60)
+        lb.redis_connection.ttl('name:version').should.be.greater_than(0)
+        lb.redis_connection.pexpire('name', 1)
+        time.sleep(0.01)
+        lb.leaders(1).should.equal([])
+
+    def test_page_cache_is_bounded(self):
+        lb = Leaderboard('name', backend=BACKEND, page_cache=True, page_cache_size=2, decode_responses=True)
+        self.__rank_members_in_leaderboard(26)
+
+        for page in range(1, 5):
+            lb.leaders(page, page_size=5)
+        len(lb._page_cache).should.equal(2)
+        lb.leaders(4, page_size=5)[0]['rank'].should.equal(16)
+
+    def test_auto_pipeline_sends_concurrent_commands_in_one_pipeline(self):
+        lb = Leaderboard('name', backend=BACKEND, auto_pipeline=True, auto_pipeline_delay=0.05, decode_responses=True)
+        self.__rank_members_in_leaderboard(11)
+        lb.redis_connection.set('not_a_leaderboard', 'value')
+        pipelines = []
+        pipeline = lb.redis_connection.pipeline
+        lb.redis_connection.pipeline = lambda *args, **options: pipelines.append(args) or \
+            pipeline(*args, **options)
+
+        results = {}
+
+        def score_for(member):
+            results[member] = lb.score_for(member)
+
+        def score_for_in_wrong_type():
+            try:
+                lb.score_for_in('not_a_leaderboard', 'member_1')
+            except Exception as error:
+                results['error'] = error
+
+        threads = [threading.Thread(target=score_for, args=('member_%d' % index,)) for index in range(1, 11)]
+        threads.append(threading.Thread(target=score_for_in_wrong_type))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index in range(1, 11):
+            results['member_%d' % index].should.equal(float(index))
+        results['error'].should.be.a(ResponseError)
+        len(pipelines).should.be.below(11)
+        lb.rank_for('member_10').should.equal(1)
+
+    def test_single_flight_shares_identical_page_reads_in_flight(self):
+        lb = Leaderboard('name', backend=BACKEND, single_flight=True, decode_responses=True)
+        self.__rank_members_in_leaderboard(30)
+        reads = []
+        members_from_page_in = lb._members_from_page_in
+
+        def slow_members_from_page_in(*args, **options):
+            reads.append(args)
+            time.sleep(0.05)
+            return members_from_page_in(*args, **options)
+        lb._members_from_page_in = slow_members_from_page_in
+
+        pages = []
+        threads = [threading.Thread(target=lambda: pages.append(lb.leaders(1))) for index in range(10)]
+        threads.append(threading.Thread(target=lambda: pages.append(lb.leaders(2))))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        len(reads).should.equal(2)
+        len(lb._single_flight).should.equal(0)
+        first_pages = [page for page in pages if page[0]['rank'] == 1]
+        len(first_pages).should.equal(10)
+        first_pages[0][0]['rank'] = 100
+        first_pages[1][0]['rank'].should.equal(1)
+        lb.leaders(1)
+        len(reads).should.equal(3)
+
+    def test_result_formats(self):
+        self.__rank_members_in_leaderboard(6)
+        lb = Leaderboard('name', backend=BACKEND, result_format=Leaderboard.RECORD, decode_responses=True)
+
+        lb.leaders(1, page_size=2, with_member_data=True).should.equal([
+            Leader('member_5', 1, 5.0, str({'member_name': 'Leaderboard member 5'})),
+            Leader('member_4', 2, 4.0, str({'member_name': 'Leaderboard member 4'}))])
+        lb.around_me('member_3', page_size=3)[1].should.equal(Leader('member_3', 3, 3.0))
+        lb.members_from_rank_range(2, 3, result_format=Leaderboard.TUPLE).should.equal(
+            [('member_4', 2, 4.0), ('member_3', 3, 3.0)])
+        lb.members_from_score_range(1, 2, sort_by='rank', result_format=Leaderboard.TUPLE).should.equal(
+            [('member_2', 4, 2.0), ('member_1', 5, 1.0)])
+
+        columns = lb.all_leaders(result_format=Leaderboard.COLUMNAR)
+        columns.members.should.equal(['member_5', 'member_4', 'member_3', 'member_2', 'member_1'])
+        list(columns.ranks).should.equal([1, 2, 3, 4, 5])
+        list(columns.scores).should.equal([5.0, 4.0, 3.0, 2.0, 1.0])
+        columns.member_data.should.be.none
+        len(columns).should.equal(5)
+        list(columns)[0].should.equal(('member_5', 1, 5.0))
+
+        lb.leaders(2, result_format=Leaderboard.COLUMNAR).should.equal(LeaderColumns([], [], []))
+        lb.leaders(1, page_size=1, members_only=True).should.equal([Leader('member_5')])
+        lb.member_at(2).should.equal(Leader('member_4', 2, 4.0))
+        Leaderboard.when.called_with('name', result_format='xml').should.throw(ValueError)
+
+    def test_result_formats_with_page_cache(self):
+        self.__rank_members_in_leaderboard(6)
+        lb = Leaderboard(
+            'name', backend=BACKEND, page_cache=True, result_format=Leaderboard.RECORD, decode_responses=True)
+
+        lb.leaders(1)[0].rank = 10
+        lb.leaders(1)[0].rank.should.equal(1)
+        columns = lb.leaders(1, result_format=Leaderboard.COLUMNAR)
+        columns.ranks[0] = 10
+        lb.leaders(1, result_format=Leaderboard.COLUMNAR).ranks[0].should.equal(1)
+
     def test_score_and_rank_for(self):
         self.__rank_members_in_leaderboard()
         score_and_rank = self.leaderboard.score_and_rank_for('member_3')
@@ -278,6 +497,38 @@ class LeaderboardTest(unittest.TestCase):
         leaders[0]['member_data'].should.equal(
             str({'member_name': 'Leaderboard member 5'}))
 
+    def test_leaders_with_optional_member_data_in_a_single_round_trip(self):
+        self.__rank_members_in_leaderboard(27)
+        commands = self.__count_commands()
+
+        leaders = self.leaderboard.leaders(2, page_size=10, with_member_data=True)
+        len(leaders).should.equal(10)
+        leaders[0].should.eql({
+            'member': 'member_16',
+            'score': 16.0,
+            'rank': 11,
+            'member_data': str({'member_name': 'Leaderboard member 16'})})
+        len(commands).should.equal(1)
+
+        self.leaderboard.around_me('member_10', page_size=3)
+        self.leaderboard.members_from_score_range(10, 15)
+        self.leaderboard.members_from_rank_range(5, 9)
+        len(commands).should.equal(4)
+
+    def test_members_from_score_range_with_sort_option_ASC(self):
+        self.leaderboard.order = Leaderboard.ASC
+        self.__rank_members_in_leaderboard(26)
+
+        members = self.leaderboard.members_from_score_range(10, 15, with_member_data=True)
+        len(members).should.equal(6)
+        members[0]['member'].should.equal('member_10')
+        members[0]['rank'].should.equal(10)
+        members[0]['member_data'].should.equal(str({'member_name': 'Leaderboard member 10'}))
+        members[5]['member'].should.equal('member_15')
+        members[5]['rank'].should.equal(15)
+
+        self.leaderboard.members_from_score_range(100, 200).should.equal([])
+
     def test_leaders_return_type(self):
         leaders = self.leaderboard.leaders(1)
         type(leaders).should.equal(type([]))
@@ -326,6 +577,19 @@ class LeaderboardTest(unittest.TestCase):
         len(leaders).should.be(25)
         leaders[0]['member'].should.equal('member_25')
 
+    def test_all_leaders_derives_ranks_from_a_single_range_query(self):
+        self.__rank_members_in_leaderboard(26)
+        commands = self.__count_commands()
+
+        leaders = self.leaderboard.all_leaders()
+        len(leaders).should.be(25)
+        leaders[24].should.eql({'member': 'member_1', 'score': 1.0, 'rank': 25})
+        commands.should.equal(['ZREVRANGE'])
+
+        leaders = self.leaderboard.all_leaders(with_member_data=True, sort_by='score')
+        leaders[0]['member'].should.equal('member_1')
+        leaders[0]['member_data'].should.equal(str({'member_name': 'Leaderboard member 1'}))
+
     def test_members_from_score_range(self):
         self.__rank_members_in_leaderboard(26)
 
@@ -431,8 +695,8 @@ class LeaderboardTest(unittest.TestCase):
         leaders_around_me.should.equal(exp[0:3])
 
     def test_merge_leaderboards(self):
-        foo_leaderboard = Leaderboard('foo')
-        bar_leaderboard = Leaderboard('bar')
+        foo_leaderboard = Leaderboard('foo', backend=BACKEND)
+        bar_leaderboard = Leaderboard('bar', backend=BACKEND)
 
         foo_leaderboard.rank_member('foo_1', 1)
         foo_leaderboard.rank_member('foo_2', 2)
@@ -442,14 +706,54 @@ class LeaderboardTest(unittest.TestCase):
 
         foo_leaderboard.merge_leaderboards('foobar', ['bar'], aggregate='SUM')
 
-        foobar_leaderboard = Leaderboard('foobar')
+        foobar_leaderboard = Leaderboard('foobar', backend=BACKEND)
         foobar_leaderboard.total_members().should.equal(5)
 
         foobar_leaderboard.leaders(1)[0]['member'].should.equal('bar_3')
 
+    def test_key_slot(self):
+        key_slot('123456789').should.equal(12739)
+        key_slot('{user1000}.following').should.equal(key_slot('user1000'))
+        key_slot('foo{}{bar}').shouldnt.equal(key_slot('bar'))
+        key_slot(b'{name}:member_data').should.equal(key_slot('name'))
+
+    def test_cluster_option_hash_tags_derived_keys(self):
+        leaderboard = Leaderboard('name', backend=BACKEND, cluster=True, decode_responses=True)
+        leaderboard.rank_member('member_1', 1, 'member_data_1')
+
+        leaderboard._member_data_key('name').should.equal('{name}:member_data')
+        leaderboard._member_data_key('{name}:daily').should.equal('{name}:daily:member_data')
+        key_slot(leaderboard._member_data_key('name')).should.equal(key_slot('name'))
+        leaderboard.member_data_for('member_1').should.equal('member_data_1')
+
+        leaderboard.delete_leaderboard()
+        self.leaderboard.redis_connection.exists('{name}:member_data').should.be.false
+
+    def test_merge_and_intersect_leaderboards_across_cluster_slots(self):
+        foo_leaderboard = Leaderboard('foo', backend=BACKEND, cluster=True, decode_responses=True)
+        bar_leaderboard = Leaderboard('bar', backend=BACKEND, cluster=True, decode_responses=True)
+        key_slot('foo').shouldnt.equal(key_slot('bar'))
+
+        foo_leaderboard.DEFAULT_CHUNK_SIZE = 1
+        foo_leaderboard.rank_member('shared', 1)
+        foo_leaderboard.rank_member('foo_1', 2, 'foo_data_1')
+        bar_leaderboard.rank_member('shared', 5, 'shared_data')
+        bar_leaderboard.rank_member('bar_1', 3)
+
+        foo_leaderboard.merge_leaderboards('foobar', ['bar'], aggregate='MAX')
+        foo_leaderboard.all_leaders_from('foobar', with_member_data=True).should.equal([
+            {'member': 'shared', 'rank': 1, 'score': 5.0, 'member_data': 'shared_data'},
+            {'member': 'bar_1', 'rank': 2, 'score': 3.0, 'member_data': None},
+            {'member': 'foo_1', 'rank': 3, 'score': 2.0, 'member_data': 'foo_data_1'}])
+
+        foo_leaderboard.intersect_leaderboards('foobar', ['bar'])
+        foo_leaderboard.all_leaders_from('foobar', with_member_data=True).should.equal([
+            {'member': 'shared', 'rank': 1, 'score': 6.0, 'member_data': 'shared_data'}])
+        foo_leaderboard.member_data_for_in('foobar', 'foo_1').should.be.none
+
     def test_intersect_leaderboards(self):
-        foo_leaderboard = Leaderboard('foo')
-        bar_leaderboard = Leaderboard('bar')
+        foo_leaderboard = Leaderboard('foo', backend=BACKEND)
+        bar_leaderboard = Leaderboard('bar', backend=BACKEND)
 
         foo_leaderboard.rank_member('foo_1', 1)
         foo_leaderboard.rank_member('foo_2', 2)
@@ -463,7 +767,7 @@ class LeaderboardTest(unittest.TestCase):
             ['bar'],
             aggregate='SUM')
 
-        foobar_leaderboard = Leaderboard('foobar')
+        foobar_leaderboard = Leaderboard('foobar', backend=BACKEND)
         foobar_leaderboard.total_members().should.equal(2)
 
         foobar_leaderboard.leaders(1)[0]['member'].should.equal('bar_3')
@@ -491,11 +795,53 @@ class LeaderboardTest(unittest.TestCase):
         self.leaderboard.rank_member_if(highscore_check, 'david', 1338)
         self.leaderboard.score_for('david').should.equal(1338.0)
 
+    def test_rank_member_if_with_conditional_modes(self):
+        for server_version in [None, (2, 8, 0)]:
+            self.leaderboard._server_version = server_version
+
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'david', 1337).should.be.true
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'david', 1336).should.be.false
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'david', 1337).should.be.false
+            self.leaderboard.score_for('david').should.equal(1337.0)
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'david', 1338, 'best').should.be.true
+            self.leaderboard.score_for('david').should.equal(1338.0)
+            self.leaderboard.member_data_for('david').should.equal('best')
+
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_LOWEST, 'brian', 10).should.be.true
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_LOWEST, 'brian', 20, 'worse').should.be.false
+            self.leaderboard.member_data_for('brian').should.be(None)
+            self.leaderboard.rank_member_if(Leaderboard.KEEP_LOWEST, 'brian', 5).should.be.true
+            self.leaderboard.score_for('brian').should.equal(5.0)
+
+            self.leaderboard.rank_member_if(Leaderboard.ONLY_IF_NEW, 'brian', 50).should.be.false
+            self.leaderboard.rank_member_if(Leaderboard.ONLY_IF_NEW, 'julie', 50).should.be.true
+            self.leaderboard.rank_member_if(Leaderboard.ONLY_IF_EXISTS, 'kate', 50).should.be.false
+            self.leaderboard.rank_member_if(Leaderboard.ONLY_IF_EXISTS, 'julie', 60).should.be.true
+            self.leaderboard.score_for('julie').should.equal(60.0)
+            self.leaderboard.check_member('kate').should.be.false
+
+            self.leaderboard.delete_leaderboard()
+
     def test_rank_members(self):
         self.leaderboard.total_members().should.equal(0)
         self.leaderboard.rank_members(['member_1', 1000, 'member_2', 3000])
         self.leaderboard.total_members().should.equal(2)
 
+    def test_rank_members_in_chunks_with_member_data(self):
+        progress = []
+        members = (('member_%s' % index, index, 'data_%s' % index) for index in range(1, 6))
+        self.leaderboard.rank_members(members, chunk_size=2, progress=progress.append).should.equal(5)
+        progress.should.equal([2, 4, 5])
+
+        self.leaderboard.total_members().should.equal(5)
+        self.leaderboard.rank_for('member_5').should.equal(1)
+        self.leaderboard.member_data_for('member_3').should.equal('data_3')
+
+        lb = Leaderboard('lb1', redis_connection=client(db=0, decode_responses=True))
+        lb.rank_members([('david', 50.1), ('brian', 25)]).should.equal(2)
+        lb.score_for('david').should.equal(50.1)
+        lb.rank_for('brian').should.equal(2)
+
     def test_rank_member_across(self):
         self.leaderboard.rank_member_across(
             ['highscores', 'more_highscores'], 'david', 50000, {'member_name': 'david'})
@@ -518,14 +864,53 @@ class LeaderboardTest(unittest.TestCase):
             "{'member_name': 'Leaderboard member 25'}")
 
     def test_can_use_StrictRedis_class_for_connection(self):
-        lb = Leaderboard('lb1', connection=StrictRedis(db=0))
+        lb = Leaderboard('lb1', connection=client(db=0))
         lb.rank_member('david', 50.1)
         lb.score_for('david').should.equal(50.1)
         lb.rank_for('david').should.equal(1)
         len(lb.leaders(1)).should.equal(1)
 
+    def test_reads_go_to_read_replicas(self):
+        replica = client(db=5, decode_responses=True)
+        lb = Leaderboard(
+            'name', backend=BACKEND, read_replicas=[{'db': 5}], pools={}, decode_responses=True)
+        lb.rank_member('david', 50)
+        replica.zadd('name', 10, 'david')
+
+        try:
+            lb.score_for('david').should.equal(10.0)
+            lb.leaders(1)[0]['score'].should.equal(10.0)
+            with lb.read_your_writes():
+                lb.score_for('david').should.equal(50.0)
+                lb.leaders(1)[0]['score'].should.equal(50.0)
+            lb.rank_member_if(Leaderboard.KEEP_HIGHEST, 'david', 20).should.be.false
+        finally:
+            replica.flushdb()
+
+    def test_read_strategies(self):
+        replicas = [client(db=db, decode_responses=True) for db in (5, 6)]
+        replicas[0].zadd('name', 10, 'david')
+
+        try:
+            lb = Leaderboard('name', backend=BACKEND, read_replicas=replicas)
+            [lb.check_member('david') for index in range(4)].should.equal(
+                [True, False, True, False])
+
+            lb = Leaderboard(
+                'name', backend=BACKEND, read_replicas=replicas, read_strategy=Leaderboard.LEAST_OUTSTANDING)
+            connection = replicas[1].connection_pool.get_connection('ZSCORE')
+            [lb.check_member('david') for index in range(4)].should.equal(
+                [True, True, True, True])
+            replicas[1].connection_pool.release(connection)
+
+            Leaderboard.when.called_with(
+                'name', read_strategy='random').should.throw(ValueError)
+        finally:
+            for replica in replicas:
+                replica.flushdb()
+
     def test_can_set_member_data_namespace_option(self):
-        self.leaderboard = Leaderboard('name', member_data_namespace='md')
+        self.leaderboard = Leaderboard('name', backend=BACKEND, member_data_namespace='md')
         self.__rank_members_in_leaderboard()
 
         self.leaderboard.redis_connection.exists(
@@ -533,7 +918,7 @@ class LeaderboardTest(unittest.TestCase):
         self.leaderboard.redis_connection.exists("name:md").should.be.true
 
     def test_global_member_data_option(self):
-        self.leaderboard = Leaderboard('name', global_member_data=True)
+        self.leaderboard = Leaderboard('name', backend=BACKEND, global_member_data=True)
         self.__rank_members_in_leaderboard()
 
         self.leaderboard.redis_connection.exists(
@@ -641,6 +1026,213 @@ class LeaderboardTest(unittest.TestCase):
         self.__rank_members_in_leaderboard(26)
 
         self.leaderboard.total_scores().should.equal(325.0)
+        self.leaderboard.total_scores_in('other').should.equal(0)
+
+    def test_aggregates(self):
+        self.__rank_members_in_leaderboard(26)
+
+        self.leaderboard.aggregates().should.equal({
+            'count': 25, 'sum': 325.0, 'mean': 13.0, 'min': 1.0, 'max': 25.0, 'variance': 52.0})
+        self.leaderboard.aggregates_for_score_range(10, 20).should.equal({
+            'count': 11, 'sum': 165.0, 'mean': 15.0, 'min': 10.0, 'max': 20.0, 'variance': 10.0})
+        self.leaderboard.aggregates_for_rank_range(1, 5).should.equal({
+            'count': 5, 'sum': 115.0, 'mean': 23.0, 'min': 21.0, 'max': 25.0, 'variance': 2.0})
+        self.leaderboard.aggregates_for_rank_range(24, 30)['sum'].should.equal(3.0)
+        self.leaderboard.aggregates_in('other').should.equal({
+            'count': 0, 'sum': 0.0, 'mean': None, 'min': None, 'max': None, 'variance': None})
+
+    def test_aggregates_are_computed_in_chunks(self):
+        self.__rank_members_in_leaderboard(26)
+        self.leaderboard.DEFAULT_CHUNK_SIZE = 4
+
+        self.leaderboard.aggregates().should.equal({
+            'count': 25, 'sum': 325.0, 'mean': 13.0, 'min': 1.0, 'max': 25.0, 'variance': 52.0})
+        self.leaderboard.aggregates_for_score_range(10, 20).should.equal({
+            'count': 11, 'sum': 165.0, 'mean': 15.0, 'min': 10.0, 'max': 20.0, 'variance': 10.0})
+        self.leaderboard.aggregates_for_rank_range(1, 8).should.equal({
+            'count': 8, 'sum': 172.0, 'mean': 21.5, 'min': 18.0, 'max': 25.0, 'variance': 5.25})
+
+    def test_track_aggregates_option_keeps_aggregates_in_step_with_writes(self):
+        leaderboard = Leaderboard('name', backend=BACKEND, track_aggregates=True, decode_responses=True)
+        leaderboard.rank_members(
+            [('member_%s' % index, index) for index in range(1, 31)], chunk_size=7)
+        leaderboard.rank_member('member_31', 2.5, 'member_data_31')
+        leaderboard.change_score_for('member_1', 7)
+        leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'member_2', 1).should.be.false
+        leaderboard.rank_member_if(Leaderboard.KEEP_HIGHEST, 'member_2', 40).should.be.true
+        leaderboard.rank_member_across(['name', 'other'], 'member_3', 0.5)
+        leaderboard.remove_member('member_4')
+        leaderboard.remove_member('jones')
+        leaderboard.remove_members_in_score_range(10, 12)
+        leaderboard.remove_members_outside_rank(20).should.equal(7)
+
+        leaderboard.redis_connection.hget('name:aggregates', 'count').should.equal('20')
+        tracked = leaderboard.aggregates()
+        computed = self.leaderboard.aggregates()
+        tracked.should.equal(dict(computed, variance=tracked['variance']))
+        tracked['variance'].should.equal(computed['variance'], epsilon=1e-9)
+        leaderboard.aggregates_in('other')['sum'].should.equal(0.5)
+
+        leaderboard.merge_leaderboards('merged', ['other'])
+        leaderboard.aggregates_in('merged')['count'].should.equal(21)
+
+        leaderboard.delete_leaderboard()
+        leaderboard.redis_connection.exists('name:aggregates').should.be.false
+        leaderboard.aggregates()['count'].should.equal(0)
+
+    def test_rebuild_aggregates(self):
+        self.__rank_members_in_leaderboard(6)
+        leaderboard = Leaderboard('name', backend=BACKEND, track_aggregates=True, decode_responses=True)
+
+        leaderboard.rebuild_aggregates()
+        leaderboard.rank_member('member_6', 6)
+        leaderboard.aggregates()['sum'].should.equal(21.0)
+
+    def test_tracked_variance_of_large_scores(self):
+        leaderboard = Leaderboard('name', backend=BACKEND, track_aggregates=True, decode_responses=True)
+        leaderboard.rank_members([('member_%s' % index, 1e9 + index) for index in range(1, 5)])
+        leaderboard.change_score_for('member_4', 1)
+
+        leaderboard.aggregates()['variance'].should.equal(
+            self.leaderboard.aggregates()['variance'], epsilon=1e-6)
+        leaderboard.rebuild_aggregates()
+        leaderboard.remove_member('member_1')
+        leaderboard.aggregates()['variance'].should.equal(
+            self.leaderboard.aggregates()['variance'], epsilon=1e-6)
+
+    def test_iter_leaders(self):
+        self.__rank_members_in_leaderboard(26)
+
+        leaders = self.leaderboard.iter_leaders(chunk_size=5, with_member_data=True)
+        next(leaders).should.equal(
+            {'member': 'member_25', 'rank': 1, 'score': 25.0, 'member_data': "{'member_name': 'Leaderboard member 25'}"})
+        list(leaders).should.equal(self.leaderboard.all_leaders(with_member_data=True)[1:])
+        [leader['member'] for leader in self.leaderboard.iter_leaders(
+            chunk_size=13, members_only=True)].should.equal(
+            ['member_%s' % index for index in range(25, 0, -1)])
+        list(self.leaderboard.iter_leaders_from('other')).should.equal([])
+
+    def test_export_and_restore_archive(self):
+        self.__rank_members_in_leaderboard(26)
+        self.leaderboard.rank_member(u'm\xe9mber_tie', 20)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'season.lbarchive')
+
+        self.leaderboard.export_archive(path, chunk_size=4, with_member_data=True).should.equal(26)
+        os.listdir(directory).should.equal(['season.lbarchive'])
+        with LeaderboardArchive(path) as leaders:
+            len(leaders).should.equal(26)
+            leaders.order.should.equal('desc')
+            leaders.member_at(1).should.equal(
+                Leader('member_25', 1, 25.0, str({'member_name': 'Leaderboard member 25'})))
+            leaders.member_at(6).should.equal(Leader(u'm\xe9mber_tie', 6, 20.0, None))
+            leaders.member_at(27).should.be.none
+            [leader.member for leader in leaders].should.equal(
+                [leader['member'] for leader in self.leaderboard.all_leaders()])
+
+        self.leaderboard.restore_archive_in('restored', path, chunk_size=10).should.equal(26)
+        self.leaderboard.all_leaders_from('restored', with_member_data=True).should.equal(
+            self.leaderboard.all_leaders(with_member_data=True))
+
+        self.leaderboard.export_archive_from('other', path).should.equal(0)
+        with LeaderboardArchive(path) as leaders:
+            len(leaders).should.equal(0)
+            leaders.has_member_data.should.be.false
+        LeaderboardArchive.when.called_with(__file__).should.throw(ValueError)
+        os.remove(path)
+        os.rmdir(directory)
+
+    def test_bulk_import_from_csv_and_jsonl(self):
+        directory = tempfile.mkdtemp()
+        csv_path = os.path.join(directory, 'scores.csv')
+        with io.open(csv_path, 'w', encoding='utf-8') as scores:
+            scores.write(u'score,member,member_data\n')
+            for index in range(1, 26):
+                scores.write(u'%s,member_%s,%s\n' % (index, index, 'data_%s' % index if index % 2 else ''))
+        jsonl_path = os.path.join(directory, 'scores.jsonl')
+        with io.open(jsonl_path, 'w', encoding='utf-8') as scores:
+            scores.write(u'%s\n\n' % json.dumps({'name': 'member_1', 'points': 7, 'member_data': {'level': 2}}))
+            scores.write(u'%s\n' % json.dumps({'name': 'member_30', 'points': 1.5}))
+
+        acknowledged = []
+        importer = BulkImporter(self.leaderboard, chunk_size=4, window=2)
+        importer.import_csv(csv_path, progress=acknowledged.append).should.equal(25)
+        acknowledged.should.equal([4, 8, 12, 16, 20, 24, 25])
+        self.leaderboard.total_members().should.equal(25)
+        self.leaderboard.leaders(1, page_size=2, with_member_data=True).should.equal([
+            {'member': 'member_25', 'rank': 1, 'score': 25.0, 'member_data': 'data_25'},
+            {'member': 'member_24', 'rank': 2, 'score': 24.0, 'member_data': None}])
+
+        importer.import_jsonl(jsonl_path, member='name', score='points').should.equal(2)
+        self.leaderboard.score_for('member_1').should.equal(7.0)
+        json.loads(self.leaderboard.member_data_for('member_1')).should.equal({'level': 2})
+        self.leaderboard.rank_for('member_30').should.equal(26)
+
+        BulkImporter.when.called_with(self.leaderboard, window=0).should.throw(ValueError)
+        os.remove(csv_path)
+        os.remove(jsonl_path)
+        os.rmdir(directory)
+
+    def test_bulk_import_resumes_from_checkpoint(self):
+        checkpoint = os.path.join(tempfile.mkdtemp(), 'import.checkpoint')
+        rows = [('member_%s' % index, index) for index in range(1, 21)]
+
+        def interrupted():
+            for index, row in enumerate(rows):
+                if index == 13:
+                    raise IOError('interrupted')
+                yield row
+
+        importer = BulkImporter(self.leaderboard, chunk_size=3, window=2, checkpoint=checkpoint, checkpoint_every=1)
+        importer.import_rows.when.called_with(interrupted()).should.throw(IOError)
+        with io.open(checkpoint, 'r', encoding='utf-8') as state:
+            json.load(state).should.equal({'leaderboard': 'name', 'rows': 6})
+        importer.import_rows.when.called_with(rows, 'other').should.throw(ValueError)
+
+        importer.import_rows(rows).should.equal(14)
+        os.path.exists(checkpoint).should.be.false
+        self.leaderboard.total_members().should.equal(20)
+        self.leaderboard.rank_for('member_1').should.equal(20)
+
+    def test_bulk_import_reports_errors(self):
+        self.leaderboard.redis_connection.set('name', 'not a sorted set')
+        importer = BulkImporter(self.leaderboard, chunk_size=2)
+        importer.import_rows.when.called_with([('member_1', 1), ('member_2', 2), ('member_3', 3)]).should.throw(ResponseError)
+        importer.import_rows([('member_1', 1)], 'other').should.equal(1)
+
+    def test_bulk_import_writes_buffered_changes_first(self):
+        with Leaderboard(
+                'name', backend=BACKEND, write_behind=True, write_behind_max_delay=None,
+                decode_responses=True) as lb:
+            lb.change_score_for('member_1', 5)
+            lb.change_score_for('member_2', 5)
+            BulkImporter(lb, chunk_size=2).import_rows([('member_1', 100)]).should.equal(1)
+
+        self.leaderboard.score_for('member_1').should.equal(100.0)
+        self.leaderboard.score_for('member_2').should.equal(5.0)
+
+    @unittest.skipIf(snapshot.numpy is None, 'needs numpy')
+    def test_snapshot_arrays(self):
+        self.__rank_members_in_leaderboard(26)
+        self.leaderboard.rank_member('member_tie', 20)
+
+        arrays = self.leaderboard.snapshot_arrays(chunk_size=4)
+        len(arrays).should.equal(26)
+        list(arrays.members[:3]).should.equal(['member_25', 'member_24', 'member_23'])
+        list(arrays.ranks).should.equal(list(range(1, 27)))
+        [leader['score'] for leader in self.leaderboard.all_leaders()].should.equal(list(arrays.scores))
+
+        list(arrays.percentile_table([0, 50, 100])).should.equal([
+            self.leaderboard.score_for_percentile(percentile) for percentile in [0, 50, 100]])
+        counts, edges = arrays.histogram(bins=5, range=(0, 25))
+        list(counts).should.equal([4, 5, 5, 5, 7])
+        list(arrays.ranks_for([30, 25, 20, 19.5, 0])).should.equal([1, 1, 6, 8, 27])
+
+        ascending = Leaderboard('name', backend=BACKEND, order=Leaderboard.ASC, decode_responses=True)
+        lowest = ascending.snapshot_arrays()
+        list(lowest.ranks_for([30, 20, 1, 0])).should.equal([27, 20, 1, 1])
+        list(lowest.percentile_table([90])).should.equal([ascending.score_for_percentile(90)])
+        len(self.leaderboard.snapshot_arrays_in('other')).should.equal(0)
 
     def test_ranked_in_list_with_include_missing_sort_by_rank_and_missing_members(self):
         self.__rank_members_in_leaderboard(27)
@@ -689,6 +1281,17 @@ class LeaderboardTest(unittest.TestCase):
         leaders[3]['member'].should.equal('member_3')
         leaders[4]['member'].should.equal('member_200')
 
+    def __count_commands(self):
+        commands = []
+        execute_command = self.leaderboard.redis_connection.execute_command
+
+        def counting_execute_command(*args, **options):
+            commands.append(args[0])
+            return execute_command(*args, **options)
+
+        self.leaderboard.redis_connection.execute_command = counting_execute_command
+        return commands
+
     def __rank_members_in_leaderboard(self, members_to_add=6):
         for index in range(1, members_to_add):
             self.leaderboard.rank_member(
@@ -0,0 +1,106 @@
+from leaderboard.memory import SortedBlocks, MemoryConnection
+from leaderboard.leaderboard import Leaderboard
+from leaderboard.tie_ranking_leaderboard import TieRankingLeaderboard
+from leaderboard.competition_ranking_leaderboard import CompetitionRankingLeaderboard
+from redis import Redis, ConnectionPool
+from redis.exceptions import ResponseError
+import bisect
+import random
+import unittest
+import sure
+
+
+class MemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.leaderboard = Leaderboard('name', backend='memory', decode_responses=True)
+
+    def tearDown(self):
+        self.leaderboard.redis_connection.flushdb()
+
+    def test_sorted_blocks_match_a_sorted_list(self):
+        generator = random.Random(42)
+        blocks = SortedBlocks(load=4)
+        values = []
+        for step in range(2000):
+            if values and generator.random() < 0.4:
+                value = generator.choice(values)
+                blocks.remove(value)
+                values.remove(value)
+            else:
+                value = generator.randint(0, 300)
+                blocks.add(value)
+                bisect.insort(values, value)
+
+        list(blocks).should.equal(values)
+        len(blocks).should.equal(len(values))
+        [blocks[index] for index in range(len(values))].should.equal(values)
+        blocks[-1].should.equal(values[-1])
+        for value in range(-1, 302):
+            blocks.bisect_left(value).should.equal(bisect.bisect_left(values, value))
+            blocks.bisect_right(value).should.equal(bisect.bisect_right(values, value))
+        blocks.slice(10, 40).should.equal(values[10:40])
+
+        blocks.delete_slice(5, 200).should.equal(values[5:200])
+        del values[5:200]
+        list(blocks).should.equal(values)
+        blocks.delete_slice(3, 6).should.equal(values[3:6])
+        del values[3:6]
+        [blocks[index] for index in range(len(values))].should.equal(values)
+
+    def test_leaderboards_use_in_process_connections(self):
+        self.leaderboard.redis_connection.connection_pool.connection_class.should.equal(MemoryConnection)
+        self.leaderboard.rank_members(['member_1', 10, 'member_2', 30, 'member_3', 20])
+        self.leaderboard.rank_member('member_4', 20, 'data_4')
+
+        self.leaderboard.leaders(1, with_member_data=True).should.equal([
+            {'member': 'member_2', 'rank': 1, 'score': 30.0, 'member_data': None},
+            {'member': 'member_4', 'rank': 2, 'score': 20.0, 'member_data': 'data_4'},
+            {'member': 'member_3', 'rank': 3, 'score': 20.0, 'member_data': None},
+            {'member': 'member_1', 'rank': 4, 'score': 10.0, 'member_data': None}])
+        self.leaderboard.around_me('member_1', page_size=2).should.have.length_of(2)
+        self.leaderboard.members_from_score_range(15, 25, members_only=True).should.equal([
+            {'member': 'member_4'}, {'member': 'member_3'}])
+        self.leaderboard.aggregates()['sum'].should.equal(80.0)
+        self.leaderboard.remove_members_in_score_range(15, 25)
+        self.leaderboard.total_members().should.equal(2)
+
+        Leaderboard.when.called_with('name', backend='disk').should.throw(ValueError)
+
+    def test_tie_and_competition_ranking(self):
+        ties = TieRankingLeaderboard('ties', backend='memory', decode_responses=True)
+        ties.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+        [leader['rank'] for leader in ties.leaders(1)].should.equal([1, 1, 2])
+        ties.remove_member('member_1')
+        ties.remove_member('member_2')
+        ties.rank_for('member_3').should.equal(1)
+        ties.redis_connection.zcard('ties:ties').should.equal(1)
+
+        competition = CompetitionRankingLeaderboard(
+            'competition', backend='memory', decode_responses=True)
+        competition.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+        [leader['rank'] for leader in competition.leaders(1)].should.equal([1, 1, 3])
+
+    def test_redis_commands(self):
+        redis = Redis(connection_pool=ConnectionPool(connection_class=MemoryConnection, db=3))
+        redis.zadd('scores', 'member_1', 1.5)
+        redis.zadd('scores', 'member_2', 2)
+        redis.zrange('scores', 0, -1, withscores=True).should.equal(
+            [(b'member_1', 1.5), (b'member_2', 2.0)])
+        redis.zrevrangebyscore('scores', '+inf', '(1.5').should.equal([b'member_2'])
+        redis.hset.when.called_with('scores', 'field', 'value').should.throw(ResponseError)
+        redis.eval.when.called_with('return 1', 0).should.throw(ResponseError)
+
+        redis.expire('scores', 60)
+        redis.ttl('scores').should.equal(60)
+        redis.persist('scores')
+        redis.ttl('scores').should.be.none
+
+        with redis.pipeline() as pipeline:
+            pipeline.zincrby('scores', 'member_1', 3)
+            pipeline.zrem('scores', 'member_2')
+            pipeline.execute().should.equal([4.5, 1])
+        redis.zcard('scores').should.equal(1)
+        redis.zrem('scores', 'member_1')
+        redis.exists('scores').should.be.false
+        redis.flushdb()
@@ -1,5 +1,6 @@
 from leaderboard.leaderboard import Leaderboard
 from leaderboard.competition_ranking_leaderboard import CompetitionRankingLeaderboard
+from .backend import BACKEND
 import unittest
 import sure
 
@@ -8,7 +9,7 @@ class ReverseCompetitionRankingLeaderboardTest(unittest.TestCase):
 
     def setUp(self):
         self.leaderboard = CompetitionRankingLeaderboard(
-            'ties', order=Leaderboard.ASC, decode_responses=True)
+            'ties', backend=BACKEND, order=Leaderboard.ASC, decode_responses=True)
 
     def tearDown(self):
         self.leaderboard.redis_connection.flushdb()
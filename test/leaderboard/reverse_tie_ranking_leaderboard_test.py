@@ -1,5 +1,6 @@
 from leaderboard.leaderboard import Leaderboard
 from leaderboard.tie_ranking_leaderboard import TieRankingLeaderboard
+from .backend import BACKEND
 import unittest
 import time
 import sure
@@ -8,7 +9,7 @@ import sure
 class ReverseTieRankingLeaderboardTest(unittest.TestCase):
 
     def setUp(self):
-        self.leaderboard = TieRankingLeaderboard('ties', order=Leaderboard.ASC, decode_responses=True)
+        self.leaderboard = TieRankingLeaderboard('ties', backend=BACKEND, order=Leaderboard.ASC, decode_responses=True)
 
     def tearDown(self):
         self.leaderboard.redis_connection.flushdb()
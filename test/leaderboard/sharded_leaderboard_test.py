@@ -0,0 +1,244 @@
+from leaderboard.leaderboard import Leaderboard
+from leaderboard.sharded_leaderboard import ShardedLeaderboard
+from leaderboard.importer import BulkImporter
+from .backend import BACKEND, client
+import unittest
+import sure
+
+
+class ShardedLeaderboardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.leaderboard = ShardedLeaderboard(
+            'name',
+            [client(db=db, decode_responses=True) for db in (1, 2, 3)])
+        # Same members in a single redis instance, for comparison
+        self.single = Leaderboard(
+            'name', redis_connection=client(db=4, decode_responses=True))
+
+    def tearDown(self):
+        for shard in self.leaderboard.shards:
+            shard.redis_connection.flushdb()
+        self.single.redis_connection.flushdb()
+
+    def test_members_are_spread_across_shards(self):
+        self.__rank_members_in_leaderboard(30)
+
+        self.leaderboard.total_members().should.equal(30)
+        for shard in self.leaderboard.shards:
+            shard.total_members().should.be.greater_than(0)
+            for member in shard.all_leaders(members_only=True):
+                self.leaderboard.shard_for(member['member']).should.equal(shard)
+
+    def test_routed_member_operations(self):
+        self.leaderboard.rank_member('member_1', 10, 'data_1')
+        self.leaderboard.check_member('member_1').should.be.true
+        self.leaderboard.score_for('member_1').should.equal(10.0)
+        self.leaderboard.member_data_for('member_1').should.equal('data_1')
+
+        self.leaderboard.change_score_for('member_1', 5)
+        self.leaderboard.score_for('member_1').should.equal(15.0)
+        self.leaderboard.rank_member_if(
+            Leaderboard.KEEP_HIGHEST, 'member_1', 12).should.be.false
+
+        self.leaderboard.remove_member('member_1')
+        self.leaderboard.check_member('member_1').should.be.false
+        self.leaderboard.total_members().should.equal(0)
+
+    def test_leaders_match_a_single_instance(self):
+        self.__rank_members_in_leaderboard(60)
+
+        for page in range(1, 4):
+            self.leaderboard.leaders(page, with_member_data=True).should.equal(
+                self.single.leaders(page, with_member_data=True))
+
+        self.leaderboard.top(7).should.equal(self.single.top(7))
+        self.leaderboard.all_leaders().should.equal(self.single.all_leaders())
+
+    def test_ties_have_consistent_ranks_and_pages(self):
+        for index in range(1, 31):
+            self.leaderboard.rank_member('member_%s' % index, index % 4)
+
+        leaders = self.leaderboard.all_leaders()
+        [leader['rank'] for leader in leaders].should.equal(list(range(1, 31)))
+        for leader in leaders:
+            self.leaderboard.rank_for(leader['member']).should.equal(leader['rank'])
+            self.leaderboard.around_me(leader['member'], page_size=1)[0][
+                'member'].should.equal(leader['member'])
+
+        self.leaderboard.ranked_in_list(
+            [leader['member'] for leader in reversed(leaders)]).should.equal(
+            list(reversed(leaders)))
+
+    def test_iter_leaders_merges_shards_lazily(self):
+        self.__rank_members_in_leaderboard(40)
+
+        list(self.leaderboard.iter_leaders(chunk_size=7, with_member_data=True)).should.equal(
+            self.single.all_leaders(with_member_data=True))
+        self.leaderboard.total_scores().should.equal(self.single.total_scores())
+
+    def test_aggregates_match_a_single_instance(self):
+        self.__rank_members_in_leaderboard(40)
+
+        for aggregates, expected in [
+                (self.leaderboard.aggregates(), self.single.aggregates()),
+                (self.leaderboard.aggregates_for_score_range(5, 17),
+                 self.single.aggregates_for_score_range(5, 17)),
+                (self.leaderboard.aggregates_for_rank_range(3, 12),
+                 self.single.aggregates_for_rank_range(3, 12))]:
+            aggregates.should.equal(dict(expected, variance=aggregates['variance']))
+            aggregates['variance'].should.equal(expected['variance'], epsilon=1e-9)
+
+    def test_track_aggregates_option_applies_to_every_shard(self):
+        leaderboard = ShardedLeaderboard(
+            'name',
+            [client(db=db, decode_responses=True) for db in (1, 2, 3)],
+            track_aggregates=True)
+        for index in range(1, 31):
+            leaderboard.rank_member('member_%s' % index, index)
+        leaderboard.remove_members_outside_rank(10).should.equal(20)
+
+        leaderboard.aggregates()['sum'].should.equal(sum(range(21, 31)))
+        for shard in leaderboard.shards:
+            shard.redis_connection.hget('name:aggregates', 'count').should.equal(
+                str(shard.total_members()))
+
+    def test_page_cache_is_shared_with_the_shards(self):
+        leaderboard = ShardedLeaderboard(
+            'name',
+            [client(db=db, decode_responses=True) for db in (1, 2, 3)],
+            page_cache=True,
+            page_cache_ttl=0)
+        self.__rank_members_in_leaderboard(10)
+        leaderboard.leaders(1).should.equal(self.single.leaders(1))
+
+        leaderboard.rank_member('member_11', 11)
+        leaderboard.leaders(1)[0]['member'].should.equal('member_11')
+        # A writer without the page cache does not change the version
+        self.leaderboard.rank_member('member_1', 12)
+        leaderboard.leaders(1)[0]['member'].should.equal('member_11')
+        leaderboard.shard_for('member_1').redis_connection.incr('name:version')
+        leaderboard.leaders(1)[0]['member'].should.equal('member_1')
+        # Members added outside the library change the number of members
+        leaderboard.shard_for('member_13').redis_connection.zadd('name', 13, 'member_13')
+        leaderboard.leaders(1)[0]['member'].should.equal('member_13')
+
+    def test_ranks_and_ranges_match_a_single_instance(self):
+        self.__rank_members_in_leaderboard(40)
+
+        for index in [1, 13, 40]:
+            member = 'member_%s' % index
+            self.leaderboard.rank_for(member).should.equal(self.single.rank_for(member))
+            self.leaderboard.score_and_rank_for(member).should.equal(
+                self.single.score_and_rank_for(member))
+            self.leaderboard.around_me(member).should.equal(self.single.around_me(member))
+            self.leaderboard.percentile_for(member).should.equal(
+                self.single.percentile_for(member))
+            self.leaderboard.page_for(member, 10).should.equal(
+                self.single.page_for(member, 10))
+
+        self.leaderboard.members_from_score_range(10, 25).should.equal(
+            self.single.members_from_score_range(10, 25))
+        self.leaderboard.members_from_rank_range(5, 18).should.equal(
+            self.single.members_from_rank_range(5, 18))
+        self.leaderboard.score_for_percentile(33).should.equal(
+            self.single.score_for_percentile(33))
+        self.leaderboard.rank_for('jones').should.be.none
+
+    def test_deep_pages_read_a_window_from_each_shard(self):
+        self.__rank_members_in_leaderboard(300)
+        rows = []
+
+        def counting(execute_command):
+            def counting_execute_command(*args, **options):
+                response = execute_command(*args, **options)
+                if args[0] in ('ZRANGE', 'ZREVRANGE', 'ZRANGEBYSCORE', 'ZREVRANGEBYSCORE'):
+                    rows.append(len(response))
+                return response
+            return counting_execute_command
+
+        for shard in self.leaderboard.shards:
+            shard.redis_connection.execute_command = counting(shard.redis_connection.execute_command)
+
+        for page in [2, 20, 30, 31]:
+            self.leaderboard.leaders(page, page_size=10).should.equal(
+                self.single.leaders(page, page_size=10))
+        self.leaderboard.members_from_rank_range(195, 210).should.equal(
+            self.single.members_from_rank_range(195, 210))
+        self.leaderboard.order = self.single.order = Leaderboard.ASC
+        self.leaderboard.leaders(20, page_size=10).should.equal(self.single.leaders(20, page_size=10))
+        sum(rows).should.be.lower_than(300)
+
+        # Ties across shards keep the order of the full merge
+        for index in range(5):
+            self.leaderboard.rank_member('tie_%s' % index, 100)
+        self.leaderboard.leaders(11, page_size=10).should.equal(
+            self.leaderboard.all_leaders()[100:110])
+
+    def test_ranks_in_ascending_order(self):
+        self.leaderboard.order = Leaderboard.ASC
+        self.single.order = Leaderboard.ASC
+        self.__rank_members_in_leaderboard(30)
+
+        self.leaderboard.leaders(1).should.equal(self.single.leaders(1))
+        self.leaderboard.rank_for('member_3').should.equal(3)
+        self.leaderboard.members_from_score_range(5, 9).should.equal(
+            self.single.members_from_score_range(5, 9))
+
+    def test_remove_members_outside_rank(self):
+        self.__rank_members_in_leaderboard(25)
+
+        self.leaderboard.remove_members_outside_rank(10).should.equal(15)
+        self.leaderboard.total_members().should.equal(10)
+        [leader['member'] for leader in self.leaderboard.all_leaders()].should.equal(
+            ['member_%s' % index for index in range(25, 15, -1)])
+
+    def test_rank_members_in_routes_every_chunk(self):
+        self.leaderboard.rank_members_in(
+            'name',
+            [('member_%s' % index, index, 'data_%s' % index) for index in range(1, 51)],
+            chunk_size=7).should.equal(50)
+
+        self.leaderboard.total_members().should.equal(50)
+        self.leaderboard.members_data_for(['member_50', 'member_1']).should.equal(
+            ['data_50', 'data_1'])
+
+    def test_bulk_import_routes_rows_to_shards(self):
+        rows = [('member_%s' % index, index, 'data_%s' % index) for index in range(1, 51)]
+        BulkImporter(self.leaderboard, chunk_size=7, window=3).import_rows(rows).should.equal(50)
+        self.single.rank_members(rows)
+
+        self.leaderboard.all_leaders(with_member_data=True).should.equal(
+            self.single.all_leaders(with_member_data=True))
+        for shard in self.leaderboard.shards:
+            shard.total_members().should.be.greater_than(0)
+
+    def test_flush_writes_the_changes_buffered_by_every_shard(self):
+        with ShardedLeaderboard(
+                'name', [client(db=db, decode_responses=True) for db in (1, 2, 3)],
+                write_behind=True, write_behind_max_delay=None) as leaderboard:
+            for index in range(1, 11):
+                leaderboard.change_score_for('member_%s' % index, index)
+            leaderboard.total_members().should.equal(0)
+
+        leaderboard.total_members().should.equal(10)
+        leaderboard.change_score_for('member_1', 5)
+        leaderboard.flush().should.equal(1)
+        leaderboard.score_for('member_1').should.equal(6.0)
+        leaderboard.flush().should.equal(0)
+
+    def test_shards_can_be_given_as_connection_options(self):
+        leaderboard = ShardedLeaderboard(
+            'name', [{'db': 1}, {'db': 2}], backend=BACKEND, pools={}, decode_responses=True)
+        leaderboard.rank_member('member_1', 1)
+
+        leaderboard.shards[1].redis_connection.connection_pool.connection_kwargs[
+            'db'].should.equal(2)
+        leaderboard.rank_for('member_1').should.equal(1)
+
+    def __rank_members_in_leaderboard(self, members_to_add=6):
+        for index in range(1, members_to_add + 1):
+            self.leaderboard.rank_member(
+                'member_%s' % index, index, 'member_data_%s' % index)
+            self.single.rank_member(
+                'member_%s' % index, index, 'member_data_%s' % index)
@@ -0,0 +1,120 @@
+from leaderboard.sliding_window_leaderboard import SlidingWindowLeaderboard
+from .backend import BACKEND
+import unittest
+import time
+import sure
+
+
+class SlidingWindowLeaderboardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = time.time()
+        self.leaderboard = SlidingWindowLeaderboard(
+            'name', backend=BACKEND, window=3, clock=lambda: self.now, decode_responses=True)
+
+    def tearDown(self):
+        self.leaderboard.redis_connection.flushdb()
+
+    def test_scores_are_summed_over_the_window(self):
+        self.leaderboard.change_score_for('member_1', 10)
+        self.leaderboard.change_score_for('member_2', 15)
+        self.now += 3600
+        self.leaderboard.change_score_for('member_1', 10, 'member_data_1')
+        self.now += 3600
+
+        self.leaderboard.leaders(1, with_member_data=True).should.equal([
+            {'member': 'member_1', 'rank': 1, 'score': 20.0, 'member_data': 'member_data_1'},
+            {'member': 'member_2', 'rank': 2, 'score': 15.0, 'member_data': None}])
+
+        self.now += 3600
+        self.leaderboard.leaders(1).should.equal([
+            {'member': 'member_1', 'rank': 1, 'score': 10.0}])
+        self.leaderboard.total_members().should.equal(1)
+        self.leaderboard.aggregates()['sum'].should.equal(10.0)
+
+        SlidingWindowLeaderboard.when.called_with(
+            'name', track_aggregates=True).should.throw(ValueError)
+
+    def test_union_is_updated_by_writes_until_the_window_advances(self):
+        self.leaderboard.change_score_for('member_1', 10)
+        window_name = self.leaderboard.window_name()
+        self.leaderboard.rank_members(['member_2', 5, 'member_3', 1])
+        self.leaderboard.change_score_for('member_1', 5)
+
+        self.leaderboard.window_name().should.equal(window_name)
+        self.leaderboard.redis_connection.zrevrange(
+            window_name, 0, -1, withscores=True).should.equal(
+            [('member_1', 15.0), ('member_2', 5.0), ('member_3', 1.0)])
+        self.leaderboard.rank_for('member_2').should.equal(2)
+
+        self.leaderboard.remove_member('member_1')
+        self.leaderboard.score_for('member_1').should.be.none
+
+        self.now += 3600
+        self.leaderboard.window_name().shouldnt.equal(window_name)
+        self.leaderboard.total_members().should.equal(2)
+
+    def test_max_aggregate(self):
+        self.leaderboard = SlidingWindowLeaderboard(
+            'name', backend=BACKEND, window=3, aggregate='MAX', clock=lambda: self.now, decode_responses=True)
+        self.leaderboard.rank_member('member_1', 30)
+        self.now += 3600
+        self.leaderboard.window_name()
+        self.leaderboard.rank_member('member_1', 20)
+        self.leaderboard.rank_member('member_2', 25)
+
+        self.leaderboard.around_me('member_2').should.equal([
+            {'member': 'member_1', 'rank': 1, 'score': 30.0},
+            {'member': 'member_2', 'rank': 2, 'score': 25.0}])
+
+    def test_slots_expire_when_they_leave_the_window(self):
+        self.leaderboard.change_score_for('member_1', 10, 'member_data_1')
+
+        slot = int(self.now // 3600)
+        expected_ttl = (slot + 3) * 3600 - self.now
+        self.leaderboard.redis_connection.ttl('name:slot:%s' % slot).should.be.within(
+            expected_ttl - 60, expected_ttl + 1)
+        self.leaderboard.redis_connection.ttl('name:member_data').should.be.within(
+            expected_ttl - 60, expected_ttl + 1)
+
+    def test_read_before_first_write(self):
+        self.leaderboard.leaders(1).should.equal([])
+        self.leaderboard.rank_member('member_1', 10)
+
+        self.leaderboard.leaders(1).should.equal([{'member': 'member_1', 'rank': 1, 'score': 10.0}])
+        self.leaderboard.total_members().should.equal(1)
+        self.leaderboard.rank_for('member_1').should.equal(1)
+
+        self.leaderboard.remove_member('member_1')
+        self.leaderboard.total_members().should.equal(0)
+        self.leaderboard.rank_member('member_2', 5)
+        self.leaderboard.score_for('member_2').should.equal(5.0)
+
+    def test_inherited_reads_use_the_window(self):
+        self.leaderboard.rank_member('member_1', 10, 'member_data_1')
+        self.now += 3600
+        self.leaderboard.change_score_for('member_1', 5)
+        self.leaderboard.rank_member('member_2', 20)
+
+        self.leaderboard.member_at(1).should.equal({'member': 'member_2', 'rank': 1, 'score': 20.0})
+        self.leaderboard.check_member('member_1').should.be.true
+        self.leaderboard.all_leaders(with_member_data=True).should.equal([
+            {'member': 'member_2', 'rank': 1, 'score': 20.0, 'member_data': None},
+            {'member': 'member_1', 'rank': 2, 'score': 15.0, 'member_data': 'member_data_1'}])
+        [leader['member'] for leader in self.leaderboard.iter_leaders(chunk_size=1)].should.equal(
+            ['member_2', 'member_1'])
+        self.leaderboard.top(1).should.have.length_of(1)
+        self.leaderboard.members_from_score_range(10, 16, members_only=True).should.equal([{'member': 'member_1'}])
+        self.leaderboard.score_and_rank_for('member_1').should.equal(
+            {'member': 'member_1', 'score': 15.0, 'rank': 2})
+        self.leaderboard.ranked_in_list(['member_1']).should.equal([
+            {'member': 'member_1', 'rank': 2, 'score': 15.0}])
+        self.leaderboard.percentile_for('member_2').should.equal(50)
+        self.leaderboard.page_for('member_1').should.equal(1)
+        self.leaderboard.total_pages().should.equal(1)
+        self.leaderboard.score_for_percentile(0).should.equal(15.0)
+        self.leaderboard.leaders_in('other', 1).should.equal([])
+
+        self.leaderboard.remove_members_in_score_range.when.called_with(0, 10).should.throw(ValueError)
+        self.leaderboard.rank_member_if.when.called_with(
+            SlidingWindowLeaderboard.KEEP_HIGHEST, 'member_1', 30).should.throw(ValueError)
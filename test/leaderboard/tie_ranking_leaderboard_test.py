@@ -1,4 +1,10 @@
 from leaderboard.tie_ranking_leaderboard import TieRankingLeaderboard
+from leaderboard import snapshot
+from leaderboard.archive import LeaderboardArchive
+from leaderboard.importer import BulkImporter
+from .backend import BACKEND
+import os
+import tempfile
 import unittest
 import time
 import sure
@@ -7,7 +13,7 @@ import sure
 class TieRankingLeaderboardTest(unittest.TestCase):
 
     def setUp(self):
-        self.leaderboard = TieRankingLeaderboard('ties', decode_responses=True)
+        self.leaderboard = TieRankingLeaderboard('ties', backend=BACKEND, decode_responses=True)
 
     def tearDown(self):
         self.leaderboard.redis_connection.flushdb()
@@ -32,6 +38,13 @@ class TieRankingLeaderboardTest(unittest.TestCase):
         leaders[3]['rank'].should.equal(2)
         leaders[4]['rank'].should.equal(3)
 
+    def test_leaders_in_the_tuple_result_format(self):
+        self.leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+
+        self.leaderboard.leaders(1, result_format=TieRankingLeaderboard.TUPLE).should.equal(
+            [('member_2', 1, 50.0), ('member_1', 1, 50.0), ('member_3', 2, 30.0)])
+        self.leaderboard.around_me('member_3', page_size=1, result_format=TieRankingLeaderboard.COLUMNAR).ranks[0].should.equal(2)
+
     def test_correct_rankings_for_leaders_with_different_page_sizes(self):
         self.leaderboard.rank_member('member_1', 50)
         self.leaderboard.rank_member('member_2', 50)
@@ -71,6 +84,35 @@ class TieRankingLeaderboardTest(unittest.TestCase):
         leaders[1]['rank'].should.equal(2)
         leaders[2]['rank'].should.equal(3)
 
+    def test_correct_rankings_for_all_leaders(self):
+        self.leaderboard.rank_member('member_1', 50)
+        self.leaderboard.rank_member('member_2', 50)
+        self.leaderboard.rank_member('member_3', 30)
+        self.leaderboard.rank_member('member_4', 10)
+
+        leaders = self.leaderboard.all_leaders()
+        [leader['rank'] for leader in leaders].should.equal([1, 1, 2, 3])
+
+    def test_correct_rankings_for_iter_leaders_across_chunks(self):
+        for index in range(1, 21):
+            self.leaderboard.rank_member('member_%s' % index, index // 3)
+
+        list(self.leaderboard.iter_leaders(chunk_size=4)).should.equal(
+            self.leaderboard.all_leaders())
+
+    def test_correct_rankings_for_members_from_score_range(self):
+        self.leaderboard.rank_member('member_1', 50)
+        self.leaderboard.rank_member('member_2', 50)
+        self.leaderboard.rank_member('member_3', 30)
+        self.leaderboard.rank_member('member_4', 30)
+        self.leaderboard.rank_member('member_5', 10)
+
+        members = self.leaderboard.members_from_score_range(10, 30)
+        len(members).should.equal(3)
+        members[0]['rank'].should.equal(2)
+        members[1]['rank'].should.equal(2)
+        members[2]['rank'].should.equal(3)
+
     def test_removing_a_single_member_will_also_remove_their_score_from_the_tie_scores_leaderboard_when_appropriate(self):
         self.leaderboard.rank_member('member_1', 50)
         self.leaderboard.rank_member('member_2', 50)
@@ -168,6 +210,30 @@ class TieRankingLeaderboardTest(unittest.TestCase):
         self.leaderboard.rank_for('member_4').should.equal(4)
         self.leaderboard.score_for('member_3').should.equal(3.5)
 
+    def test_change_score_for_with_write_behind(self):
+        self.leaderboard.rank_member('member_1', 10)
+        self.leaderboard.rank_member('member_2', 10)
+        with TieRankingLeaderboard('ties', backend=BACKEND, write_behind=True, decode_responses=True) as lb:
+            lb.change_score_for('member_1', 5)
+            lb.change_score_for('member_1', 5)
+            lb.change_score_for('member_3', 20)
+
+        self.leaderboard.score_for('member_1').should.equal(20.0)
+        self.leaderboard.rank_for('member_1').should.equal(1)
+        self.leaderboard.rank_for('member_3').should.equal(1)
+        self.leaderboard.rank_for('member_2').should.equal(2)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+
+        with TieRankingLeaderboard('ties', backend=BACKEND, write_behind=True, decode_responses=True) as lb:
+            lb.change_score_for('member_1', 5)
+            lb.remove_member('member_1')
+            lb.change_score_for('member_2', 1)
+            lb.rank_member('member_2', 30)
+
+        self.leaderboard.score_for('member_1').should.be(None)
+        self.leaderboard.score_for('member_2').should.equal(30.0)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+
     def test_change_score_and_member_data_for_a_member(self):
         self.leaderboard.change_score_for('member_1', 10, 'optional-data')
         self.leaderboard.rank_for('member_1').should.equal(1)
@@ -214,6 +280,52 @@ class TieRankingLeaderboardTest(unittest.TestCase):
             ['member_200'], include_missing=False, with_member_data=True)
         len(leaders).should.be(0)
 
+    def test_ranked_in_list_in_a_single_round_trip(self):
+        self.leaderboard.rank_member('member_1', 50, 'data_1')
+        self.leaderboard.rank_member('member_2', 50)
+        self.leaderboard.rank_member('member_3', 30, 'data_3')
+        self.leaderboard.rank_member('member_4', 10)
+
+        commands = []
+        execute_command = self.leaderboard.redis_connection.execute_command
+
+        def counting_execute_command(*args, **options):
+            commands.append(args[0])
+            return execute_command(*args, **options)
+
+        self.leaderboard.redis_connection.execute_command = counting_execute_command
+
+        leaders = self.leaderboard.ranked_in_list(
+            ['member_200', 'member_4', 'member_3', 'member_2', 'member_1'],
+            include_missing=False, with_member_data=True)
+        len(commands).should.equal(1)
+        [leader['member'] for leader in leaders].should.equal(
+            ['member_4', 'member_3', 'member_2', 'member_1'])
+        [leader['rank'] for leader in leaders].should.equal([3, 2, 1, 1])
+        [leader['member_data'] for leader in leaders].should.equal(
+            [None, 'data_3', None, 'data_1'])
+
+    def test_ties_leaderboard_holds_one_entry_per_distinct_score(self):
+        self.leaderboard.rank_member('member_1', 50)
+        self.leaderboard.rank_member('member_2', 50)
+        self.leaderboard.rank_member('member_3', 30)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+
+        self.leaderboard.rank_member('member_1', 30)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+        self.leaderboard.rank_member('member_2', 30)
+        self.leaderboard.total_members_in('ties:ties').should.equal(1)
+
+        self.leaderboard.change_score_for('member_3', 5)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+        self.leaderboard.rank_for('member_3').should.equal(1)
+        self.leaderboard.rank_for('member_1').should.equal(2)
+
+        self.leaderboard.change_score_for_member_in('other', 'member_1', 5)
+        self.leaderboard.score_for_in('other', 'member_1').should.equal(5.0)
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+        self.leaderboard.total_members_in('other:ties').should.equal(1)
+
     def test_it_should_output_the_correct_rank_when_initial_score_is_0_and_then_later_scores_are_ties(self):
         self.leaderboard.rank_members(['member_1', 0, 'member_2', 0])
         self.leaderboard.rank_for('member_1').should.equal(1)
@@ -229,6 +341,63 @@ class TieRankingLeaderboardTest(unittest.TestCase):
         self.leaderboard.rank_for('member_1').should.equal(2)
         self.leaderboard.rank_for('member_2').should.equal(2)
 
+    def test_writes_are_a_single_script_call(self):
+        self.leaderboard.rank_member('member_1', 50)
+
+        commands = []
+        execute_command = self.leaderboard.redis_connection.execute_command
+
+        def counting_execute_command(*args, **options):
+            commands.append(args[0])
+            return execute_command(*args, **options)
+
+        self.leaderboard.redis_connection.execute_command = counting_execute_command
+
+        self.leaderboard.rank_member('member_2', 50, 'data_2')
+        self.leaderboard.change_score_for('member_1', 10)
+        self.leaderboard.remove_member('member_2')
+        commands.should.equal(['EVALSHA'] * 3)
+
+        self.leaderboard.rank_for('member_1').should.equal(1)
+        self.leaderboard.total_members_in('ties:ties').should.equal(1)
+
+    def test_rank_members_in_chunks_keeps_the_ties_leaderboard_consistent(self):
+        self.leaderboard.rank_members(['member_1', 50, 'member_2', 40])
+
+        commands = []
+        execute_command = self.leaderboard.redis_connection.execute_command
+
+        def counting_execute_command(*args, **options):
+            commands.append(args[0])
+            return execute_command(*args, **options)
+
+        self.leaderboard.redis_connection.execute_command = counting_execute_command
+
+        members = (('member_%s' % index, index % 3, 'data_%s' % index) for index in range(1, 8))
+        self.leaderboard.rank_members_in('ties', members, chunk_size=3).should.equal(7)
+        len(commands).should.equal(3)
+
+        self.leaderboard.total_members().should.equal(7)
+        self.leaderboard.total_members_in('ties:ties').should.equal(3)
+        self.leaderboard.rank_for('member_2').should.equal(1)
+        self.leaderboard.rank_for('member_3').should.equal(3)
+        self.leaderboard.member_data_for('member_7').should.equal('data_7')
+
+    def test_rank_member_if_with_conditional_modes(self):
+        self.leaderboard.rank_member('member_1', 50)
+        self.leaderboard.rank_member('member_2', 30)
+
+        self.leaderboard.rank_member_if(TieRankingLeaderboard.KEEP_HIGHEST, 'member_2', 20).should.be.false
+        self.leaderboard.rank_member_if(TieRankingLeaderboard.KEEP_HIGHEST, 'member_2', 50, 'data').should.be.true
+        self.leaderboard.total_members_in('ties:ties').should.equal(1)
+        self.leaderboard.rank_for('member_2').should.equal(1)
+        self.leaderboard.member_data_for('member_2').should.equal('data')
+
+        self.leaderboard.rank_member_if(TieRankingLeaderboard.ONLY_IF_NEW, 'member_3', 10).should.be.true
+        self.leaderboard.rank_member_if(TieRankingLeaderboard.ONLY_IF_EXISTS, 'member_4', 10).should.be.false
+        self.leaderboard.total_members_in('ties:ties').should.equal(2)
+        self.leaderboard.rank_for('member_3').should.equal(2)
+
     def test_rank_member_across(self):
         self.leaderboard.rank_member_across(
             ['highscores', 'more_highscores'], 'david', 50000, {'member_name': 'david'})
@@ -236,9 +405,92 @@ class TieRankingLeaderboardTest(unittest.TestCase):
         len(self.leaderboard.leaders_in('more_highscores', 1)).should.equal(1)
 
     def test_it_should_correctly_pop_ties_namespace_from_options(self):
-        self.leaderboard = TieRankingLeaderboard('ties', ties_namespace='ties_namespace')
+        self.leaderboard = TieRankingLeaderboard('ties', backend=BACKEND, ties_namespace='ties_namespace')
         self.__rank_members_in_leaderboard(26)
 
+    def test_cluster_option_keeps_ties_in_the_leaderboard_slot(self):
+        leaderboard = TieRankingLeaderboard('ties', backend=BACKEND, cluster=True, decode_responses=True)
+        leaderboard.rank_member('member_1', 50)
+        leaderboard.rank_member('member_2', 50)
+        leaderboard.rank_member('member_3', 30)
+
+        leaderboard.redis_connection.exists('{ties}:ties').should.be.true
+        [leader['rank'] for leader in leaderboard.leaders(1)].should.equal([1, 1, 2])
+
+        leaderboard.delete_leaderboard()
+        leaderboard.redis_connection.exists('{ties}:ties').should.be.false
+
+    def test_track_aggregates_option_keeps_aggregates_and_ties_in_step(self):
+        leaderboard = TieRankingLeaderboard('ties', backend=BACKEND, track_aggregates=True, decode_responses=True)
+        leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30, 'member_4', 10])
+        leaderboard.change_score_for('member_3', 20)
+        leaderboard.remove_member('member_1')
+        leaderboard.remove_members_in_score_range(0, 10)
+
+        leaderboard.aggregates().should.equal({
+            'count': 2, 'sum': 100.0, 'mean': 50.0, 'min': 50.0, 'max': 50.0, 'variance': 0.0})
+        leaderboard.total_members_in('ties:ties').should.equal(1)
+
+        leaderboard.delete_leaderboard()
+        leaderboard.redis_connection.exists('ties:aggregates').should.be.false
+
+    def test_merge_leaderboards_across_cluster_slots_replaces_the_ties_leaderboard(self):
+        foo_leaderboard = TieRankingLeaderboard('foo', backend=BACKEND, cluster=True, decode_responses=True)
+        bar_leaderboard = TieRankingLeaderboard('bar', backend=BACKEND, cluster=True, decode_responses=True)
+        foo_leaderboard.rank_members(['member_1', 10, 'member_2', 20])
+        bar_leaderboard.rank_members(['member_1', 10, 'member_3', 30])
+        foobar_leaderboard = TieRankingLeaderboard('foobar', backend=BACKEND, cluster=True, decode_responses=True)
+        foobar_leaderboard.rank_member('member_4', 40)
+
+        foo_leaderboard.merge_leaderboards('foobar', ['bar'])
+        [(leader['member'], leader['rank']) for leader in foobar_leaderboard.all_leaders()].should.equal(
+            [('member_3', 1), ('member_2', 2), ('member_1', 2)])
+        foobar_leaderboard.total_members_in('{foobar}:ties').should.equal(2)
+
+    def test_page_cache_is_invalidated_by_writes(self):
+        leaderboard = TieRankingLeaderboard(
+            'ties', backend=BACKEND, page_cache=True, page_cache_ttl=60, decode_responses=True)
+        leaderboard.rank_member('member_1', 50)
+        leaderboard.leaders(1)[0]['rank'].should.equal(1)
+
+        leaderboard.rank_member('member_2', 60)
+        [leader['rank'] for leader in leaderboard.leaders(1)].should.equal([1, 2])
+        leaderboard.remove_members_in_score_range(0, 55)
+        leaderboard.total_members().should.equal(1)
+        len(leaderboard.leaders(1)).should.equal(1)
+
+        version = leaderboard.redis_connection.get('ties:version')
+        leaderboard.expire_leaderboard(60)
+        leaderboard.redis_connection.get('ties:version').should_not.equal(version)
+        leaderboard.redis_connection.ttl('ties:version').should.be.greater_than(0)
+
+    @unittest.skipIf(snapshot.numpy is None, 'needs numpy')
+    def test_snapshot_arrays_rank_scores_densely(self):
+        self.leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30, 'member_4', 10])
+
+        arrays = self.leaderboard.snapshot_arrays(chunk_size=3)
+        list(arrays.ranks).should.equal([1, 1, 2, 3])
+        list(arrays.ranks_for([60, 50, 40, 30, 0])).should.equal([1, 1, 2, 2, 4])
+
+    def test_archive_keeps_tied_ranks(self):
+        self.leaderboard.rank_members(['member_1', 50, 'member_2', 50, 'member_3', 30])
+        path = os.path.join(tempfile.mkdtemp(), 'ties.lbarchive')
+
+        self.leaderboard.export_archive(path)
+        with LeaderboardArchive(path) as leaders:
+            [leader.rank for leader in leaders].should.equal([1, 1, 2])
+        self.leaderboard.restore_archive_in('restored', path)
+        [leader['rank'] for leader in self.leaderboard.all_leaders_from('restored')].should.equal([1, 1, 2])
+        os.remove(path)
+
+    def test_bulk_import_keeps_tied_ranks(self):
+        rows = [('member_%s' % index, index // 2 * 10) for index in range(10)]
+        BulkImporter(self.leaderboard, chunk_size=3, window=2).import_rows(rows).should.equal(10)
+
+        [leader['rank'] for leader in self.leaderboard.all_leaders()].should.equal(
+            [1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+        self.leaderboard.redis_connection.zcard('ties:ties').should.equal(5)
+
     def __rank_members_in_leaderboard(self, members_to_add=6):
         for index in range(1, members_to_add):
             self.leaderboard.rank_member(
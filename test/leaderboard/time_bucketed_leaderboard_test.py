@@ -0,0 +1,164 @@
+from leaderboard.time_bucketed_leaderboard import TimeBucketedLeaderboard
+from .backend import BACKEND
+from datetime import date, datetime, timedelta
+import calendar
+import time
+import unittest
+import sure
+
+
+class TimeBucketedLeaderboardTest(unittest.TestCase):
+
+    def setUp(self):
+        # Friday 2026-10-16 12:00 UTC
+        self.now = calendar.timegm(datetime(2026, 10, 16, 12).utctimetuple())
+        self.leaderboard = TimeBucketedLeaderboard(
+            'name', backend=BACKEND, clock=lambda: self.now, decode_responses=True)
+
+    def tearDown(self):
+        self.leaderboard.redis_connection.flushdb()
+
+    def test_bucket_names(self):
+        self.leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY).should.equal(
+            'name:daily:2026-10-16')
+        self.leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY, 16).should.equal(
+            'name:daily:2026-09-30')
+        self.leaderboard.bucket_name(TimeBucketedLeaderboard.WEEKLY).should.equal(
+            'name:weekly:2026-W42')
+        self.leaderboard.bucket_name(TimeBucketedLeaderboard.MONTHLY, 10).should.equal(
+            'name:monthly:2025-12')
+
+    def test_writes_go_to_every_current_bucket_with_expiry(self):
+        self.now = time.time()
+        today = date(*time.gmtime(self.now)[:3])
+        monday = today - timedelta(days=today.weekday())
+        months = today.year * 12 + today.month - 1 + 13
+        self.leaderboard.rank_member('member_1', 10, 'member_data_1')
+        self.leaderboard.change_score_for('member_1', 5)
+
+        self.leaderboard.score_for('member_1').should.equal(15.0)
+        connection = self.leaderboard.redis_connection
+        for period, expire_at in [
+                (TimeBucketedLeaderboard.DAILY, today + timedelta(days=31)),
+                (TimeBucketedLeaderboard.WEEKLY, monday + timedelta(weeks=5)),
+                (TimeBucketedLeaderboard.MONTHLY, date(months // 12, months % 12 + 1, 1))]:
+            bucket_name = self.leaderboard.bucket_name(period)
+            self.leaderboard.score_for_in(bucket_name, 'member_1').should.equal(15.0)
+            self.leaderboard.member_data_for_in(bucket_name, 'member_1').should.equal(
+                'member_data_1')
+            expected_ttl = calendar.timegm(expire_at.timetuple()) - self.now
+            connection.ttl(bucket_name).should.be.within(
+                expected_ttl - 60, expected_ttl + 1)
+            connection.exists('%s:member_data' % bucket_name).should.be.false
+
+        connection.ttl('name').should.be.none
+        connection.ttl('name:member_data').should.be.none
+
+    def test_buckets_share_the_member_data_of_the_leaderboard(self):
+        self.leaderboard.rank_member('member_1', 10, 'member_data_1')
+        bucket_name = self.leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY)
+        window_name = self.leaderboard.window_name(TimeBucketedLeaderboard.DAILY, 7)
+
+        self.leaderboard.update_member_data('member_1', 'member_data_2')
+        self.leaderboard.member_data_for_in(bucket_name, 'member_1').should.equal('member_data_2')
+        self.leaderboard.leaders_in(window_name, 1, with_member_data=True)[0][
+            'member_data'].should.equal('member_data_2')
+
+        self.leaderboard.remove_member_data_in(bucket_name, 'member_1')
+        self.leaderboard.member_data_for('member_1').should.be.none
+        self.leaderboard.redis_connection.keys('*member_data*').should.equal([])
+
+    def test_rank_member_if_applies_the_mode_to_every_bucket(self):
+        self.leaderboard.rank_member('member_1', 100)
+        self.now += 86400
+        daily = self.leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY)
+        weekly = self.leaderboard.bucket_name(TimeBucketedLeaderboard.WEEKLY)
+
+        self.leaderboard.rank_member_if(
+            TimeBucketedLeaderboard.KEEP_HIGHEST, 'member_1', 50, 'member_data_1').should.be.false
+        self.leaderboard.score_for('member_1').should.equal(100.0)
+        self.leaderboard.score_for_in(daily, 'member_1').should.equal(50.0)
+        self.leaderboard.score_for_in(weekly, 'member_1').should.equal(100.0)
+        self.leaderboard.member_data_for('member_1').should.be.none
+
+        self.leaderboard.rank_member_if(
+            TimeBucketedLeaderboard.KEEP_HIGHEST, 'member_1', 120, 'member_data_1').should.be.true
+        self.leaderboard.score_for_in(daily, 'member_1').should.equal(120.0)
+        self.leaderboard.member_data_for_in(daily, 'member_1').should.equal('member_data_1')
+
+        self.leaderboard.rank_member_if(
+            TimeBucketedLeaderboard.ONLY_IF_NEW, 'member_2', 10).should.be.true
+        self.leaderboard.rank_member_if(
+            TimeBucketedLeaderboard.ONLY_IF_NEW, 'member_2', 20).should.be.false
+        self.leaderboard.score_for_in(daily, 'member_2').should.equal(10.0)
+        self.leaderboard.redis_connection.ttl(daily).should.be.greater_than(0)
+
+    def test_leaders_over_several_buckets(self):
+        self.leaderboard.rank_members(['member_1', 10, 'member_2', 5])
+        self.now -= 86400
+        self.leaderboard.rank_members(['member_2', 20, 'member_3', 1])
+        self.now += 86400
+
+        [leader['member'] for leader in self.leaderboard.leaders_for(
+            TimeBucketedLeaderboard.DAILY, 1)].should.equal(['member_1', 'member_2'])
+        leaders = self.leaderboard.leaders_for(
+            TimeBucketedLeaderboard.DAILY, 1, buckets=30, with_member_data=True)
+        [(leader['member'], leader['score']) for leader in leaders].should.equal(
+            [('member_2', 25.0), ('member_1', 10.0), ('member_3', 1.0)])
+        self.leaderboard.redis_connection.ttl(
+            self.leaderboard.window_name(TimeBucketedLeaderboard.DAILY, 30)).should.be.within(1, 60)
+
+        self.leaderboard.window_name.when.called_with(
+            TimeBucketedLeaderboard.DAILY, 32).should.throw(ValueError)
+
+    def test_aggregate_option_combines_absolute_scores(self):
+        leaderboard = TimeBucketedLeaderboard(
+            'name', backend=BACKEND, aggregate='max', clock=lambda: self.now, decode_responses=True)
+        leaderboard.rank_member('member_1', 100)
+        self.now -= 86400
+        leaderboard.rank_member('member_1', 120)
+        leaderboard.rank_member('member_2', 110, 'member_data_2')
+        self.now += 86400
+
+        window_name = leaderboard.window_name(TimeBucketedLeaderboard.DAILY, 7)
+        window_name.should.equal('name:daily:2026-10-16:last_7:max')
+        leaders = leaderboard.leaders_in(window_name, 1, with_member_data=True)
+        [(leader['member'], leader['score']) for leader in leaders].should.equal(
+            [('member_1', 120.0), ('member_2', 110.0)])
+        leaders[1]['member_data'].should.equal('member_data_2')
+        TimeBucketedLeaderboard('name', backend=BACKEND, decode_responses=True).member_data_for_in(
+            window_name, 'member_2').should.equal('member_data_2')
+
+        TimeBucketedLeaderboard.when.called_with('name', aggregate='avg').should.throw(ValueError)
+
+    def test_remove_and_delete_cover_retained_buckets(self):
+        self.leaderboard.rank_member('member_1', 10, 'member_data_1')
+        self.now -= 86400
+        self.leaderboard.rank_member('member_1', 10, 'member_data_1')
+        self.leaderboard.rank_member('member_2', 10)
+        self.now += 86400
+
+        self.leaderboard.remove_member('member_1')
+        self.leaderboard.check_member_in(
+            self.leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY, 1),
+            'member_1').should.be.false
+
+        self.leaderboard.delete_leaderboard()
+        self.leaderboard.redis_connection.dbsize().should.equal(0)
+
+    def test_track_aggregates_option_covers_buckets(self):
+        leaderboard = TimeBucketedLeaderboard(
+            'name', backend=BACKEND, track_aggregates=True, decode_responses=True)
+        leaderboard.rank_members(['member_1', 10, 'member_2', 5])
+        leaderboard.change_score_for('member_1', 5)
+        leaderboard.remove_member('member_2')
+
+        bucket_name = leaderboard.bucket_name(TimeBucketedLeaderboard.DAILY)
+        leaderboard.aggregates()['sum'].should.equal(15.0)
+        leaderboard.aggregates_in(bucket_name)['sum'].should.equal(15.0)
+        leaderboard.rank_member_if(TimeBucketedLeaderboard.KEEP_LOWEST, 'member_1', 12).should.be.true
+        leaderboard.aggregates_in(bucket_name)['sum'].should.equal(12.0)
+        leaderboard.redis_connection.ttl('%s:aggregates' % bucket_name).should.be.greater_than(0)
+
+        leaderboard.delete_leaderboard()
+        leaderboard.redis_connection.dbsize().should.equal(0)